@@ -1,6 +1,20 @@
 """绘图模块"""
 from .menu import draw_menu_image
+from .render_cache import RenderCache, render_cache, render_menu_png, render_role_card_png
+from .render_service import RenderService, render_service
+from .role_card import RoleCardAtlas, draw_role_card, role_card_atlas
+from .styles import warm_up_fonts
 
 __all__ = [
     "draw_menu_image",
+    "RenderCache",
+    "render_cache",
+    "render_menu_png",
+    "render_role_card_png",
+    "RenderService",
+    "render_service",
+    "RoleCardAtlas",
+    "draw_role_card",
+    "role_card_atlas",
+    "warm_up_fonts",
 ]
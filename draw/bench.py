@@ -0,0 +1,356 @@
+"""绘图基准与视觉回归
+
+- 渐变：对比逐像素实现与当前实现的耗时，并校验输出逐字节一致
+- 编码：每个绘图函数的图片在各编码方案下的体积与编码耗时
+- 套件：用固定输入绘制所有公开绘图函数，记录耗时、峰值内存与编码体积，
+  并与基准图逐像素比对
+
+基准图依赖字体，生成时会在基准图目录记录所用字体（font.txt）。
+比对时字体必须相同，缺少基准图或字体记录都视为失败（只有 --update-golden 会生成它们）。
+套件默认固定使用 Pillow 自带字体（--font default），任何环境下都能与仓库中的基准图比对；
+该字体不含中文字形，基准图只检查布局与绘制，中文字形需用 --font 指定字体另行生成基准图检查。
+
+用法（在AstrBot根目录下）：
+    python -m data.plugins.astrbot_plugin_werewolf.draw.bench --repeat 3
+    python -m data.plugins.astrbot_plugin_werewolf.draw.bench --encoding
+    python -m data.plugins.astrbot_plugin_werewolf.draw.bench --suite
+    python -m data.plugins.astrbot_plugin_werewolf.draw.bench --suite --update-golden
+    python -m data.plugins.astrbot_plugin_werewolf.draw.bench --suite --font /path/to/font.ttf --golden-dir /tmp/golden --update-golden
+"""
+import argparse
+import json
+import os
+import time
+import tracemalloc
+from typing import Callable, Dict, List, Optional, Tuple
+
+from PIL import Image, ImageChops
+
+try:
+    import resource
+except ImportError:  # Windows 没有 resource 模块，不统计进程峰值RSS
+    resource = None
+
+from .encoding import AUTO_MODES, PROFILES, ImageEncoder
+from .game_status import draw_game_status, draw_night_result, draw_vote_result
+from .gradient_utils import create_radial_gradient, create_vertical_gradient
+from .menu import draw_menu_image
+from .role_card import draw_role_card
+from .role_card import ROLE_CONFIG
+from .styles import COLOR_BACKGROUND_BOT, COLOR_BACKGROUND_TOP, DEFAULT_FONT, _resolve_font_path, pin_font
+
+# 基准图目录，及其中记录生成基准图所用字体的文件
+GOLDEN_DIR = os.path.join(os.path.dirname(__file__), "golden")
+GOLDEN_FONT_FILE = "font.txt"
+
+# 视觉回归容差：单个像素任一通道差值超过 PIXEL_TOLERANCE 记为不同，
+# 不同像素占比超过 MISMATCH_TOLERANCE 判定为回归
+PIXEL_TOLERANCE = 8
+MISMATCH_TOLERANCE = 0.001
+
+# 状态图测试的座位数
+STATUS_SEAT_COUNTS = (6, 9, 12, 15, 18)
+
+# 各绘图函数实际使用的画布尺寸（宽, 高）
+GRADIENT_SIZES: List[Tuple[str, int, int]] = [
+    ("menu", 800, 1400),
+    ("role_card", 500, 400),
+    ("role_card_tall", 500, 450),
+    ("status", 600, 700),
+    ("vote", 550, 500),
+    ("dawn", 500, 200),
+]
+
+
+def reference_vertical_gradient(
+    width: int, height: int, color_top: tuple, color_bot: tuple
+) -> Image.Image:
+    """逐像素的垂直渐变（原实现，作为对照）"""
+    image = Image.new("RGB", (width, height), color_top)
+    pixels = image.load()
+
+    r1, g1, b1 = color_top
+    r2, g2, b2 = color_bot
+
+    for y in range(height):
+        ratio = y / height
+        r = int(r1 + (r2 - r1) * ratio)
+        g = int(g1 + (g2 - g1) * ratio)
+        b = int(b1 + (b2 - b1) * ratio)
+
+        for x in range(width):
+            pixels[x, y] = (r, g, b)
+
+    return image
+
+
+def reference_radial_gradient(
+    width: int, height: int, color_center: tuple, color_edge: tuple
+) -> Image.Image:
+    """逐像素的径向渐变（原实现，作为对照）"""
+    image = Image.new("RGB", (width, height), color_edge)
+    pixels = image.load()
+
+    cx, cy = width // 2, height // 2
+    max_dist = ((cx**2) + (cy**2)) ** 0.5
+
+    r1, g1, b1 = color_center
+    r2, g2, b2 = color_edge
+
+    for y in range(height):
+        for x in range(width):
+            dist = ((x - cx) ** 2 + (y - cy) ** 2) ** 0.5
+            ratio = min(dist / max_dist, 1.0)
+
+            r = int(r1 + (r2 - r1) * ratio)
+            g = int(g1 + (g2 - g1) * ratio)
+            b = int(b1 + (b2 - b1) * ratio)
+
+            pixels[x, y] = (r, g, b)
+
+    return image
+
+
+def _best_of(fn: Callable[[], Image.Image], repeat: int) -> Tuple[float, Image.Image]:
+    """运行 repeat 次，返回最短耗时（秒）和最后一次的结果"""
+    best = float("inf")
+    image = None
+    for _ in range(max(1, repeat)):
+        start = time.perf_counter()
+        image = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, image
+
+
+def bench_gradients(repeat: int = 3) -> List[dict]:
+    """对每个尺寸分别测量垂直/径向渐变的新旧实现"""
+    cases = [
+        ("vertical", reference_vertical_gradient, create_vertical_gradient),
+        ("radial", reference_radial_gradient, create_radial_gradient),
+    ]
+    results = []
+    for name, width, height in GRADIENT_SIZES:
+        for kind, old_fn, new_fn in cases:
+            old_time, old_image = _best_of(lambda: old_fn(width, height, COLOR_BACKGROUND_TOP, COLOR_BACKGROUND_BOT), repeat)
+            new_time, new_image = _best_of(lambda: new_fn(width, height, COLOR_BACKGROUND_TOP, COLOR_BACKGROUND_BOT), repeat)
+            results.append({
+                "size": f"{name} {width}x{height}",
+                "kind": kind,
+                "old_ms": round(old_time * 1000, 2),
+                "new_ms": round(new_time * 1000, 2),
+                "speedup": round(old_time / new_time, 1) if new_time else 0,
+                "identical": old_image.tobytes() == new_image.tobytes(),
+            })
+    return results
+
+
+def _players(count: int) -> List[dict]:
+    return [{"number": i, "name": f"玩家{i}", "alive": i % 4 != 0} for i in range(1, count + 1)]
+
+
+def suite_cases() -> List[Tuple[str, Callable[[], Image.Image]]]:
+    """视觉回归套件：所有公开绘图函数及其固定输入"""
+    votes = [
+        {"name": "3号.玩家3", "votes": 4, "voters": ["1号.玩家1", "2号.玩家2", "5号.玩家5", "6号.玩家6"]},
+        {"name": "7号.玩家7", "votes": 2, "voters": ["3号.玩家3", "9号.玩家9"]},
+        {"name": "1号.玩家1", "votes": 1, "voters": ["7号.玩家7"]},
+    ]
+    cases: List[Tuple[str, Callable[[], Image.Image]]] = [("menu", lambda: draw_menu_image(9))]
+    for index, role_name in enumerate(ROLE_CONFIG, start=1):
+        cases.append((f"role_card_{index}", lambda r=role_name, n=index: draw_role_card(r, n)))
+    cases.append(("role_card_wolf_team", lambda: draw_role_card("狼人", 5, ["2号.玩家2", "8号.玩家8"])))
+    cases.append(("role_card_wolf_team_long", lambda: draw_role_card(
+        "狼人", 5, ["2号.TheSleepyWerewolfKing", "8号.MidnightRiderOfTheNorth", "11号.CharlieBrown1999"]
+    )))
+    for count in STATUS_SEAT_COUNTS:
+        players = _players(count)
+        alive = sum(1 for p in players if p["alive"])
+        cases.append((f"status_{count}", lambda p=players, a=alive: draw_game_status("白天投票", 2, p, a, len(p))))
+    cases += [
+        ("vote_result", lambda: draw_vote_result(votes, "3号.玩家3")),
+        ("vote_result_pk_tie", lambda: draw_vote_result(votes[:2], None, True)),
+        ("night_result", lambda: draw_night_result("4号.玩家4", "8号.玩家8")),
+        ("night_result_peaceful", lambda: draw_night_result()),
+    ]
+    return cases
+
+
+def warm_cases() -> Dict[str, Callable[[int], Image.Image]]:
+    """热耗时按状态变化测量的用例：第 i 次绘制时轮数推进、一名玩家出局
+
+    对局中状态图每次绘制的状态都不同，重复绘制同一状态只会测到缓存命中。
+    """
+    cases: Dict[str, Callable[[int], Image.Image]] = {}
+    for count in STATUS_SEAT_COUNTS:
+        def draw(i: int, count: int = count) -> Image.Image:
+            players = _players(count)
+            dead = (i % count) + 1
+            for p in players:
+                p["alive"] = p["number"] != dead
+            return draw_game_status("白天投票" if i % 2 else "夜晚", 2 + i, players, count - 1, count)
+        cases[f"status_{count}"] = draw
+    return cases
+
+
+def sample_images() -> List[Tuple[str, Image.Image]]:
+    """套件中每个用例的图片"""
+    return [(name, draw()) for name, draw in suite_cases()]
+
+
+def compare_images(image: Image.Image, golden: Image.Image) -> float:
+    """与基准图比对，返回不同像素占比（尺寸不同返回1）"""
+    if image.size != golden.size:
+        return 1.0
+    diff = ImageChops.difference(image.convert("RGB"), golden.convert("RGB"))
+    # 每个像素取三个通道中的最大差值，再统计超出容差的像素数
+    r, g, b = diff.split()
+    channel_max = ImageChops.lighter(ImageChops.lighter(r, g), b)
+    histogram = channel_max.histogram()
+    mismatched = sum(histogram[PIXEL_TOLERANCE + 1:])
+    return mismatched / (image.width * image.height)
+
+
+def current_font() -> str:
+    """当前绘图使用的字体文件名（无可用字体时为 default）"""
+    return os.path.basename(_resolve_font_path() or "") or DEFAULT_FONT
+
+
+def golden_font(golden_dir: str = GOLDEN_DIR) -> Optional[str]:
+    """基准图生成时使用的字体文件名（没有记录时返回None）"""
+    try:
+        with open(os.path.join(golden_dir, GOLDEN_FONT_FILE), "r", encoding="utf-8") as f:
+            return f.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def run_suite(repeat: int = 3, golden_dir: str = GOLDEN_DIR, update_golden: bool = False) -> List[dict]:
+    """运行视觉回归套件
+
+    冷启动耗时为首次绘制（含图层、模板与测量缓存的构建），热耗时为之后 repeat 次中的最短耗时
+    （状态图每次绘制不同的状态，见 warm_cases）；
+    Python 峰值内存由 tracemalloc 统计（不含 PIL 在C层分配的像素缓冲，另列出图像缓冲大小），
+    进程峰值RSS为运行到该用例时的进程最高值。
+    """
+    if update_golden:
+        os.makedirs(golden_dir, exist_ok=True)
+        with open(os.path.join(golden_dir, GOLDEN_FONT_FILE), "w", encoding="utf-8") as f:
+            f.write(current_font() + "\n")
+    encoder = ImageEncoder("auto")
+    changes = warm_cases()
+
+    results = []
+    for name, draw in suite_cases():
+        tracemalloc.start()
+        start = time.perf_counter()
+        image = draw()
+        cold = time.perf_counter() - start
+        _, py_peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        if name in changes:
+            # 热耗时绘制变化后的状态，比对与编码仍使用固定输入的图片
+            counter = iter(range(1, max(1, repeat) + 1))
+            warm, _ = _best_of(lambda: changes[name](next(counter)), repeat)
+        else:
+            warm, image = _best_of(draw, repeat)
+        encoding, data = encoder.pick(image)
+
+        row = {
+            "case": name,
+            "size": f"{image.width}x{image.height}",
+            "cold_ms": round(cold * 1000, 2),
+            "warm_ms": round(warm * 1000, 2),
+            "py_peak_kb": round(py_peak / 1024, 1),
+            "image_buffer_kb": round(image.width * image.height * len(image.getbands()) / 1024, 1),
+            "rss_peak_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss if resource else None,
+            "encoding": encoding,
+            "encoded_bytes": len(data),
+        }
+
+        golden_path = os.path.join(golden_dir, f"{name}.png")
+        if update_golden:
+            image.save(golden_path, format="PNG")
+            row["golden"] = "updated"
+        elif os.path.exists(golden_path):
+            with Image.open(golden_path) as golden:
+                mismatch = compare_images(image, golden)
+            row["mismatch"] = round(mismatch, 5)
+            row["golden"] = "ok" if mismatch <= MISMATCH_TOLERANCE else "regressed"
+        else:
+            row["golden"] = "missing"
+        results.append(row)
+    return results
+
+
+def bench_encoding(repeat: int = 3) -> List[dict]:
+    """每张图片在各编码方案下的体积与编码耗时，以及各自动模式的选择"""
+    results = []
+    for name, image in sample_images():
+        row = {"image": name, "size": f"{image.width}x{image.height}", "profiles": {}}
+        for profile_name, profile in PROFILES.items():
+            if not profile.available:
+                continue
+            best = float("inf")
+            for _ in range(max(1, repeat)):
+                start = time.perf_counter()
+                data = profile.encode(image)
+                best = min(best, time.perf_counter() - start)
+            row["profiles"][profile_name] = {"bytes": len(data), "encode_ms": round(best * 1000, 2)}
+        for mode in AUTO_MODES:
+            row[mode] = ImageEncoder(mode).pick(image)[0]
+        results.append(row)
+    return results
+
+
+def main(argv: List[str] = None) -> None:
+    parser = argparse.ArgumentParser(description="狼人杀绘图基准")
+    parser.add_argument("--repeat", type=int, default=3, help="每项重复次数（取最短耗时）")
+    parser.add_argument("--encoding", action="store_true", help="测量各编码方案（默认测量渐变）")
+    parser.add_argument("--suite", action="store_true", help="运行视觉回归套件")
+    parser.add_argument("--golden-dir", default=GOLDEN_DIR, help="基准图目录")
+    parser.add_argument("--update-golden", action="store_true", help="用本次绘制结果覆盖基准图")
+    parser.add_argument("--font", help=(
+        f"固定使用的字体文件，{DEFAULT_FONT} 为 Pillow 自带字体"
+        f"（不指定时套件使用 {DEFAULT_FONT}，其余测量按插件的字体优先级查找）"
+    ))
+    args = parser.parse_args(argv)
+
+    if args.font:
+        pin_font(args.font)
+    elif args.suite:
+        pin_font(DEFAULT_FONT)
+
+    if args.suite:
+        if not args.update_golden:
+            recorded = golden_font(args.golden_dir)
+            if recorded is None:
+                raise SystemExit(f"{args.golden_dir} 中没有基准图字体记录，请先用 --update-golden 生成基准图")
+            if recorded != current_font():
+                raise SystemExit(f"基准图使用字体 {recorded}，当前为 {current_font()}，请用 --font 指定相同字体")
+
+        results = run_suite(args.repeat, args.golden_dir, args.update_golden)
+        print(json.dumps(results, ensure_ascii=False, indent=2))
+        regressed = [r["case"] for r in results if r["golden"] == "regressed"]
+        missing = [r["case"] for r in results if r["golden"] == "missing"]
+        if regressed or missing:
+            problems = []
+            if regressed:
+                problems.append(f"以下图片与基准图不一致: {', '.join(regressed)}")
+            if missing:
+                problems.append(f"以下图片缺少基准图（用 --update-golden 生成）: {', '.join(missing)}")
+            raise SystemExit("\n".join(problems))
+        return
+
+    if args.encoding:
+        print(json.dumps(bench_encoding(args.repeat), ensure_ascii=False, indent=2))
+        return
+
+    results = bench_gradients(args.repeat)
+    print(json.dumps(results, ensure_ascii=False, indent=2))
+    if not all(r["identical"] for r in results):
+        raise SystemExit("渐变输出与原实现不一致")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""图片编码 - 可选的编码方案与按体积/耗时预算的自动选择
+
+暗色渐变卡片用默认的全彩PNG编码体积偏大，上传慢。
+自动模式下每类图片的前几张会用所有候选方案编码，
+选出在耗时预算内、体积最小的方案，之后同类图片直接使用该方案。
+auto 只在无损的PNG方案中选择；auto_lossy 另加256色调色板PNG、WebP 与 JPEG
+（渐变有色带、小字有压缩痕迹，部分 OneBot 实现不支持 WebP）。
+"""
+import io
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from PIL import Image, features
+
+# 单张图片的体积预算（字节）与编码耗时预算（毫秒）
+IMAGE_MAX_BYTES = 200 * 1024
+ENCODE_MAX_MS = 50.0
+
+# 自动模式下每类图片试编码的张数（之后固定使用选出的方案）
+AUTO_TRIAL_COUNT = 3
+
+
+@dataclass(frozen=True)
+class EncodingProfile:
+    """编码方案"""
+    name: str
+    format: str                                       # PIL 保存格式
+    options: Dict[str, object] = field(default_factory=dict)
+    palette_colors: int = 0                           # >0 时先量化为调色板图
+
+    @property
+    def available(self) -> bool:
+        """当前 PIL 是否支持该格式"""
+        return self.format != "WEBP" or features.check("webp")
+
+    def encode(self, image: Image.Image) -> bytes:
+        if self.palette_colors:
+            image = image.convert("RGB").quantize(colors=self.palette_colors, method=Image.MEDIANCUT)
+        elif self.format == "JPEG" and image.mode != "RGB":
+            image = image.convert("RGB")
+        buffer = io.BytesIO()
+        image.save(buffer, format=self.format, **self.options)
+        return buffer.getvalue()
+
+
+PROFILES: Dict[str, EncodingProfile] = {
+    profile.name: profile
+    for profile in (
+        EncodingProfile("png", "PNG"),
+        EncodingProfile("png_optimized", "PNG", {"optimize": True}),
+        EncodingProfile("png_palette", "PNG", {"optimize": True}, palette_colors=256),
+        EncodingProfile("webp", "WEBP", {"quality": 85, "method": 4}),
+        EncodingProfile("jpeg", "JPEG", {"quality": 88, "optimize": True}),
+    )
+}
+
+# 自动模式及其候选方案
+AUTO_MODES: Dict[str, Tuple[str, ...]] = {
+    "auto": ("png", "png_optimized"),
+    "auto_lossy": ("png_palette", "png_optimized", "webp", "jpeg"),
+}
+
+
+class ImageEncoder:
+    """图片编码器（线程安全）
+
+    profile 为 PROFILES 中的方案名，或 AUTO_MODES 中的自动模式（按预算在候选方案中选择）。
+    """
+
+    def __init__(self, profile: str = "png", max_bytes: int = IMAGE_MAX_BYTES, max_ms: float = ENCODE_MAX_MS):
+        self.profile = profile if profile in AUTO_MODES or profile in PROFILES else "png"
+        self.max_bytes = max_bytes
+        self.max_ms = max_ms
+        self._trials: Dict[str, int] = {}
+        self._choices: Dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    def choice(self, name: str) -> Optional[str]:
+        """自动模式下某类图片已选定的方案"""
+        with self._lock:
+            return self._choices.get(name)
+
+    def encode(self, name: str, image: Image.Image) -> bytes:
+        """按配置的方案编码 name 类图片"""
+        if self.profile not in AUTO_MODES:
+            return PROFILES[self.profile].encode(image)
+
+        chosen = self.choice(name)
+        if chosen:
+            return PROFILES[chosen].encode(image)
+
+        best_name, data = self.pick(image)
+        with self._lock:
+            trials = self._trials[name] = self._trials.get(name, 0) + 1
+            if trials >= AUTO_TRIAL_COUNT:
+                self._choices[name] = best_name
+        return data
+
+    def pick(self, image: Image.Image) -> Tuple[str, bytes]:
+        """用自动模式的所有候选方案编码，返回（方案名, 字节）
+
+        优先选耗时与体积都在预算内的最小结果；都超预算时选体积最小的。
+        """
+        results: List[Tuple[bool, int, str, bytes]] = []
+        for profile_name in AUTO_MODES.get(self.profile, AUTO_MODES["auto"]):
+            profile = PROFILES[profile_name]
+            if not profile.available:
+                continue
+            start = time.perf_counter()
+            data = profile.encode(image)
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            within_budget = elapsed_ms <= self.max_ms and len(data) <= self.max_bytes
+            results.append((not within_budget, len(data), profile_name, data))
+
+        _, _, best_name, data = min(results, key=lambda r: (r[0], r[1]))
+        return best_name, data
@@ -1,5 +1,7 @@
 """游戏状态图片生成"""
-from typing import List, Optional, TYPE_CHECKING
+import threading
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple, TYPE_CHECKING
 from PIL import Image, ImageDraw
 from .styles import (
     load_font,
@@ -23,102 +25,127 @@ from .styles import (
     COLOR_MOONLIGHT,
 )
 from .gradient_utils import create_vertical_gradient
+from .layout import fit_text
 
 if TYPE_CHECKING:
     from ..models import GameRoom, Player
 
 
-def draw_game_status(
-    phase: str,
-    day_count: int,
-    players: List[dict],
-    alive_count: int,
-    total_count: int,
-) -> Image.Image:
-    """
-    生成游戏状态图片
+# 状态图布局
+STATUS_WIDTH = 600                  # 最小宽度（9人及以下的标准布局）
+STATUS_MAX_WIDTH = 800              # 最大宽度，座位多时缩窄卡片而不是加宽图片
+STATUS_MIN_COLUMNS = 3
+STATUS_MAX_COLUMNS = 6
+STATUS_MAX_ROWS = 3                 # 列数按此行数推算，超出最大列数后才继续增加行
+STATUS_CARD_WIDTH = 170
+STATUS_CARD_HEIGHT = 70
+STATUS_CARD_MARGIN = 15
+STATUS_SIDE_MARGIN = 30
+STATUS_CARDS_TOP = 190
 
-    Args:
-        phase: 当前阶段名称
-        day_count: 天数
-        players: 玩家列表 [{"number": 1, "name": "xxx", "alive": True}, ...]
-        alive_count: 存活人数
-        total_count: 总人数
+# 阶段与存活人数两行所在的区域（上下边界），状态变化时只重绘这一条
+STATUS_HEADER_TOP = 62
+STATUS_HEADER_BOTTOM = 132
 
-    Returns:
-        PIL Image 对象
-    """
-    width = 600
+# 投票结果图最多画出的候选人数
+VOTE_MAX_ROWS = 8
 
-    # 加载字体
-    title_font = load_font(28)
-    subtitle_font = load_font(18)
-    text_font = load_font(16)
-    number_font = load_font(24)
-    small_font = load_font(14)
+# 缓存的房间图层数（按座位表区分，同一局内座位表不变）
+STATUS_BOARD_CACHE_SIZE = 16
 
-    # 计算高度
-    rows = (len(players) + 2) // 3  # 每行3个玩家
-    player_card_height = 70
-    player_section_height = rows * (player_card_height + 10) + 20
-    base_height = 180 + player_section_height + 60
 
-    # 创建画布
-    image = create_vertical_gradient(width, base_height, COLOR_BACKGROUND_TOP, COLOR_BACKGROUND_BOT)
-    draw = ImageDraw.Draw(image, "RGBA")
+@lru_cache(maxsize=8)
+def _background(width: int, height: int) -> Image.Image:
+    """渐变背景（只读，使用前需 copy）"""
+    return create_vertical_gradient(width, height, COLOR_BACKGROUND_TOP, COLOR_BACKGROUND_BOT)
 
-    # 判断是白天还是夜晚
-    is_night = "夜晚" in phase or "night" in phase.lower()
-    phase_color = COLOR_NIGHT if is_night else COLOR_DAY
-    phase_emoji = "🌙" if is_night else "☀️"
 
-    # 标题
-    y = 35
-    draw.text(
-        (width // 2, y),
-        "🐺 狼人杀 · 游戏状态",
-        fill=COLOR_TITLE,
-        font=title_font,
-        anchor="mm",
-    )
+def status_grid(seat_count: int) -> Tuple[int, int, int]:
+    """按座位数计算状态图网格，返回（列数, 卡片宽度, 图片宽度）
+
+    9人及以下为3列；人数更多时增加列数使行数不超过 STATUS_MAX_ROWS，
+    宽度超过 STATUS_MAX_WIDTH 时缩窄卡片。
+    """
+    columns = -(-seat_count // STATUS_MAX_ROWS)
+    columns = max(STATUS_MIN_COLUMNS, min(STATUS_MAX_COLUMNS, columns))
+    grid_width = STATUS_CARD_WIDTH * columns + STATUS_CARD_MARGIN * (columns - 1)
+    width = max(STATUS_WIDTH, grid_width + STATUS_SIDE_MARGIN * 2)
+    if width <= STATUS_MAX_WIDTH:
+        return columns, STATUS_CARD_WIDTH, width
 
-    # 阶段信息
-    y += 45
-    phase_text = f"{phase_emoji} 第 {day_count} 天 · {phase}"
-    draw.text((width // 2, y), phase_text, fill=phase_color, font=subtitle_font, anchor="mm")
-
-    # 存活统计
-    y += 35
-    alive_text = f"存活人数：{alive_count}/{total_count}"
-    draw.text((width // 2, y), alive_text, fill=COLOR_ALIVE, font=text_font, anchor="mm")
-
-    # 分割线
-    y += 30
-    line_margin = 50
-    draw.line([(line_margin, y), (width - line_margin, y)], fill=COLOR_CARD_BORDER, width=1)
-
-    # 玩家列表标题
-    y += 20
-    draw.text((width // 2, y), "📋 玩家列表", fill=COLOR_MOONLIGHT, font=text_font, anchor="mm")
-
-    # 玩家卡片
-    y += 25
-    card_width = 170
-    card_height = player_card_height
-    card_margin = 15
-    start_x = (width - (card_width * 3 + card_margin * 2)) // 2
-
-    for idx, player in enumerate(players):
-        col = idx % 3
-        row = idx // 3
-
-        x0 = start_x + col * (card_width + card_margin)
-        y0 = y + row * (card_height + 10)
-        x1 = x0 + card_width
-        y1 = y0 + card_height
+    width = STATUS_MAX_WIDTH
+    card_width = (width - STATUS_SIDE_MARGIN * 2 - STATUS_CARD_MARGIN * (columns - 1)) // columns
+    return columns, card_width, width
+
+
+class StatusBoard:
+    """一局游戏的状态图图层
+
+    背景、标题、底部提示和每个座位“存活/出局”两种卡片在创建时绘制一次。
+    出图时在上一张图的基础上只重绘变化的部分：阶段或存活人数变了重绘标题下的两行，
+    存活状态变了的座位贴上对应的卡片，其余像素直接沿用。
+    """
+
+    def __init__(self, seats: Tuple[Tuple[int, str], ...]):
+        self.seats = seats
+        self.columns, self.card_width, self.width = status_grid(len(seats))
+        width = self.width
+        rows = (len(seats) + self.columns - 1) // self.columns
+        base_height = 180 + rows * (STATUS_CARD_HEIGHT + 10) + 20 + 60
+
+        title_font = load_font(28)
+        text_font = load_font(16)
+        small_font = load_font(14)
+
+        image = _background(width, base_height).copy()
+        draw = ImageDraw.Draw(image, "RGBA")
+
+        # 标题
+        draw.text((width // 2, 35), "🐺 狼人杀 · 游戏状态", fill=COLOR_TITLE, font=title_font, anchor="mm")
+
+        # 分割线
+        line_margin = 50
+        draw.line([(line_margin, 145), (width - line_margin, 145)], fill=COLOR_CARD_BORDER, width=1)
+
+        # 玩家列表标题
+        draw.text((width // 2, 165), "📋 玩家列表", fill=COLOR_MOONLIGHT, font=text_font, anchor="mm")
+
+        # 底部提示
+        footer_y = STATUS_CARDS_TOP + rows * (STATUS_CARD_HEIGHT + 10) + 25
+        tip_text = "🎮 使用 /狼人杀帮助 查看完整命令"
+        draw.text((width // 2, footer_y), tip_text, fill=COLOR_TEXT_DIM, font=small_font, anchor="mm")
+
+        # 裁剪到实际高度
+        self.base = image.crop((0, 0, width, footer_y + 25))
+        self.header_box = (0, STATUS_HEADER_TOP, width, STATUS_HEADER_BOTTOM)
+        self.header = self.base.crop(self.header_box)
+
+        # 每个座位两种状态的卡片，直接画在对应位置的背景上，贴回时无需混合
+        self.tiles: List[Tuple[Tuple[int, int], Dict[bool, Image.Image]]] = []
+        grid_width = self.card_width * self.columns + STATUS_CARD_MARGIN * (self.columns - 1)
+        start_x = (width - grid_width) // 2
+        for idx, (number, name) in enumerate(seats):
+            x0 = start_x + (idx % self.columns) * (self.card_width + STATUS_CARD_MARGIN)
+            y0 = STATUS_CARDS_TOP + (idx // self.columns) * (STATUS_CARD_HEIGHT + 10)
+            box = (x0, y0, x0 + self.card_width + 1, y0 + STATUS_CARD_HEIGHT + 1)
+            variants = {
+                alive: self._draw_card(self.base.crop(box), self.card_width, number, name, alive)
+                for alive in (True, False)
+            }
+            self.tiles.append(((x0, y0), variants))
+
+        # 上一张图及其状态（增量重绘的起点）
+        self._last: Optional[Tuple[Tuple[str, int, int, int], List[bool], Image.Image]] = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _draw_card(tile: Image.Image, card_width: int, number: int, name: str, is_alive: bool) -> Image.Image:
+        """在座位背景上绘制玩家卡片"""
+        number_font = load_font(24)
+        small_font = load_font(14)
+        draw = ImageDraw.Draw(tile, "RGBA")
 
         # 根据存活状态选择颜色
-        is_alive = player.get("alive", True)
         if is_alive:
             bg_color = COLOR_CARD_BG
             border_color = COLOR_ALIVE
@@ -134,7 +161,7 @@ def draw_game_status(
 
         # 绘制卡片
         draw.rounded_rectangle(
-            [x0, y0, x1, y1],
+            [0, 0, card_width, STATUS_CARD_HEIGHT],
             radius=8,
             fill=bg_color,
             outline=border_color,
@@ -142,29 +169,95 @@ def draw_game_status(
         )
 
         # 玩家编号
-        number = player.get("number", idx + 1)
-        cx = (x0 + x1) // 2
-        draw.text((cx, y0 + 18), f"{number}号", fill=text_color, font=number_font, anchor="mm")
+        cx = card_width // 2
+        draw.text((cx, 18), f"{number}号", fill=text_color, font=number_font, anchor="mm")
 
-        # 玩家名称（截断过长的名字）
-        name = player.get("name", f"玩家{number}")
-        if len(name) > 6:
-            name = name[:5] + "..."
-        draw.text((cx, y0 + 42), name, fill=text_color, font=small_font, anchor="mm")
+        # 玩家名称（按像素宽度截断过长的名字）
+        name = fit_text(name, small_font, card_width - 16)
+        draw.text((cx, 42), name, fill=text_color, font=small_font, anchor="mm")
 
         # 状态标签
-        draw.text((cx, y0 + 58), status_text, fill=status_color, font=small_font, anchor="mm")
+        draw.text((cx, 58), status_text, fill=status_color, font=small_font, anchor="mm")
+        return tile
 
-    # 底部提示
-    footer_y = y + rows * (card_height + 10) + 25
-    tip_text = "🎮 使用 /狼人杀帮助 查看完整命令"
-    draw.text((width // 2, footer_y), tip_text, fill=COLOR_TEXT_DIM, font=small_font, anchor="mm")
+    def render(self, phase: str, day_count: int, alive: List[bool], alive_count: int, total_count: int) -> Image.Image:
+        """合成状态图（alive 与座位表一一对应）
 
-    # 裁剪到实际高度
-    final_height = footer_y + 25
-    image = image.crop((0, 0, width, final_height))
+        返回的图片之后不会再被修改，可直接交给编码。
+        """
+        header_state = (phase, day_count, alive_count, total_count)
+        alive = list(alive)
+        with self._lock:
+            if self._last is None:
+                image = self.base.copy()
+                last_header, last_alive = None, [None] * len(self.tiles)
+            else:
+                last_header, last_alive, last_image = self._last
+                image = last_image.copy()
 
-    return image
+            if header_state != last_header:
+                image.paste(self.header, self.header_box[:2])
+                self._draw_header(image, *header_state)
+
+            # 玩家卡片：只贴状态变化的座位
+            for (position, variants), is_alive, was_alive in zip(self.tiles, alive, last_alive):
+                if is_alive != was_alive:
+                    image.paste(variants[is_alive], position)
+
+            self._last = (header_state, alive, image)
+        return image
+
+    def _draw_header(self, image: Image.Image, phase: str, day_count: int, alive_count: int, total_count: int) -> None:
+        """绘制阶段与存活人数两行"""
+        width = self.width
+        draw = ImageDraw.Draw(image, "RGBA")
+
+        # 判断是白天还是夜晚
+        is_night = "夜晚" in phase or "night" in phase.lower()
+        phase_color = COLOR_NIGHT if is_night else COLOR_DAY
+        phase_emoji = "🌙" if is_night else "☀️"
+
+        # 阶段信息
+        phase_text = f"{phase_emoji} 第 {day_count} 天 · {phase}"
+        draw.text((width // 2, 80), phase_text, fill=phase_color, font=load_font(18), anchor="mm")
+
+        # 存活统计
+        alive_text = f"存活人数：{alive_count}/{total_count}"
+        draw.text((width // 2, 115), alive_text, fill=COLOR_ALIVE, font=load_font(16), anchor="mm")
+
+
+@lru_cache(maxsize=STATUS_BOARD_CACHE_SIZE)
+def get_status_board(seats: Tuple[Tuple[int, str], ...]) -> StatusBoard:
+    """按座位表获取（或创建）状态图图层"""
+    return StatusBoard(seats)
+
+
+def draw_game_status(
+    phase: str,
+    day_count: int,
+    players: List[dict],
+    alive_count: int,
+    total_count: int,
+) -> Image.Image:
+    """
+    生成游戏状态图片
+
+    Args:
+        phase: 当前阶段名称
+        day_count: 天数
+        players: 玩家列表 [{"number": 1, "name": "xxx", "alive": True}, ...]
+        alive_count: 存活人数
+        total_count: 总人数
+
+    Returns:
+        PIL Image 对象
+    """
+    seats = tuple(
+        (player.get("number", idx + 1), player.get("name", f"玩家{player.get('number', idx + 1)}"))
+        for idx, player in enumerate(players)
+    )
+    alive = [bool(player.get("alive", True)) for player in players]
+    return get_status_board(seats).render(phase, day_count, alive, alive_count, total_count)
 
 
 def draw_vote_result(
@@ -191,11 +284,16 @@ def draw_vote_result(
     small_font = load_font(14)
     vote_font = load_font(20)
 
+    # 按票数排序，大板子只画票数最多的 VOTE_MAX_ROWS 人，其余汇总为一行
+    sorted_data = sorted(vote_data, key=lambda x: x.get("votes", 0), reverse=True)
+    max_votes = sorted_data[0].get("votes", 0) if sorted_data else 0
+    shown, rest = sorted_data[:VOTE_MAX_ROWS], sorted_data[VOTE_MAX_ROWS:]
+
     # 计算高度
-    base_height = 120 + len(vote_data) * 55 + 80
+    base_height = 120 + len(shown) * 55 + (30 if rest else 0) + 80
 
     # 创建画布
-    image = create_vertical_gradient(width, base_height, COLOR_BACKGROUND_TOP, COLOR_BACKGROUND_BOT)
+    image = _background(width, base_height).copy()
     draw = ImageDraw.Draw(image, "RGBA")
 
     # 标题
@@ -203,22 +301,18 @@ def draw_vote_result(
     title = "⚔️ PK投票结果" if is_pk else "🗳️ 投票结果"
     draw.text((width // 2, y), title, fill=COLOR_TITLE, font=title_font, anchor="mm")
 
-    # 按票数排序
-    sorted_data = sorted(vote_data, key=lambda x: x.get("votes", 0), reverse=True)
-    max_votes = sorted_data[0].get("votes", 0) if sorted_data else 0
-
     # 投票条
     y += 50
     bar_margin = 60
     bar_max_width = width - bar_margin * 2 - 100
 
-    for item in sorted_data:
+    for item in shown:
         name = item.get("name", "???")
         votes = item.get("votes", 0)
         voters = item.get("voters", [])
 
-        # 名称
-        draw.text((bar_margin, y), name, fill=COLOR_TEXT_LIGHT, font=text_font, anchor="lm")
+        # 名称（截断到投票条左侧）
+        draw.text((bar_margin, y), fit_text(name, text_font, 75), fill=COLOR_TEXT_LIGHT, font=text_font, anchor="lm")
 
         # 投票条
         bar_x = bar_margin + 80
@@ -265,6 +359,12 @@ def draw_vote_result(
 
         y += 35
 
+    # 未画出的候选人
+    if rest:
+        rest_votes = sum(item.get("votes", 0) for item in rest)
+        draw.text((width // 2, y), f"… 其余 {len(rest)} 人共 {rest_votes} 票", fill=COLOR_TEXT_DIM, font=small_font, anchor="mm")
+        y += 30
+
     # 结果
     y += 15
     if exiled_player:
@@ -308,7 +408,7 @@ def draw_night_result(
     emoji_font = load_font(40)
 
     # 创建画布
-    image = create_vertical_gradient(width, height, COLOR_BACKGROUND_TOP, COLOR_BACKGROUND_BOT)
+    image = _background(width, height).copy()
     draw = ImageDraw.Draw(image, "RGBA")
 
     # 标题
@@ -1,6 +1,11 @@
 """渐变工具函数"""
 from PIL import Image
 
+try:
+    import numpy as np
+except ImportError:  # numpy 为可选依赖，缺失时使用纯Python实现
+    np = None
+
 
 def create_vertical_gradient(
     width: int, height: int, color_top: tuple, color_bot: tuple
@@ -8,6 +13,8 @@ def create_vertical_gradient(
     """
     创建垂直渐变背景
 
+    只计算一列（每行一个颜色），再横向拉伸到目标宽度。
+
     Args:
         width: 图片宽度
         height: 图片高度
@@ -17,22 +24,19 @@ def create_vertical_gradient(
     Returns:
         PIL Image 对象
     """
-    image = Image.new("RGB", (width, height), color_top)
-    pixels = image.load()
-
     r1, g1, b1 = color_top
     r2, g2, b2 = color_bot
 
-    for y in range(height):
-        ratio = y / height
-        r = int(r1 + (r2 - r1) * ratio)
-        g = int(g1 + (g2 - g1) * ratio)
-        b = int(b1 + (b2 - b1) * ratio)
-
-        for x in range(width):
-            pixels[x, y] = (r, g, b)
-
-    return image
+    column = Image.new("RGB", (1, height), color_top)
+    column.putdata([
+        (
+            int(r1 + (r2 - r1) * (y / height)),
+            int(g1 + (g2 - g1) * (y / height)),
+            int(b1 + (b2 - b1) * (y / height)),
+        )
+        for y in range(height)
+    ])
+    return column.resize((width, height), Image.NEAREST)
 
 
 def create_radial_gradient(
@@ -41,6 +45,9 @@ def create_radial_gradient(
     """
     创建径向渐变背景（从中心向外）
 
+    安装了 numpy 时整张距离场一次算出；否则按行计算，
+    上下对称的行、同一行内左右对称的像素只计算一次。
+
     Args:
         width: 图片宽度
         height: 图片高度
@@ -50,24 +57,57 @@ def create_radial_gradient(
     Returns:
         PIL Image 对象
     """
-    image = Image.new("RGB", (width, height), color_edge)
-    pixels = image.load()
-
     cx, cy = width // 2, height // 2
     max_dist = ((cx**2) + (cy**2)) ** 0.5
 
-    r1, g1, b1 = color_center
-    r2, g2, b2 = color_edge
+    if np is not None:
+        return _radial_gradient_numpy(width, height, cx, cy, max_dist, color_center, color_edge)
+    return _radial_gradient_python(width, height, cx, cy, max_dist, color_center, color_edge)
 
-    for y in range(height):
-        for x in range(width):
-            dist = ((x - cx) ** 2 + (y - cy) ** 2) ** 0.5
-            ratio = min(dist / max_dist, 1.0)
 
-            r = int(r1 + (r2 - r1) * ratio)
-            g = int(g1 + (g2 - g1) * ratio)
-            b = int(b1 + (b2 - b1) * ratio)
+def _radial_gradient_numpy(
+    width: int, height: int, cx: int, cy: int, max_dist: float,
+    color_center: tuple, color_edge: tuple
+) -> Image.Image:
+    dx_sq = (np.arange(width, dtype=np.int64) - cx) ** 2
+    dy_sq = (np.arange(height, dtype=np.int64) - cy) ** 2
+    # 与逐像素版本一致使用 pow(x, 0.5)，保证输出逐字节相同
+    dist = np.power((dy_sq[:, None] + dx_sq[None, :]).astype(np.float64), 0.5)
+    ratio = np.minimum(dist / max_dist, 1.0)
 
-            pixels[x, y] = (r, g, b)
+    pixels = np.empty((height, width, 3), dtype=np.uint8)
+    for channel, (c1, c2) in enumerate(zip(color_center, color_edge)):
+        pixels[:, :, channel] = (c1 + (c2 - c1) * ratio).astype(np.int64)
+    return Image.fromarray(pixels, "RGB")
 
-    return image
+
+def _radial_gradient_python(
+    width: int, height: int, cx: int, cy: int, max_dist: float,
+    color_center: tuple, color_edge: tuple
+) -> Image.Image:
+    r1, g1, b1 = color_center
+    r2, g2, b2 = color_edge
+    dx_sq = [(x - cx) ** 2 for x in range(width)]
+
+    rows = {}
+    data = bytearray()
+    for y in range(height):
+        dy_sq = (y - cy) ** 2
+        row = rows.get(dy_sq)
+        if row is None:
+            colors = {}
+            row = bytearray()
+            for d in dx_sq:
+                color = colors.get(d)
+                if color is None:
+                    ratio = min(((d + dy_sq) ** 0.5) / max_dist, 1.0)
+                    color = colors[d] = bytes((
+                        int(r1 + (r2 - r1) * ratio),
+                        int(g1 + (g2 - g1) * ratio),
+                        int(b1 + (b2 - b1) * ratio),
+                    ))
+                row += color
+            rows[dy_sq] = row
+        data += row
+
+    return Image.frombytes("RGB", (width, height), bytes(data))
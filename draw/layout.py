@@ -0,0 +1,140 @@
+"""文本测量与布局 - 按（字体, 文本）缓存测量结果，布局先算成纯数据再一次性绘制
+
+菜单、角色卡片和状态图共用同一份测量缓存。
+"""
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Optional, Tuple, Union
+
+from PIL import Image, ImageDraw, ImageFont
+
+from .styles import load_font
+
+# 文本测量缓存上限（按 字体+文本 缓存）
+TEXT_CACHE_SIZE = 1024
+
+# 测量用的画布（只读取文本边界，不绘制）
+_measure_draw = ImageDraw.Draw(Image.new("RGB", (1, 1)))
+
+
+@lru_cache(maxsize=TEXT_CACHE_SIZE)
+def measure_text(text: str, font: ImageFont.FreeTypeFont) -> Tuple[int, int]:
+    """文本宽高（像素）
+
+    字体对象由 load_font 按字号缓存，同一字号总是同一个对象，可直接作为缓存键。
+    """
+    bbox = _measure_draw.textbbox((0, 0), text, font=font)
+    return bbox[2] - bbox[0], bbox[3] - bbox[1]
+
+
+@lru_cache(maxsize=TEXT_CACHE_SIZE)
+def fit_text(text: str, font: ImageFont.FreeTypeFont, max_width: int, ellipsis: str = "...") -> str:
+    """截断文本使其不超过 max_width 像素（超出时以省略号结尾）"""
+    if measure_text(text, font)[0] <= max_width:
+        return text
+    for end in range(len(text) - 1, 0, -1):
+        candidate = text[:end] + ellipsis
+        if measure_text(candidate, font)[0] <= max_width:
+            return candidate
+    return ellipsis
+
+
+@lru_cache(maxsize=TEXT_CACHE_SIZE)
+def wrap_items(
+    items: Tuple[str, ...], font: ImageFont.FreeTypeFont, max_width: int, prefix: str = "", separator: str = "、"
+) -> Tuple[str, ...]:
+    """以 prefix 开头、用分隔符连接各条目并按 max_width 折行
+
+    不截断任何条目：放不下的条目移到下一行，单个条目超宽时按字符拆开。
+    """
+    lines = []
+    line = prefix
+    for index, item in enumerate(items):
+        piece = item + (separator if index < len(items) - 1 else "")
+        if measure_text(line + piece, font)[0] <= max_width:
+            line += piece
+            continue
+        if line and (index or line != prefix):
+            lines.append(line)
+            line = ""
+        for char in piece:
+            if line and measure_text(line + char, font)[0] > max_width:
+                lines.append(line)
+                line = ""
+            line += char
+    if line:
+        lines.append(line)
+    return tuple(lines)
+
+
+# ========== 布局元素 ==========
+
+@dataclass(frozen=True)
+class TextItem:
+    """文本"""
+    xy: Tuple[int, int]
+    text: str
+    font_size: int
+    fill: tuple
+    anchor: Optional[str] = None
+
+
+@dataclass(frozen=True)
+class LineItem:
+    """直线"""
+    points: Tuple[Tuple[int, int], Tuple[int, int]]
+    fill: tuple
+    width: int = 1
+
+
+@dataclass(frozen=True)
+class CardItem:
+    """带阴影的圆角卡片"""
+    box: Tuple[int, int, int, int]
+    fill: tuple
+    outline: tuple
+    radius: int = 12
+    width: int = 2
+    shadow_offset: int = 3
+    shadow_fill: tuple = (0, 0, 0, 60)
+
+
+LayoutItem = Union[TextItem, LineItem, CardItem]
+
+
+@dataclass(frozen=True)
+class Layout:
+    """整张图的布局
+
+    canvas_height 为背景渐变的高度，height 为最终裁剪高度（两者不同时先按前者画渐变再裁剪）。
+    """
+    width: int
+    canvas_height: int
+    height: int
+    items: Tuple[LayoutItem, ...]
+
+
+def render_layout(layout: Layout, background: Image.Image) -> Image.Image:
+    """在背景上按顺序一次性绘制所有元素，返回裁剪后的图片"""
+    image = background
+    draw = ImageDraw.Draw(image, "RGBA")
+
+    for item in layout.items:
+        if isinstance(item, TextItem):
+            draw.text(item.xy, item.text, fill=item.fill, font=load_font(item.font_size), anchor=item.anchor)
+        elif isinstance(item, LineItem):
+            draw.line(list(item.points), fill=item.fill, width=item.width)
+        elif isinstance(item, CardItem):
+            x0, y0, x1, y1 = item.box
+            offset = item.shadow_offset
+            if offset:
+                draw.rounded_rectangle(
+                    [x0 + offset, y0 + offset, x1 + offset, y1 + offset], item.radius, fill=item.shadow_fill
+                )
+            draw.rounded_rectangle(
+                [x0, y0, x1, y1], item.radius, fill=item.fill, outline=item.outline, width=item.width
+            )
+
+    if layout.height != image.height:
+        image = image.crop((0, 0, layout.width, layout.height))
+    return image
@@ -0,0 +1,206 @@
+"""渲染缓存 - 按渲染输入的哈希缓存编码后的图片
+
+菜单只取决于配置、角色卡只取决于（角色, 编号, 队友），
+相同输入的图片只绘制一次，之后直接返回字节。
+内存层为有上限的LRU；设置磁盘目录后另有磁盘层，重启后仍可命中。
+磁盘层同样有文件数上限（按最近使用时间淘汰）；含玩家昵称等只在一局内有用的图片
+以 disk=False 写入，只进内存层。
+"""
+import hashlib
+import io
+import json
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Optional
+
+from astrbot.api import logger
+from PIL import Image
+
+from .menu import draw_menu_image
+from .role_card import draw_role_card
+from .styles import _resolve_font_path
+
+# 内存层最多缓存的图片数
+RENDER_CACHE_SIZE = 64
+
+# 磁盘层最多保留的图片数，及每写入多少张检查一次
+DISK_CACHE_MAX_FILES = 512
+DISK_PRUNE_INTERVAL = 32
+
+# 绘图代码的版本号：修改了图片样式时递增，使磁盘上的旧图失效
+RENDER_VERSION = 4
+
+
+def encode_png(image: Image.Image) -> bytes:
+    """把图片编码为PNG字节"""
+    buffer = io.BytesIO()
+    image.save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+class RenderCache:
+    """以内容哈希为键的渲染缓存（线程安全）"""
+
+    def __init__(
+        self,
+        max_entries: int = RENDER_CACHE_SIZE,
+        disk_dir: Optional[str] = None,
+        max_disk_files: int = DISK_CACHE_MAX_FILES
+    ):
+        self.max_entries = max_entries
+        self.disk_dir = disk_dir
+        self.max_disk_files = max_disk_files
+        self._entries: "OrderedDict[str, bytes]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._disk_writes = 0
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    def set_disk_dir(self, disk_dir: Optional[str]) -> None:
+        """设置磁盘层目录（None 表示只用内存），并淘汰超出上限的旧图"""
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+        self.disk_dir = disk_dir
+        self.prune_disk()
+
+    @staticmethod
+    def make_key(name: str, *inputs: Any) -> str:
+        """由图片类型、渲染输入、绘图版本和字体计算缓存键"""
+        payload = json.dumps(
+            [name, RENDER_VERSION, os.path.basename(_resolve_font_path() or ""), inputs],
+            ensure_ascii=False, sort_keys=True, default=str
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _disk_path(self, key: str) -> str:
+        # 编码格式随方案而定，文件不带图片扩展名
+        return os.path.join(self.disk_dir, f"{key}.img")
+
+    def peek(self, key: str) -> Optional[bytes]:
+        """只查内存层（不读盘，可在事件循环中直接调用）"""
+        with self._lock:
+            data = self._entries.get(key)
+            if data is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+            return data
+
+    def get(self, key: str, disk: bool = True) -> Optional[bytes]:
+        """查找缓存：先查内存，再查磁盘（磁盘命中后提升到内存；disk=False 只查内存）"""
+        data = self.peek(key)
+        if data is not None:
+            return data
+
+        data = self._read_disk(key) if disk else None
+        if data is None:
+            with self._lock:
+                self.misses += 1
+            return None
+
+        self._remember(key, data)
+        with self._lock:
+            self.disk_hits += 1
+        return data
+
+    def _read_disk(self, key: str) -> Optional[bytes]:
+        if not self.disk_dir:
+            return None
+        path = self._disk_path(key)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+            # 更新修改时间，淘汰时按最近使用排序
+            os.utime(path)
+            return data
+        except FileNotFoundError:
+            return None
+        except OSError as e:
+            logger.warning(f"[狼人杀] 读取渲染缓存失败: {e}")
+            return None
+
+    def put(self, key: str, data: bytes, disk: bool = True) -> None:
+        """写入缓存（磁盘层先写临时文件再替换，避免读到半张图；disk=False 只写内存）"""
+        self._remember(key, data)
+        if not self.disk_dir or not disk:
+            return
+        path = self._disk_path(key)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"[狼人杀] 写入渲染缓存失败: {e}")
+            return
+
+        with self._lock:
+            self._disk_writes += 1
+            due = self._disk_writes % DISK_PRUNE_INTERVAL == 0
+        if due:
+            self.prune_disk()
+
+    def prune_disk(self) -> int:
+        """按最近使用时间删除超出上限的磁盘缓存，返回删除的文件数"""
+        if not self.disk_dir:
+            return 0
+        try:
+            entries = []
+            for entry in os.scandir(self.disk_dir):
+                if entry.is_file() and entry.name.endswith(".img"):
+                    entries.append((entry.stat().st_mtime, entry.path))
+        except OSError as e:
+            logger.warning(f"[狼人杀] 读取渲染缓存目录失败: {e}")
+            return 0
+
+        removed = 0
+        entries.sort()
+        for _, path in entries[:max(0, len(entries) - self.max_disk_files)]:
+            try:
+                os.remove(path)
+                removed += 1
+            except OSError:
+                continue
+        return removed
+
+    def _remember(self, key: str, data: bytes) -> None:
+        with self._lock:
+            self._entries[key] = data
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def get_or_render(self, key: str, render: Callable[[], Image.Image], disk: bool = True) -> bytes:
+        """命中则直接返回字节，否则绘制、编码并写入缓存"""
+        data = self.get(key, disk)
+        if data is not None:
+            return data
+
+        data = encode_png(render())
+        self.put(key, data, disk)
+        return data
+
+    def clear(self) -> None:
+        """清空内存层（磁盘层保留）"""
+        with self._lock:
+            self._entries.clear()
+
+
+# 插件内共享的渲染缓存（磁盘目录由查询命令处理器设置）
+render_cache = RenderCache()
+
+
+def render_menu_png(total_players: int = 9) -> bytes:
+    """帮助菜单图片（PNG字节）"""
+    key = RenderCache.make_key("menu", total_players)
+    return render_cache.get_or_render(key, lambda: draw_menu_image(total_players))
+
+
+def render_role_card_png(role_name: str, player_number: int = None, teammates: list = None) -> bytes:
+    """角色卡片图片（PNG字节）"""
+    key = RenderCache.make_key("role_card", role_name, player_number, list(teammates or []))
+    # 含队友昵称的卡片只在本局有用，不写入磁盘
+    return render_cache.get_or_render(
+        key, lambda: draw_role_card(role_name, player_number, teammates), disk=not teammates
+    )
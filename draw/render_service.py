@@ -0,0 +1,179 @@
+"""异步渲染服务 - 在线程池中绘图和编码，不阻塞事件循环
+
+所有图片都通过 render() 获取编码后的图片字节（编码方案见 encoding.py）：
+内存缓存命中时直接返回；否则交给有上限的线程池绘制，
+同一时刻相同输入的请求只绘制一次，其余请求等待同一结果。
+"""
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional
+
+from astrbot.api import logger
+from PIL import Image
+
+from .encoding import ImageEncoder
+from .game_status import draw_game_status, draw_night_result, draw_vote_result
+from .menu import draw_menu_image
+from .render_cache import RenderCache, render_cache
+from .role_card import draw_role_card
+
+# 绘图线程数（PIL的缩放与编码会释放GIL，少量线程即可）
+RENDER_WORKERS = 2
+
+# 单张图片绘制耗时目标（毫秒，不含编码），超出时记录调试日志
+RENDER_TARGET_MS = 5.0
+
+
+@dataclass
+class RenderStats:
+    """某类图片的绘制耗时统计（毫秒）"""
+    count: int = 0
+    draw_total_ms: float = 0.0
+    draw_max_ms: float = 0.0
+    encode_total_ms: float = 0.0
+    over_target: int = 0
+
+    @property
+    def draw_avg_ms(self) -> float:
+        return self.draw_total_ms / self.count if self.count else 0.0
+
+    @property
+    def encode_avg_ms(self) -> float:
+        return self.encode_total_ms / self.count if self.count else 0.0
+
+
+class RenderService:
+    """异步渲染服务"""
+
+    def __init__(self, workers: int = RENDER_WORKERS, cache: RenderCache = render_cache):
+        self.workers = workers
+        self.cache = cache
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._inflight: Dict[str, "asyncio.Future[bytes]"] = {}
+        self._stats: Dict[str, RenderStats] = {}
+        self._stats_lock = threading.Lock()
+        self.encoder = ImageEncoder()
+
+    def set_encoding(self, profile: str) -> None:
+        """设置编码方案（方案名或自动模式），缓存键随方案变化"""
+        self.encoder = ImageEncoder(profile)
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        # 延迟创建，插件卸载后再次使用时重新创建
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=max(1, self.workers), thread_name_prefix="werewolf-render"
+            )
+        return self._executor
+
+    async def render(
+        self,
+        name: str,
+        draw_fn: Callable[..., Image.Image],
+        *inputs: Any,
+        cache: bool = True,
+        persist: bool = True
+    ) -> bytes:
+        """渲染图片并返回编码后的字节
+
+        inputs 既是 draw_fn 的参数也是缓存键的一部分；
+        cache=False 用于每次内容都不同的图片（只去重并发请求，不写入缓存）；
+        persist=False 用于含玩家昵称等只在一局内有用的图片（只进内存缓存，不写磁盘）。
+        """
+        key = RenderCache.make_key(f"{name}@{self.encoder.profile}", *inputs)
+        if cache:
+            data = self.cache.peek(key)
+            if data is not None:
+                return data
+
+        pending = self._inflight.get(key)
+        if pending is None:
+            pending = asyncio.get_running_loop().run_in_executor(
+                self._get_executor(), self._job, key, name, draw_fn, inputs, cache, persist
+            )
+            self._inflight[key] = pending
+            pending.add_done_callback(lambda _: self._inflight.pop(key, None))
+
+        # shield：某个请求被取消时不影响等待同一结果的其他请求
+        return await asyncio.shield(pending)
+
+    def _job(
+        self, key: str, name: str, draw_fn: Callable[..., Image.Image], inputs: tuple, cache: bool, persist: bool
+    ) -> bytes:
+        """查磁盘缓存、绘制并编码（在线程池中运行），记录绘制与编码耗时"""
+        if cache:
+            data = self.cache.get(key, persist)
+            if data is not None:
+                return data
+
+        start = time.perf_counter()
+        image = draw_fn(*inputs)
+        drawn = time.perf_counter()
+        data = self.encoder.encode(name, image)
+        draw_ms = (drawn - start) * 1000
+        self._record(name, draw_ms, (time.perf_counter() - drawn) * 1000)
+        if draw_ms > RENDER_TARGET_MS:
+            logger.debug(f"[狼人杀] 绘制 {name} 耗时 {draw_ms:.1f}ms，超过目标 {RENDER_TARGET_MS:.0f}ms")
+
+        if cache:
+            self.cache.put(key, data, persist)
+        return data
+
+    def _record(self, name: str, draw_ms: float, encode_ms: float) -> None:
+        with self._stats_lock:
+            stats = self._stats.setdefault(name, RenderStats())
+            stats.count += 1
+            stats.draw_total_ms += draw_ms
+            stats.encode_total_ms += encode_ms
+            stats.draw_max_ms = max(stats.draw_max_ms, draw_ms)
+            if draw_ms > RENDER_TARGET_MS:
+                stats.over_target += 1
+
+    def stats(self) -> Dict[str, RenderStats]:
+        """各类图片的绘制耗时统计"""
+        with self._stats_lock:
+            return {name: RenderStats(**vars(stats)) for name, stats in self._stats.items()}
+
+    async def render_menu(self, total_players: int = 9) -> bytes:
+        """帮助菜单图片"""
+        return await self.render("menu", draw_menu_image, total_players)
+
+    async def render_role_card(self, role_name: str, player_number: int = None, teammates: list = None) -> bytes:
+        """角色卡片图片（含队友昵称的狼人卡片不写入磁盘缓存）"""
+        return await self.render(
+            "role_card", draw_role_card, role_name, player_number, list(teammates or []), persist=not teammates
+        )
+
+    async def render_status(
+        self, phase: str, day_count: int, players: List[dict], alive_count: int, total_count: int
+    ) -> bytes:
+        """游戏状态图片（每次内容不同，不缓存）"""
+        return await self.render(
+            "status", draw_game_status, phase, day_count, players, alive_count, total_count, cache=False
+        )
+
+    async def render_vote_result(self, vote_data: List[dict], exiled_player: Optional[str] = None, is_pk: bool = False) -> bytes:
+        """投票结果图片（每次内容不同，不缓存）"""
+        return await self.render("vote_result", draw_vote_result, vote_data, exiled_player, is_pk, cache=False)
+
+    async def render_night_result(
+        self, killed_player: Optional[str] = None, poisoned_player: Optional[str] = None, saved: bool = False
+    ) -> bytes:
+        """天亮结算图片（含玩家昵称时不写入磁盘缓存）"""
+        return await self.render(
+            "night_result", draw_night_result, killed_player, poisoned_player, saved,
+            persist=not (killed_player or poisoned_player)
+        )
+
+    def shutdown(self) -> None:
+        """关闭线程池（不等待进行中的绘制）"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+
+# 插件内共享的渲染服务
+render_service = RenderService()
@@ -1,4 +1,7 @@
 """角色卡片图片生成"""
+import threading
+from typing import Dict, Tuple
+
 from PIL import Image, ImageDraw
 from .styles import (
     load_font,
@@ -17,6 +20,7 @@ from .styles import (
     COLOR_EVIL_CAMP,
 )
 from .gradient_utils import create_vertical_gradient
+from .layout import wrap_items
 
 # 角色配置
 ROLE_CONFIG = {
@@ -84,24 +88,77 @@ ROLE_CONFIG = {
 }
 
 
-def draw_role_card(role_name: str, player_number: int = None, teammates: list = None) -> Image.Image:
-    """
-    生成角色卡片图片
+# 卡片尺寸
+CARD_WIDTH = 500
 
-    Args:
-        role_name: 角色名称（狼人/预言家/女巫/猎人/平民）
-        player_number: 玩家编号
-        teammates: 队友列表（狼人专用）
+# 狼队友的行高（队友多或昵称长时折行，卡片随之加高）
+TEAMMATE_LINE_HEIGHT = 24
 
-    Returns:
-        PIL Image 对象
+
+class RoleCardAtlas:
+    """角色卡片图集
+
+    每种（角色, 是否有编号, 队友行数）布局的背景、图标、阵营、描述、技能提示和底部提示
+    只绘制一次作为模板；每张玩家卡片只需复制模板并写上编号与队友。
     """
+
+    def __init__(self):
+        self._templates: Dict[Tuple[str, bool, int], Tuple[Image.Image, int, int]] = {}
+        self._lock = threading.Lock()
+
+    def build(self) -> int:
+        """预先绘制所有角色的常用模板（插件加载时调用），返回模板数"""
+        for role_name in ROLE_CONFIG:
+            self._template(role_name, True, 0)
+            if role_name == "狼人":
+                self._template(role_name, True, 1)
+        return len(self._templates)
+
+    def _template(self, role_name: str, has_number: bool, teammate_lines: int) -> Tuple[Image.Image, int, int]:
+        """获取模板，返回（图片, 编号行y, 第一行队友y）"""
+        key = (role_name, has_number, teammate_lines)
+        template = self._templates.get(key)
+        if template is None:
+            with self._lock:
+                template = self._templates.get(key)
+                if template is None:
+                    template = self._templates[key] = _draw_template(role_name, has_number, teammate_lines)
+        return template
+
+    def render(self, role_name: str, player_number: int = None, teammates: list = None) -> Image.Image:
+        """在模板上写入编号与队友，得到玩家的角色卡片"""
+        text_font = load_font(16)
+        teammate_lines = ()
+        if role_name == "狼人" and teammates:
+            teammate_lines = wrap_items(tuple(teammates), text_font, CARD_WIDTH - 40, "🐺 你的狼队友：")
+        template, number_y, teammate_y = self._template(role_name, bool(player_number), len(teammate_lines))
+
+        image = template.copy()
+        draw = ImageDraw.Draw(image, "RGBA")
+
+        # 玩家编号
+        if player_number:
+            draw.text((CARD_WIDTH // 2, number_y), f"你是 {player_number} 号玩家", fill=COLOR_TEXT_LIGHT, font=text_font, anchor="mm")
+
+        # 狼人队友信息（放不下时折行，不省略任何队友）
+        for index, line in enumerate(teammate_lines):
+            draw.text(
+                (CARD_WIDTH // 2, teammate_y + index * TEAMMATE_LINE_HEIGHT),
+                line, fill=COLOR_WEREWOLF, font=text_font, anchor="mm"
+            )
+
+        return image
+
+
+def _draw_template(role_name: str, has_number: bool, teammate_lines: int) -> Tuple[Image.Image, int, int]:
+    """绘制角色卡片中不随玩家变化的部分（队友区按 teammate_lines 行留空）"""
     config = ROLE_CONFIG.get(role_name)
     if not config:
         config = ROLE_CONFIG["平民"]
 
-    width = 500
-    height = 400 if role_name != "狼人" or not teammates else 450
+    width = CARD_WIDTH
+    extra_lines = max(teammate_lines - 1, 0)
+    height = 450 + extra_lines * TEAMMATE_LINE_HEIGHT if teammate_lines else 400
 
     # 加载字体
     title_font = load_font(32)
@@ -122,10 +179,10 @@ def draw_role_card(role_name: str, player_number: int = None, teammates: list =
     y += 45
     draw.text((width // 2, y), config["camp"], fill=config["camp_color"], font=subtitle_font, anchor="mm")
 
-    # 玩家编号
-    if player_number:
-        y += 30
-        draw.text((width // 2, y), f"你是 {player_number} 号玩家", fill=COLOR_TEXT_LIGHT, font=text_font, anchor="mm")
+    # 玩家编号（位置留空，出图时写入）
+    number_y = y + 30
+    if has_number:
+        y = number_y
 
     # 分割线
     y += 30
@@ -167,11 +224,10 @@ def draw_role_card(role_name: str, player_number: int = None, teammates: list =
 
     y = card_y1 + 15
 
-    # 狼人队友信息
-    if role_name == "狼人" and teammates:
-        teammate_text = "🐺 你的狼队友：" + "、".join(teammates)
-        draw.text((width // 2, y), teammate_text, fill=COLOR_WEREWOLF, font=text_font, anchor="mm")
-        y += 30
+    # 狼人队友信息（位置留空，出图时写入）
+    teammate_y = y
+    if teammate_lines:
+        y += 30 + extra_lines * TEAMMATE_LINE_HEIGHT
 
     # 底部提示
     y = max(y, height - 35)
@@ -188,4 +244,23 @@ def draw_role_card(role_name: str, player_number: int = None, teammates: list =
     if final_height < height:
         image = image.crop((0, 0, width, final_height))
 
-    return image
+    return image, number_y, teammate_y
+
+
+# 插件内共享的角色卡片图集
+role_card_atlas = RoleCardAtlas()
+
+
+def draw_role_card(role_name: str, player_number: int = None, teammates: list = None) -> Image.Image:
+    """
+    生成角色卡片图片
+
+    Args:
+        role_name: 角色名称（狼人/预言家/女巫/猎人/平民）
+        player_number: 玩家编号
+        teammates: 队友列表（狼人专用）
+
+    Returns:
+        PIL Image 对象
+    """
+    return role_card_atlas.render(role_name, player_number, teammates)
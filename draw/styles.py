@@ -1,5 +1,8 @@
 """狼人杀插件样式配置 - 暗夜狼嚎主题"""
 import os
+from functools import lru_cache
+from typing import Iterable, Optional
+
 from PIL import ImageFont
 
 # --- 基础配置 ---
@@ -67,30 +70,92 @@ FONT_PATH_BOLD = os.path.join(
     "..", "..", "astrbot_plugin_fishing", "draw", "resource", "DouyinSansBold.otf"
 )
 
+# 系统字体（钓鱼插件字体不可用时按顺序尝试）
+SYSTEM_FONT_PATHS = [
+    "/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf",
+    "/usr/share/fonts/truetype/wqy/wqy-zenhei.ttc",
+    "/usr/share/fonts/opentype/noto/NotoSansCJK-Bold.ttc",
+]
 
-def load_font(size: int) -> ImageFont.FreeTypeFont:
-    """加载字体，失败则使用默认字体"""
-    try:
-        if os.path.exists(FONT_PATH_BOLD):
-            return ImageFont.truetype(FONT_PATH_BOLD, size)
-    except IOError:
-        pass
-
-    # 尝试系统字体
-    system_fonts = [
-        "/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf",
-        "/usr/share/fonts/truetype/wqy/wqy-zenhei.ttc",
-        "/usr/share/fonts/opentype/noto/NotoSansCJK-Bold.ttc",
-    ]
-    for font_path in system_fonts:
+# 字体对象缓存上限（按 路径+字号 缓存）
+FONT_CACHE_SIZE = 32
+
+# 各绘图函数用到的字号，启动时预加载
+WARMUP_FONT_SIZES = (14, 16, 17, 18, 20, 24, 26, 28, 32, 36, 40)
+
+# pin_font 使用该名称时固定为 Pillow 自带字体（任何安装了 Pillow 的环境都可用）
+DEFAULT_FONT = "default"
+
+# 解析出的字体路径：未解析为 _UNRESOLVED，无可用字体为 None
+_UNRESOLVED = object()
+_font_path = _UNRESOLVED
+
+
+def _resolve_font_path() -> Optional[str]:
+    """按优先级找到第一个能打开的字体文件，只在进程内解析一次"""
+    global _font_path
+    if _font_path is not _UNRESOLVED:
+        return _font_path
+
+    _font_path = None
+    for font_path in [FONT_PATH_BOLD] + SYSTEM_FONT_PATHS:
         try:
             if os.path.exists(font_path):
-                return ImageFont.truetype(font_path, size)
+                _load_truetype(font_path, WARMUP_FONT_SIZES[0])
+                _font_path = font_path
+                break
         except IOError:
             continue
+    return _font_path
+
+
+@lru_cache(maxsize=FONT_CACHE_SIZE)
+def _load_truetype(font_path: str, size: int) -> ImageFont.FreeTypeFont:
+    return ImageFont.truetype(font_path, size)
+
+
+@lru_cache(maxsize=FONT_CACHE_SIZE)
+def _load_default_font(size: int) -> ImageFont.ImageFont:
+    try:
+        # Pillow 10.1 起自带可缩放的默认字体
+        return ImageFont.load_default(size)
+    except TypeError:
+        return ImageFont.load_default()
+
+
+def load_font(size: int) -> ImageFont.FreeTypeFont:
+    """加载字体（按字号缓存），失败则使用默认字体"""
+    font_path = _resolve_font_path()
+    if font_path:
+        try:
+            return _load_truetype(font_path, size)
+        except IOError:
+            pass
 
     # 最后使用默认字体
-    return ImageFont.load_default()
+    return _load_default_font(size)
+
+
+def pin_font(font_path: str) -> str:
+    """固定使用指定字体（不再按优先级查找），使绘图结果不依赖本机安装的字体
+
+    用于基准测试与视觉回归；font_path 为 DEFAULT_FONT 时固定为 Pillow 自带字体，
+    字体无法打开时抛出 IOError。
+    """
+    global _font_path
+    if font_path == DEFAULT_FONT:
+        _font_path = None
+        return font_path
+    _load_truetype(font_path, WARMUP_FONT_SIZES[0])
+    _font_path = font_path
+    return font_path
+
+
+def warm_up_fonts(sizes: Iterable[int] = WARMUP_FONT_SIZES) -> Optional[str]:
+    """解析字体路径并预加载常用字号，返回使用的字体路径（None 表示使用默认字体）"""
+    for size in sizes:
+        load_font(size)
+    return _resolve_font_path()
 
 
 def get_role_color(role_name: str) -> tuple:
@@ -4,7 +4,7 @@ from astrbot.api.event import AstrMessageEvent
 from astrbot.api import logger
 
 from .base import BaseCommandHandler
-from ..models import GamePhase
+from ..models import GamePhase, EventType
 
 if TYPE_CHECKING:
     from ..services import GameManager
@@ -174,10 +174,7 @@ class DayCommandHandler(BaseCommandHandler):
         voter = room.get_player(player_id)
         target = room.get_player(target_id)
         is_pk = room.vote_state.is_pk_vote
-        if is_pk:
-            room.log(f"🗳️ PK投票：{voter.display_name} 投给 {target.display_name}")
-        else:
-            room.log(f"🗳️ {voter.display_name} 投票给 {target.display_name}")
+        room.record(EventType.DAY_VOTE, actor=player_id, target=target_id, pk=is_pk)
 
         # 同步投票到所有AI玩家上下文
         for p in room.players.values():
@@ -5,7 +5,7 @@ from astrbot.api.event import AstrMessageEvent
 from astrbot.api import logger
 
 from .base import BaseCommandHandler
-from ..models import GamePhase, Role
+from ..models import GamePhase, Role, EventType
 
 if TYPE_CHECKING:
     from ..services import GameManager
@@ -56,7 +56,7 @@ class NightCommandHandler(BaseCommandHandler):
 
         # 记录日志
         target_player = room.get_player(target_id)
-        room.log(f"🐺 {player.display_name}（狼人）选择刀 {target_player.display_name}")
+        room.record(EventType.WOLF_VOTE, actor=player_id, target=target_id)
 
         # 同步刀人选择到AI狼人队友上下文
         for teammate in room.get_alive_werewolves():
@@ -143,7 +143,7 @@ class NightCommandHandler(BaseCommandHandler):
         import time
         room.wolf_last_chat_time = time.time()
 
-        room.log(f"💬 {player.display_name}（狼人）密谋：{message_text}")
+        room.record(EventType.WOLF_CHAT, actor=player_id, text=message_text)
         yield event.plain_result(f"✅ 消息已发送给 {success_count} 名队友！")
 
     async def seer_check(self, event: AstrMessageEvent) -> AsyncGenerator:
@@ -189,10 +189,9 @@ class NightCommandHandler(BaseCommandHandler):
 
         if is_werewolf:
             result_msg = f"🔮 验人结果：\n\n玩家 {target_player.display_name} 是 🐺 狼人！"
-            room.log(f"🔮 {player.display_name}（预言家）验 {target_player.display_name}：狼人")
         else:
             result_msg = f"🔮 验人结果：\n\n玩家 {target_player.display_name} 是 ✅ 好人！"
-            room.log(f"🔮 {player.display_name}（预言家）验 {target_player.display_name}：好人")
+        room.record(EventType.SEER_CHECK, actor=player_id, target=target_id, is_werewolf=bool(is_werewolf))
 
         yield event.plain_result(result_msg)
 
@@ -238,7 +237,7 @@ class NightCommandHandler(BaseCommandHandler):
         witch_state.has_acted = True
 
         saved_player = room.get_player(room.last_killed_id)
-        room.log(f"💊 {player.display_name}（女巫）使用解药救了 {saved_player.display_name}")
+        room.record(EventType.WITCH_SAVE, actor=player_id, target=room.last_killed_id)
 
         yield event.plain_result(f"✅ 你使用解药救了 {saved_player.display_name}！")
 
@@ -298,7 +297,7 @@ class NightCommandHandler(BaseCommandHandler):
         witch_state.has_acted = True
 
         target_player = room.get_player(target_id)
-        room.log(f"💊 {player.display_name}（女巫）使用毒药毒了 {target_player.display_name}")
+        room.record(EventType.WITCH_POISON, actor=player_id, target=target_id)
 
         yield event.plain_result(f"✅ 你使用毒药毒了 {target_player.display_name}！")
 
@@ -330,7 +329,7 @@ class NightCommandHandler(BaseCommandHandler):
             return
 
         witch_state.has_acted = True
-        room.log(f"💊 {player.display_name}（女巫）选择不操作")
+        room.record(EventType.WITCH_PASS, actor=player_id)
 
         yield event.plain_result("✅ 你选择不操作！")
 
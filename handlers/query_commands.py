@@ -1,8 +1,10 @@
 """查询命令处理"""
 import os
+import time
 from typing import TYPE_CHECKING, AsyncGenerator
 from astrbot.api.event import AstrMessageEvent
 from astrbot.api import logger
+from astrbot.core.message.components import Image
 from astrbot.core.utils.astrbot_path import get_astrbot_data_path
 
 from .base import BaseCommandHandler
@@ -12,6 +14,9 @@ from ..roles import RoleFactory
 if TYPE_CHECKING:
     from ..services import GameManager
 
+# 运维命令每类最多列出的操作数
+OPS_LIST_LIMIT = 10
+
 
 class QueryCommandHandler(BaseCommandHandler):
     """查询命令处理器"""
@@ -22,6 +27,9 @@ class QueryCommandHandler(BaseCommandHandler):
         self.tmp_dir = os.path.join(get_astrbot_data_path(), "werewolf_temp")
         os.makedirs(self.tmp_dir, exist_ok=True)
 
+        from ..draw import render_cache
+        render_cache.set_disk_dir(os.path.join(self.tmp_dir, "render_cache"))
+
     async def check_role(self, event: AstrMessageEvent) -> AsyncGenerator:
         """查看角色（返回文本）"""
         player_id = event.get_sender_id()
@@ -45,7 +53,7 @@ class QueryCommandHandler(BaseCommandHandler):
         yield event.plain_result(f"🎭 你的角色是：\n\n{role_info}")
 
     async def show_status(self, event: AstrMessageEvent) -> AsyncGenerator:
-        """显示游戏状态（返回文本）"""
+        """显示游戏状态（图片模式下返回图片，否则返回文本）"""
         group_id = event.get_group_id()
         if not group_id:
             yield event.plain_result("❌ 请在群聊中使用此命令！")
@@ -69,6 +77,22 @@ class QueryCommandHandler(BaseCommandHandler):
             status_icon = "✅" if p.is_alive else "💀"
             status_text += f"  {status_icon} {p.number}号 - {p.name or f'玩家{p.number}'}\n"
 
+        if room.config.image_mode:
+            try:
+                from ..draw import render_service
+
+                players = [
+                    {"number": p.number, "name": p.name or f"玩家{p.number}", "alive": p.is_alive}
+                    for p in sorted(room.players.values(), key=lambda p: p.number)
+                ]
+                data = await render_service.render_status(
+                    room.phase.value, room.day_count, players, room.alive_count, room.player_count
+                )
+                yield event.chain_result([Image.fromBytes(data)])
+                return
+            except Exception as e:
+                logger.warning(f"[狼人杀] 生成状态图片失败: {e}，降级为文本")
+
         yield event.plain_result(status_text)
 
     async def show_player_numbers(self, event: AstrMessageEvent) -> AsyncGenerator:
@@ -100,13 +124,11 @@ class QueryCommandHandler(BaseCommandHandler):
 
         # 尝试生成菜单图片
         try:
-            from ..draw import draw_menu_image
+            from ..draw import render_service
 
-            image = draw_menu_image(config.total_players)
-            output_path = os.path.join(self.tmp_dir, "werewolf_menu.png")
-            image.save(output_path)
-
-            yield event.image_result(output_path)
+            # 菜单只取决于人数配置，重复请求直接取缓存的PNG字节；未命中时在线程池中绘制
+            data = await render_service.render_menu(config.total_players)
+            yield event.chain_result([Image.fromBytes(data)])
         except Exception as e:
             logger.warning(f"[狼人杀] 生成菜单图片失败: {e}，降级为文本")
             # 降级到文本菜单
@@ -142,3 +164,37 @@ class QueryCommandHandler(BaseCommandHandler):
                 "• 好人胜利：狼人全部出局"
             )
             yield event.plain_result(help_text)
+
+    async def show_ops(self, event: AstrMessageEvent) -> AsyncGenerator:
+        """查看重试队列中待重试与死信的群操作（管理员）"""
+        queue = self.game_manager.retry_queue
+        if not queue:
+            yield event.plain_result("❌ 未启用重试队列！")
+            return
+
+        now = time.time()
+        pending = queue.pending()
+        dead = queue.dead_letters()
+
+        text = f"🛠️ 狼人杀运维\n\n房间数：{len(self.game_manager.rooms)}\n\n待重试操作：{len(pending)}\n"
+        for op in pending[:OPS_LIST_LIMIT]:
+            text += (
+                f"  • {op.describe()} 已重试{op.attempts}次，"
+                f"{max(0, op.next_at - now):.0f}秒后重试（{op.last_error}）\n"
+            )
+        text += f"\n死信：{len(dead)}\n"
+        for op in dead[-OPS_LIST_LIMIT:]:
+            text += f"  • {op.describe()} 重试{op.attempts}次失败（{op.last_error}）\n"
+
+        from ..draw import render_service
+
+        render_stats = render_service.stats()
+        if render_stats:
+            text += "\n绘图耗时（平均/最大，毫秒）：\n"
+            for name, stats in render_stats.items():
+                text += (
+                    f"  • {name} ×{stats.count}：绘制 {stats.draw_avg_ms:.1f}/{stats.draw_max_ms:.1f}，"
+                    f"编码 {stats.encode_avg_ms:.1f}\n"
+                )
+
+        yield event.plain_result(text.rstrip())
@@ -4,12 +4,15 @@
 神职：预言家 + 女巫 + 猎人
 流程：创建房间 → 分配角色 → 夜晚（狼人办掉→预言家验人→女巫行动） → 白天投票 → 判断胜负
 """
+import os
 from astrbot.api.star import Context, Star, register
 from astrbot.api import logger
 from astrbot.api.event import filter, AstrMessageEvent
 from astrbot.core.star.filter.permission import PermissionType
+from astrbot.core.utils.astrbot_path import get_astrbot_data_path
 
 from .models import GameConfig
+from .draw import render_service, role_card_atlas, warm_up_fonts
 from .services import GameManager
 from .handlers import (
     RoomCommandHandler,
@@ -32,7 +35,8 @@ class WerewolfPlugin(Star):
         self.game_config = self._load_config(config)
 
         # 初始化游戏管理器
-        self.game_manager = GameManager(context, self.game_config)
+        data_dir = os.path.join(get_astrbot_data_path(), "werewolf_rooms")
+        self.game_manager = GameManager(context, self.game_config, data_dir)
 
         # 初始化命令处理器
         self.room_handler = RoomCommandHandler(self.game_manager)
@@ -40,9 +44,42 @@ class WerewolfPlugin(Star):
         self.day_handler = DayCommandHandler(self.game_manager)
         self.query_handler = QueryCommandHandler(self.game_manager)
 
+        # 预加载字体，首次绘图不再读盘解析
+        font_path = warm_up_fonts()
+        if not font_path:
+            logger.warning("[狼人杀] 未找到可用字体，图片将使用默认字体")
+
+        render_service.set_encoding(self.game_config.image_format)
+
+        # 预先绘制角色卡片模板，开局发卡只需叠加编号与队友
+        if self.game_config.image_mode:
+            role_card_atlas.build()
+
         # 日志
         self._log_startup()
 
+    async def initialize(self):
+        """插件加载完成后恢复上次保存的房间，撤销遗留的群操作，并启动失败操作重试"""
+        try:
+            await self.game_manager.restore_rooms()
+        except Exception as e:
+            logger.error(f"[狼人杀] 恢复房间失败: {e}")
+
+        try:
+            await self.game_manager.reconcile_side_effects()
+        except Exception as e:
+            logger.error(f"[狼人杀] 副作用对账失败: {e}")
+
+        # 没有房间的群不再重放遗留操作（其群状态已由上面的对账撤销）
+        if self.game_manager.retry_queue:
+            try:
+                await self.game_manager.retry_queue.discard_orphans(
+                    set(self.game_manager.rooms) | self.game_manager.pending_restore_groups
+                )
+            except Exception as e:
+                logger.error(f"[狼人杀] 清理重试队列失败: {e}")
+            self.game_manager.retry_queue.start()
+
     def _load_config(self, config: dict) -> GameConfig:
         """加载并验证配置"""
         game_config = GameConfig.from_dict(config)
@@ -235,6 +272,13 @@ class WerewolfPlugin(Star):
         async for result in self.query_handler.show_help(event):
             yield result
 
+    @filter.permission_type(PermissionType.ADMIN)
+    @filter.command("狼人杀运维")
+    async def show_ops(self, event: AstrMessageEvent):
+        """查看待重试与死信的群操作（管理员专用）"""
+        async for result in self.query_handler.show_ops(event):
+            yield result
+
     # ==================== 事件监听 ====================
 
     @filter.event_message_type(filter.EventMessageType.GROUP_MESSAGE)
@@ -244,6 +288,25 @@ class WerewolfPlugin(Star):
 
     async def terminate(self):
         """插件终止时"""
+        # 取消尚未完成的AI复盘（被取消的复盘仍会投递结算内容）
+        await self.game_manager.ai_reviewer.cancel_all()
+
+        # 再把队列中的群消息发完
+        await self.game_manager.message_service.outbox.drain()
+
+        # 停止重试任务（待重试操作已持久化，下次加载时继续）
+        if self.game_manager.retry_queue:
+            await self.game_manager.retry_queue.stop()
+
+        # 关闭绘图线程池
+        render_service.shutdown()
+
+        # 启用持久化时保存快照，下次加载时恢复对局
+        if self.game_manager.room_store:
+            await self.game_manager.suspend_rooms()
+            logger.info("[狼人杀] 插件已终止，进行中的房间已保存")
+            return
+
         # 清理所有房间
         for group_id in list(self.game_manager.rooms.keys()):
             await self.game_manager.cleanup_room(group_id)
@@ -2,8 +2,9 @@
 from .enums import GamePhase, Role
 from .config import GameConfig
 from .player import Player
-from .room import GameRoom, VoteState, SpeakingState
+from .room import GameRoom, VoteState, SpeakingState, GroupState
 from .ai_player import AIPlayerConfig, AIPlayerContext
+from .journal import EventType, GameEvent, GameJournal
 
 __all__ = [
     "GamePhase",
@@ -13,6 +14,10 @@ __all__ = [
     "GameRoom",
     "VoteState",
     "SpeakingState",
+    "GroupState",
     "AIPlayerConfig",
     "AIPlayerContext",
+    "EventType",
+    "GameEvent",
+    "GameJournal",
 ]
@@ -27,14 +27,33 @@ class GameConfig:
 
     # 禁言配置
     ban_duration_days: int = 30
+    group_op_concurrency: int = 5       # 批量群操作并发上限
+    group_op_timeout: int = 10          # 单次群操作超时（秒）
+
+    # 持久化配置
+    persist_rooms: bool = True          # 是否保存房间快照（重启后恢复对局）
 
     # AI玩家配置
     ai_player_model: str = ""
+    llm_concurrency: int = 4            # 插件内LLM调用并发上限（AI玩家决策优先，复盘最多占一半）
+    ai_delay_scale: float = 1.0         # AI思考延迟倍率（仿真对局设为0）
 
     # AI复盘配置
     enable_ai_review: bool = True
     ai_review_model: str = ""
     ai_review_prompt: str = ""
+    ai_review_timeout: int = 120        # AI复盘超时（秒）
+    ai_review_token_budget: int = 6000  # 复盘输入token预算，超出时分段摘要后合并
+    merge_end_game_output: bool = False  # 结算内容（身份、摘要、复盘）打包为一条合并转发消息
+
+    # 图片配置
+    image_mode: bool = False            # 角色卡片、游戏状态、天亮结算和投票结果以图片发送
+    image_format: str = "auto"          # 图片编码方案（auto 在无损PNG方案中按体积与耗时自动选择）
+
+    def __setstate__(self, state: dict) -> None:
+        """从房间快照反序列化时，为旧快照中缺少的新配置项补默认值"""
+        self.__dict__.update(GameConfig().__dict__)
+        self.__dict__.update(state)
 
     def get_roles_pool(self) -> List[Role]:
         """获取角色池"""
@@ -92,10 +111,19 @@ class GameConfig:
             timeout_dead_min=config.get("timeout_dead_min", 10),
             timeout_dead_max=config.get("timeout_dead_max", 15),
             ban_duration_days=config.get("ban_duration_days", 30),
+            group_op_concurrency=config.get("group_op_concurrency", 5),
+            group_op_timeout=config.get("group_op_timeout", 10),
+            persist_rooms=config.get("persist_rooms", True),
             ai_player_model=config.get("ai_player_model", ""),
+            llm_concurrency=config.get("llm_concurrency", 4),
             enable_ai_review=config.get("enable_ai_review", True),
             ai_review_model=config.get("ai_review_model", ""),
             ai_review_prompt=config.get("ai_review_prompt", ""),
+            ai_review_timeout=config.get("ai_review_timeout", 120),
+            ai_review_token_budget=config.get("ai_review_token_budget", 6000),
+            merge_end_game_output=config.get("merge_end_game_output", False),
+            image_mode=config.get("image_mode", False),
+            image_format=config.get("image_format", "auto"),
         )
 
     @classmethod
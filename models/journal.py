@@ -0,0 +1,217 @@
+"""游戏事件日志 - 只追加的类型化事件流"""
+import time
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import Any, Dict, Iterator, List, Optional
+
+
+class EventType(Enum):
+    """事件类型"""
+    GAME_START = "game_start"       # 开局（随机种子、座位与身份）
+    ROUND_START = "round_start"     # 新的一晚
+    PHASE = "phase"                 # 阶段切换
+    WOLF_CHAT = "wolf_chat"         # 狼人密谋
+    WOLF_VOTE = "wolf_vote"         # 狼人投刀
+    WOLF_KILL = "wolf_kill"         # 狼人刀人结算
+    SEER_CHECK = "seer_check"       # 预言家验人
+    WITCH_SAVE = "witch_save"       # 女巫救人
+    WITCH_POISON = "witch_poison"   # 女巫毒人
+    WITCH_PASS = "witch_pass"       # 女巫不操作
+    HUNTER_SHOT = "hunter_shot"     # 猎人开枪（target为空表示不开枪）
+    SPEECH = "speech"               # 白天发言
+    LAST_WORDS = "last_words"       # 遗言
+    DAY_VOTE = "day_vote"           # 白天投票（target为空表示弃票）
+    VOTE_RESULT = "vote_result"     # 投票结果（target为空表示平票）
+    DEATH = "death"                 # 玩家死亡
+    NOTE = "note"                   # 自由文本
+
+
+# 死亡原因显示文本
+DEATH_CAUSES = {
+    "wolf": "被狼人杀害",
+    "poison": "被女巫毒杀",
+    "vote": "被投票放逐",
+    "shot": "被猎人带走",
+}
+
+
+@dataclass(frozen=True)
+class GameEvent:
+    """游戏事件（不可变）"""
+    offset: int                          # 在日志中的偏移量（单调递增）
+    type: EventType                      # 事件类型
+    round: int                           # 发生时的回合数
+    actor: Optional[str] = None          # 行动者玩家ID
+    target: Optional[str] = None         # 目标玩家ID
+    data: Dict[str, Any] = field(default_factory=dict)  # 附加数据
+    timestamp: float = 0.0               # 发生时间
+
+    def to_dict(self) -> dict:
+        """转换为可序列化字典"""
+        return {
+            "offset": self.offset,
+            "type": self.type.value,
+            "round": self.round,
+            "actor": self.actor,
+            "target": self.target,
+            "data": self.data,
+            "timestamp": self.timestamp,
+        }
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "GameEvent":
+        """从字典还原事件"""
+        return cls(
+            offset=d["offset"],
+            type=EventType(d["type"]),
+            round=d["round"],
+            actor=d.get("actor"),
+            target=d.get("target"),
+            data=d.get("data", {}),
+            timestamp=d.get("timestamp", 0.0),
+        )
+
+
+class GameJournal:
+    """游戏事件日志
+
+    只允许追加，每个事件带单调递增的偏移量。
+    可读日志与AI复盘输入都是事件流的投影（render）。
+    """
+
+    def __init__(self):
+        self._events: List[GameEvent] = []
+
+    def append(
+        self,
+        event_type: EventType,
+        round: int,
+        actor: Optional[str] = None,
+        target: Optional[str] = None,
+        data: Optional[Dict[str, Any]] = None
+    ) -> GameEvent:
+        """追加事件"""
+        event = GameEvent(
+            offset=len(self._events),
+            type=event_type,
+            round=round,
+            actor=actor,
+            target=target,
+            data=data or {},
+            timestamp=time.time(),
+        )
+        self._events.append(event)
+        return event
+
+    def __len__(self) -> int:
+        return len(self._events)
+
+    def __iter__(self) -> Iterator[GameEvent]:
+        return iter(self._events)
+
+    @property
+    def next_offset(self) -> int:
+        """下一个事件的偏移量"""
+        return len(self._events)
+
+    def since(self, offset: int) -> List[GameEvent]:
+        """获取从指定偏移量开始的事件"""
+        return self._events[offset:]
+
+    def of_type(self, *event_types: EventType) -> List[GameEvent]:
+        """按类型筛选事件"""
+        return [e for e in self._events if e.type in event_types]
+
+    def to_list(self) -> List[dict]:
+        """导出为字典列表"""
+        return [e.to_dict() for e in self._events]
+
+    @classmethod
+    def from_list(cls, records: List[dict]) -> "GameJournal":
+        """从字典列表还原"""
+        journal = cls()
+        journal._events = [GameEvent.from_dict(r) for r in records]
+        return journal
+
+    # ========== 投影 ==========
+
+    def render(self, events: Optional[List[GameEvent]] = None) -> List[str]:
+        """渲染为可读日志（每行一条）
+
+        座位信息来自 GAME_START 事件，渲染部分事件时也会先扫描完整日志。
+        """
+        seats: Dict[str, dict] = {}
+        for e in self._events:
+            if e.type == EventType.GAME_START:
+                seats = e.data.get("seats", {})
+
+        lines: List[str] = []
+        for e in (self._events if events is None else events):
+            lines.extend(_render_event(e, seats))
+        return lines
+
+
+def _render_event(e: GameEvent, seats: Dict[str, dict]) -> List[str]:
+    """渲染单个事件"""
+    def name(player_id: Optional[str]) -> str:
+        seat = seats.get(player_id or "")
+        if not seat:
+            return player_id or "?"
+        return f"{seat['number']}号.{seat['name']}"
+
+    def tag(player_id: Optional[str], role_name: str) -> str:
+        seat = seats.get(player_id or "", {})
+        return f"（{role_name}AI）" if seat.get("is_ai") else f"（{role_name}）"
+
+    actor, target, data = e.actor, e.target, e.data
+    t = e.type
+
+    if t == EventType.ROUND_START:
+        return ["=" * 30, f"第{e.round}晚", "=" * 30]
+    if t == EventType.WOLF_CHAT:
+        return [f"💬 {name(actor)}{tag(actor, '狼人')}密谋：{data.get('text', '')}"]
+    if t == EventType.WOLF_VOTE:
+        if data.get("fallback"):
+            return [f"🐺 狼人AI兜底：选择刀 {name(target)}"]
+        how = "随机选择刀" if data.get("random") else "选择刀"
+        return [f"🐺 {name(actor)}{tag(actor, '狼人')}{how} {name(target)}"]
+    if t == EventType.WOLF_KILL:
+        if not target:
+            return ["🐺 狼人超时：未投票，今晚无人被刀"]
+        return [f"🌙 狼人最终决定刀 {name(target)}"]
+    if t == EventType.SEER_CHECK:
+        result = "狼人" if data.get("is_werewolf") else "好人"
+        return [f"🔮 {name(actor)}{tag(actor, '预言家')}验 {name(target)}：{result}"]
+    if t == EventType.WITCH_SAVE:
+        return [f"💊 {name(actor)}{tag(actor, '女巫')}使用解药救了 {name(target)}"]
+    if t == EventType.WITCH_POISON:
+        return [f"💊 {name(actor)}{tag(actor, '女巫')}使用毒药毒了 {name(target)}"]
+    if t == EventType.WITCH_PASS:
+        return [f"💊 {name(actor)}{tag(actor, '女巫')}选择不操作"]
+    if t == EventType.HUNTER_SHOT:
+        if target:
+            return [f"🔫 {name(actor)}{tag(actor, '猎人')}开枪带走 {name(target)}"]
+        if data.get("timeout"):
+            return [f"🔫 {name(actor)}{tag(actor, '猎人')}超时未开枪"]
+        return [f"🔫 {name(actor)}{tag(actor, '猎人')}选择不开枪"]
+    if t == EventType.SPEECH:
+        phase_tag = "💬PK发言" if data.get("pk") else "💬发言"
+        return [f"{phase_tag}：{name(actor)} - {data.get('text') or '[未捕获到文字内容]'}"]
+    if t == EventType.LAST_WORDS:
+        return [f"💀遗言：{name(actor)} - {data.get('text') or '[未捕获到文字内容]'}"]
+    if t == EventType.DAY_VOTE:
+        pk_tag = "PK" if data.get("pk") else ""
+        ai_tag = "（AI）" if seats.get(actor or "", {}).get("is_ai") else ""
+        if not target:
+            reason = "（目标无效）" if data.get("invalid") else ""
+            return [f"🗳️ {pk_tag}投票：{name(actor)}{ai_tag} 弃票{reason}"]
+        return [f"🗳️ {pk_tag}投票：{name(actor)}{ai_tag} 投给 {name(target)}"]
+    if t == EventType.VOTE_RESULT:
+        if not target:
+            return ["📊 PK投票结果：仍然平票，本轮无人出局"]
+        return [f"📊 投票结果：{name(target)} 被放逐"]
+    if t == EventType.DEATH:
+        return [f"☠️ {name(target)} {DEATH_CAUSES.get(data.get('cause', ''), '死亡')}"]
+    if t == EventType.NOTE:
+        return [data.get("text", "")]
+    return []
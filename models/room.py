@@ -2,10 +2,13 @@
 from dataclasses import dataclass, field
 from typing import Dict, Set, List, Optional, Any, TYPE_CHECKING
 import asyncio
+import random
+import time
 from threading import Lock
 from .enums import GamePhase, Role
 from .player import Player
 from .config import GameConfig
+from .journal import GameJournal, EventType, GameEvent
 
 if TYPE_CHECKING:
     from ..roles import WitchState, HunterState
@@ -46,6 +49,15 @@ class SpeakingState:
         self.current_speech.clear()
 
 
+@dataclass
+class GroupState:
+    """群状态（既用于描述期望状态，也用于记录已确认的状态）"""
+    whole_ban: Optional[bool] = None                       # 全员禁言（None表示未知）
+    banned: Set[str] = field(default_factory=set)          # 被禁言的玩家
+    admins: Set[str] = field(default_factory=set)          # 临时管理员
+    cards: Dict[str, str] = field(default_factory=dict)    # 群昵称 {玩家ID: 昵称}
+
+
 @dataclass
 class GameRoom:
     """游戏房间"""
@@ -54,6 +66,8 @@ class GameRoom:
     config: GameConfig                                   # 游戏配置
     msg_origin: Any = None                               # 消息源（用于主动发送）
     bot: Any = None                                      # Bot实例
+    transport: Any = None                                # 传输层（Transport，为空时不发送消息、不修改群状态）
+    seed: Optional[int] = None                           # 随机种子（为空时自动生成）
 
     # 玩家管理
     players: Dict[str, Player] = field(default_factory=dict)  # {玩家ID: Player}
@@ -86,16 +100,20 @@ class GameRoom:
     vote_state: VoteState = field(default_factory=VoteState)
     speaking_state: SpeakingState = field(default_factory=SpeakingState)
 
-    # 管理状态
-    banned_player_ids: Set[str] = field(default_factory=set)   # 被禁言的玩家
-    temp_admin_ids: Set[str] = field(default_factory=set)      # 临时管理员
+    # 管理状态（OneBot已确认的群状态，用于只发送差异调用）
+    group_state: GroupState = field(default_factory=GroupState)
 
     # 定时器
     timer_task: Optional[asyncio.Task] = None
+    phase_deadline: Optional[float] = None               # 当前定时器截止时间戳（用于重启后恢复）
 
-    # 游戏日志
-    game_log: List[str] = field(default_factory=list)
+    # 游戏事件日志（只追加）
+    journal: GameJournal = field(default_factory=GameJournal)
+    review_notes: Dict[int, str] = field(default_factory=dict)  # AI复盘每轮要点 {回合: 要点}
     
+    # 随机数生成器（每个房间独立，由seed决定，可复现对局）
+    rng: random.Random = field(default=None, init=False, repr=False)
+
     # 并发控制
     _lock: Lock = field(default_factory=Lock, init=False)  # 用于保护共享状态的锁
 
@@ -106,6 +124,9 @@ class GameRoom:
             self.witch_state = WitchState()
         if self.hunter_state is None:
             self.hunter_state = HunterState()
+        if self.seed is None:
+            self.seed = random.getrandbits(32)
+        self.rng = random.Random(self.seed)
 
     # ========== 玩家管理方法 ==========
 
@@ -156,13 +177,15 @@ class GameRoom:
         player = self.get_player(player_id)
         return player.is_alive if player else False
 
-    def kill_player(self, player_id: str) -> Optional[Player]:
-        """杀死玩家"""
+    def kill_player(self, player_id: str, cause: str = "") -> Optional[Player]:
+        """杀死玩家（cause: wolf/poison/vote/shot）"""
         with self._lock:
             player = self.get_player(player_id)
             if player:
                 player.kill()
-            return player
+        if player:
+            self.record(EventType.DEATH, target=player_id, cause=cause)
+        return player
 
     @property
     def player_count(self) -> int:
@@ -214,9 +237,12 @@ class GameRoom:
     # ========== 阶段管理方法 ==========
 
     def set_phase(self, phase: GamePhase) -> None:
-        """设置游戏阶段"""
+        """设置游戏阶段（阶段变化时记录事件）"""
         with self._lock:
+            changed = self.phase != phase
             self.phase = phase
+        if changed:
+            self.record(EventType.PHASE, phase=phase.name)
 
     def is_phase(self, phase: GamePhase) -> bool:
         """判断当前阶段"""
@@ -244,7 +270,7 @@ class GameRoom:
     def start_new_night(self) -> None:
         """开始新的夜晚"""
         self.current_round += 1
-        self.phase = GamePhase.NIGHT_WOLF
+        self.set_phase(GamePhase.NIGHT_WOLF)
         self.seer_checked = False
         self.last_killed_id = None
         self.witch_state.reset_night()
@@ -262,6 +288,7 @@ class GameRoom:
         if self.timer_task and not self.timer_task.done():
             self.timer_task.cancel()
             self.timer_task = None
+        self.phase_deadline = None
         
         # 取消狼人AI投票任务
         if hasattr(self, 'wolf_ai_vote_task') and self.wolf_ai_vote_task and not self.wolf_ai_vote_task.done():
@@ -273,26 +300,50 @@ class GameRoom:
             self.wolf_ai_process_task.cancel()
             self.wolf_ai_process_task = None
 
-    def set_timer(self, task: asyncio.Task) -> None:
-        """设置定时器"""
+    def set_timer(self, task: asyncio.Task, timeout: Optional[float] = None) -> None:
+        """设置定时器（timeout用于记录截止时间）"""
         self.cancel_timer()
         self.timer_task = task
+        if timeout is not None:
+            self.phase_deadline = time.time() + timeout
 
     # ========== 日志方法 ==========
 
-    def log(self, message: str) -> None:
-        """添加游戏日志"""
-        self.game_log.append(message)
+    def record(
+        self,
+        event_type: EventType,
+        actor: Optional[str] = None,
+        target: Optional[str] = None,
+        **data
+    ) -> GameEvent:
+        """追加游戏事件"""
+        return self.journal.append(event_type, self.current_round, actor, target, data)
 
-    def log_separator(self) -> None:
-        """添加分隔线"""
-        self.game_log.append("=" * 30)
+    def log(self, message: str) -> None:
+        """添加自由文本日志"""
+        self.record(EventType.NOTE, text=message)
 
     def log_round_start(self) -> None:
         """记录回合开始"""
-        self.log_separator()
-        self.log(f"第{self.current_round}晚")
-        self.log_separator()
+        self.record(EventType.ROUND_START)
+
+    def record_game_start(self) -> None:
+        """记录开局座位与身份"""
+        seats = {
+            p.id: {
+                "number": p.number,
+                "name": p.name,
+                "role": p.role.value if p.role else "",
+                "is_ai": p.is_ai,
+            }
+            for p in self.players.values()
+        }
+        self.record(EventType.GAME_START, seed=self.seed, seats=seats)
+
+    @property
+    def game_log(self) -> List[str]:
+        """可读游戏日志（事件日志的投影）"""
+        return self.journal.render()
 
     # ========== 目标解析方法 ==========
 
@@ -40,9 +40,10 @@ class BasePhase(ABC):
 
     async def start_timer(self, room: "GameRoom", timeout: float = None) -> None:
         """启动定时器"""
-        timeout = timeout or self.timeout_seconds
+        if timeout is None:
+            timeout = self.timeout_seconds
         task = asyncio.create_task(self._timer_task(room, timeout))
-        room.set_timer(task)
+        room.set_timer(task, timeout)
 
     async def _timer_task(self, room: "GameRoom", timeout: float) -> None:
         """定时器任务"""
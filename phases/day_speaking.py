@@ -5,7 +5,7 @@ from typing import TYPE_CHECKING
 from astrbot.api import logger
 
 from .base import BasePhase
-from ..models import GamePhase
+from ..models import GamePhase, EventType
 from ..services import BanService
 
 if TYPE_CHECKING:
@@ -28,7 +28,7 @@ class DaySpeakingPhase(BasePhase):
 
     async def on_enter(self, room: "GameRoom") -> None:
         """进入发言阶段"""
-        room.phase = GamePhase.DAY_SPEAKING
+        room.set_phase(GamePhase.DAY_SPEAKING)
 
         # 设置发言顺序（按编号排序）
         alive_players = room.get_alive_players()
@@ -100,8 +100,7 @@ class DaySpeakingPhase(BasePhase):
             if len(full_speech) > 200:
                 full_speech = full_speech[:200] + "..."
 
-            phase_tag = "💬PK发言" if is_pk else "💬发言"
-            room.log(f"{phase_tag}：{player.display_name} - {full_speech}")
+            room.record(EventType.SPEECH, actor=player.id, text=full_speech, pk=is_pk)
 
             logger.info(f"[记录发言] 开始同步发言到AI上下文，内容={full_speech[:50]}...")
 
@@ -114,8 +113,7 @@ class DaySpeakingPhase(BasePhase):
 
             logger.info(f"[记录发言] 完成，已同步到 {ai_sync_count} 个AI")
         else:
-            phase_tag = "💬PK发言" if is_pk else "💬发言"
-            room.log(f"{phase_tag}：{player.display_name} - [未捕获到文字内容]")
+            room.record(EventType.SPEECH, actor=player.id, text="", pk=is_pk)
             logger.warning(f"[记录发言] ⚠️ {player.display_name} 的发言内容为空！")
 
         # 清空缓存
@@ -252,7 +250,7 @@ class DaySpeakingPhase(BasePhase):
 
     async def enter_pk_phase(self, room: "GameRoom", pk_player_ids: list) -> None:
         """进入PK发言阶段"""
-        room.phase = GamePhase.DAY_PK
+        room.set_phase(GamePhase.DAY_PK)
         room.vote_state.pk_players = pk_player_ids
         room.speaking_state.current_index = 0
         room.vote_state.is_pk_vote = False
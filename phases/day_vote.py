@@ -5,7 +5,7 @@ from typing import TYPE_CHECKING, Dict, List
 from astrbot.api import logger
 
 from .base import BasePhase
-from ..models import GamePhase, Role
+from ..models import GamePhase, Role, EventType
 from ..roles import HunterDeathType
 from ..services import BanService
 
@@ -32,7 +32,7 @@ class DayVotePhase(BasePhase):
 
     async def on_enter(self, room: "GameRoom") -> None:
         """进入投票阶段"""
-        room.phase = GamePhase.DAY_VOTE
+        room.set_phase(GamePhase.DAY_VOTE)
         room.vote_state.day_votes.clear()
         room.day_ai_voted = False  # AI是否已投票
         room.vote_discussion = []  # 投票阶段讨论记录
@@ -72,7 +72,7 @@ class DayVotePhase(BasePhase):
 
     async def enter_pk_vote(self, room: "GameRoom") -> None:
         """进入PK投票"""
-        room.phase = GamePhase.DAY_VOTE
+        room.set_phase(GamePhase.DAY_VOTE)
         room.vote_state.is_pk_vote = True
         room.vote_state.day_votes.clear()
         room.day_ai_voted = False
@@ -119,8 +119,6 @@ class DayVotePhase(BasePhase):
         if not ai_players:
             return
 
-        pk_tag = "PK" if is_pk else ""
-
         # ===== 第一阶段：所有AI依次发言 =====
         logger.info(f"[狼人杀] 群 {room.group_id} AI投票讨论开始，共 {len(ai_players)} 个AI")
         for player in ai_players:
@@ -184,7 +182,7 @@ class DayVotePhase(BasePhase):
                         )
 
                         # 记录日志
-                        room.log(f"🗳️ {pk_tag}投票：{player.display_name}（AI）投给 {target_player.display_name}")
+                        room.record(EventType.DAY_VOTE, actor=player.id, target=target_player.id, pk=is_pk)
                         logger.info(f"[狼人杀] AI玩家 {player.name} 投票给 {target_player.display_name}")
 
                         # 记录到所有AI上下文
@@ -208,10 +206,10 @@ class DayVotePhase(BasePhase):
             try:
                 timeout = self.timeout_seconds
 
-                # 计算AI行动时间点（超时前30秒）
-                ai_action_delay = max(timeout - AI_VOTE_BEFORE_TIMEOUT_SECONDS, 10)
+                # 计算AI行动时间点（超时前30秒；超时时间较短时不晚于超时）
+                ai_action_delay = min(max(timeout - AI_VOTE_BEFORE_TIMEOUT_SECONDS, 10), timeout)
 
-                if has_ai and timeout > AI_VOTE_BEFORE_TIMEOUT_SECONDS:
+                if has_ai:
                     # 等待到AI行动时间点
                     await asyncio.sleep(ai_action_delay)
 
@@ -254,7 +252,7 @@ class DayVotePhase(BasePhase):
                 logger.error(f"[狼人杀] 群 {room.group_id} 投票定时器异常: {e}")
 
         task = asyncio.create_task(vote_timer())
-        room.set_timer(task)
+        room.set_timer(task, self.timeout_seconds)
 
     async def _check_all_voted(self, room: "GameRoom") -> bool:
         """检查是否所有人都投票了"""
@@ -337,7 +335,7 @@ class DayVotePhase(BasePhase):
                 await speaking_phase.enter_pk_phase(room, room.vote_state.pk_players)
             else:
                 # PK后仍平票，无人出局
-                room.log("📊 PK投票结果：仍然平票，本轮无人出局")
+                room.record(EventType.VOTE_RESULT, target=None, pk=True)
                 await self._enter_night(room)
             return
 
@@ -360,7 +358,7 @@ class DayVotePhase(BasePhase):
             )
 
             # 记录日志
-            room.log(f"📊 投票结果：{exiled_player.display_name} 被放逐")
+            room.record(EventType.VOTE_RESULT, target=exiled_player.id, pk=room.vote_state.is_pk_vote)
             logger.info(f"[狼人杀] 群 {room.group_id} 投票结果：{exiled_player.display_name} 被放逐")
 
             # 同步放逐信息到AI上下文
@@ -368,9 +366,11 @@ class DayVotePhase(BasePhase):
                 if p.is_ai and p.ai_context:
                     p.ai_context.add_event(f"投票结果：{exiled_player.display_name} 被放逐")
 
-            # 处理被放逐玩家
+            # 处理被放逐玩家（遗言阶段按 last_killed_id 找到发言人，结束后进入夜晚）
             room.vote_state.exiled_player = exiled_player
             exiled_player.is_alive = False
+            room.last_killed_id = exiled_player.id
+            room.last_words_from_vote = True
 
             # 检查游戏是否结束
             if await self.game_manager.check_and_handle_victory(room):
@@ -379,6 +379,8 @@ class DayVotePhase(BasePhase):
             # 检查角色特殊能力
             if exiled_player.role == Role.HUNTER:
                 # 猎人开枪
+                room.hunter_state.pending_shot_player_id = exiled_player.id
+                room.hunter_state.death_type = HunterDeathType.VOTE
                 await self._wait_for_hunter_shot(room)
                 return
 
@@ -435,8 +437,6 @@ class DayVotePhase(BasePhase):
         if not ai_players:
             return
 
-        pk_tag = "PK" if is_pk else ""
-
         # ===== 第一阶段：所有AI依次发言 =====
         logger.info(f"[狼人杀] 群 {room.group_id} AI投票讨论开始，共 {len(ai_players)} 个AI")
         for player in ai_players:
@@ -504,7 +504,7 @@ class DayVotePhase(BasePhase):
                         )
 
                         # 记录日志
-                        room.log(f"🗳️ {pk_tag}投票：{player.display_name}（AI）投给 {target_player.display_name}")
+                        room.record(EventType.DAY_VOTE, actor=player.id, target=target_player.id, pk=is_pk)
                         logger.info(f"[狼人杀] AI玩家 {player.name} 投票给 {target_player.display_name}")
 
                         # 记录到所有AI上下文
@@ -517,7 +517,7 @@ class DayVotePhase(BasePhase):
                         await self.message_service.send_group_message(
                             room, f"🗳️ {player.display_name} 选择弃票"
                         )
-                        room.log(f"🗳️ {pk_tag}投票：{player.display_name}（AI）弃票（目标无效）")
+                        room.record(EventType.DAY_VOTE, actor=player.id, target=None, pk=is_pk, invalid=True)
                         logger.info(f"[狼人杀] AI玩家 {player.name} 投票目标无效，转为弃票")
                 else:
                     # AI选择弃票 - 记录为投给"ABSTAIN"表示弃票
@@ -525,7 +525,7 @@ class DayVotePhase(BasePhase):
                     await self.message_service.send_group_message(
                         room, f"🗳️ {player.display_name} 选择弃票"
                     )
-                    room.log(f"🗳️ {pk_tag}投票：{player.display_name}（AI）弃票")
+                    room.record(EventType.DAY_VOTE, actor=player.id, target=None, pk=is_pk)
                     logger.info(f"[狼人杀] AI玩家 {player.name} 选择弃票")
 
             except Exception as e:
@@ -1,12 +1,11 @@
 """遗言阶段"""
-import asyncio
-import random
 from typing import TYPE_CHECKING
 from astrbot.api import logger
 
 from .base import BasePhase
-from ..models import GamePhase
+from ..models import GamePhase, EventType
 from ..services import BanService
+from ..utils import ai_think_delay
 
 if TYPE_CHECKING:
     from ..models import GameRoom
@@ -28,7 +27,7 @@ class LastWordsPhase(BasePhase):
 
     async def on_enter(self, room: "GameRoom") -> None:
         """进入遗言阶段"""
-        room.phase = GamePhase.LAST_WORDS
+        room.set_phase(GamePhase.LAST_WORDS)
 
         # 检查是否有被杀玩家
         if not room.last_killed_id:
@@ -70,7 +69,7 @@ class LastWordsPhase(BasePhase):
         ai_service = self.game_manager.ai_player_service
 
         # 延迟模拟思考
-        await asyncio.sleep(random.uniform(3, 6))
+        await ai_think_delay(room, 3, 6)
 
         # 生成遗言
         last_words = await ai_service.generate_last_words(player, room)
@@ -137,14 +136,14 @@ class LastWordsPhase(BasePhase):
             full_speech = " ".join(speech_list)
             if len(full_speech) > 200:
                 full_speech = full_speech[:200] + "..."
-            room.log(f"💀遗言：{player.display_name} - {full_speech}")
+            room.record(EventType.LAST_WORDS, actor=player.id, text=full_speech)
 
             # 同步遗言到所有AI玩家上下文
             for p in room.players.values():
                 if p.is_ai and p.ai_context:
                     p.ai_context.add_event(f"遗言 {player.display_name}：{full_speech}")
         else:
-            room.log(f"💀遗言：{player.display_name} - [未捕获到文字内容]")
+            room.record(EventType.LAST_WORDS, actor=player.id, text="")
 
         # 清空缓存
         room.speaking_state.current_speech.clear()
@@ -1,11 +1,10 @@
 """夜晚-预言家验人阶段"""
-import asyncio
-import random
 from typing import TYPE_CHECKING
 from astrbot.api import logger
 
 from .base import BasePhase
-from ..models import GamePhase, Role
+from ..models import GamePhase, Role, EventType
+from ..utils import ai_think_delay
 
 if TYPE_CHECKING:
     from ..models import GameRoom
@@ -27,7 +26,7 @@ class NightSeerPhase(BasePhase):
 
     async def on_enter(self, room: "GameRoom") -> None:
         """进入预言家验人阶段"""
-        room.phase = GamePhase.NIGHT_SEER
+        room.set_phase(GamePhase.NIGHT_SEER)
         room.seer_checked = False
 
         seer = room.get_seer()
@@ -53,7 +52,7 @@ class NightSeerPhase(BasePhase):
         if seer.is_alive:
             wait_time = self.timeout_seconds
         else:
-            wait_time = random.uniform(
+            wait_time = room.rng.uniform(
                 self.game_manager.config.timeout_dead_min,
                 self.game_manager.config.timeout_dead_max
             )
@@ -69,7 +68,7 @@ class NightSeerPhase(BasePhase):
         ai_service.update_ai_context(seer, room)
 
         # 延迟模拟思考
-        await asyncio.sleep(random.uniform(3, 6))
+        await ai_think_delay(room, 3, 6)
 
         # AI决策验人目标
         target_number = await ai_service.decide_seer_check(seer, room)
@@ -85,7 +84,7 @@ class NightSeerPhase(BasePhase):
 
                 # 记录日志
                 result_str = "狼人" if is_werewolf else "好人"
-                room.log(f"🔮 {seer.display_name}（预言家AI）验 {target_player.display_name}：{result_str}")
+                room.record(EventType.SEER_CHECK, actor=seer.id, target=target_player.id, is_werewolf=is_werewolf)
                 logger.info(f"[狼人杀] AI预言家 {seer.name} 验 {target_player.display_name}：{result_str}")
 
         room.seer_checked = True
@@ -1,14 +1,13 @@
 """夜晚-女巫行动阶段"""
-import asyncio
-import random
 from typing import TYPE_CHECKING
 from astrbot.api import logger
 
 from .base import BasePhase
-from ..models import GamePhase, Role
+from ..models import GamePhase, Role, EventType
 from ..roles import HunterDeathType
 from ..services import BanService
 from ..roles import WitchRole
+from ..utils import ai_think_delay
 
 if TYPE_CHECKING:
     from ..models import GameRoom
@@ -30,7 +29,7 @@ class NightWitchPhase(BasePhase):
 
     async def on_enter(self, room: "GameRoom") -> None:
         """进入女巫行动阶段"""
-        room.phase = GamePhase.NIGHT_WITCH
+        room.set_phase(GamePhase.NIGHT_WITCH)
         room.witch_state.reset_night()
 
         witch = room.get_witch()
@@ -68,7 +67,7 @@ class NightWitchPhase(BasePhase):
         ai_service.update_ai_context(witch, room)
 
         # 延迟模拟思考
-        await asyncio.sleep(random.uniform(3, 6))
+        await ai_think_delay(room, 3, 6)
 
         # 判断可用操作
         can_save = not witch_state.antidote_used and room.last_killed_id is not None
@@ -90,7 +89,7 @@ class NightWitchPhase(BasePhase):
             witch_state.saved_player_id = room.last_killed_id
             witch_state.antidote_used = True
             witch_state.has_acted = True
-            room.log(f"💊 {witch.display_name}（女巫AI）使用解药救了 {killed_player_name}")
+            room.record(EventType.WITCH_SAVE, actor=witch.id, target=room.last_killed_id)
             logger.info(f"[狼人杀] AI女巫 {witch.name} 救了 {killed_player_name}")
             # 记录到女巫的AI上下文
             if witch.ai_context:
@@ -103,7 +102,7 @@ class NightWitchPhase(BasePhase):
                 witch_state.poisoned_player_id = target_player.id
                 witch_state.poison_used = True
                 witch_state.has_acted = True
-                room.log(f"💊 {witch.display_name}（女巫AI）使用毒药毒了 {target_player.display_name}")
+                room.record(EventType.WITCH_POISON, actor=witch.id, target=target_player.id)
                 logger.info(f"[狼人杀] AI女巫 {witch.name} 毒了 {target_player.display_name}")
                 # 记录到女巫的AI上下文
                 if witch.ai_context:
@@ -111,7 +110,7 @@ class NightWitchPhase(BasePhase):
 
         else:
             witch_state.has_acted = True
-            room.log(f"💊 {witch.display_name}（女巫AI）选择不操作")
+            room.record(EventType.WITCH_PASS, actor=witch.id)
             logger.info(f"[狼人杀] AI女巫 {witch.name} 不操作")
 
         await self._finish_night(room)
@@ -120,7 +119,7 @@ class NightWitchPhase(BasePhase):
         """计算等待时间"""
         witch = room.get_witch()
         if not witch:
-            return random.uniform(
+            return room.rng.uniform(
                 self.game_manager.config.timeout_dead_min,
                 self.game_manager.config.timeout_dead_max
             )
@@ -132,7 +131,7 @@ class NightWitchPhase(BasePhase):
         if witch_alive or witch_killed_tonight:
             return self.timeout_seconds
         else:
-            return random.uniform(
+            return room.rng.uniform(
                 self.game_manager.config.timeout_dead_min,
                 self.game_manager.config.timeout_dead_max
             )
@@ -1,12 +1,12 @@
 """夜晚-狼人行动阶段"""
 import asyncio
-import random
 import time
 from typing import TYPE_CHECKING
 from astrbot.api import logger
 
 from .base import BasePhase
-from ..models import GamePhase, Role
+from ..models import GamePhase, Role, EventType
+from ..utils import ai_think_delay
 
 if TYPE_CHECKING:
     from ..models import GameRoom
@@ -31,7 +31,7 @@ class NightWolfPhase(BasePhase):
 
     async def on_enter(self, room: "GameRoom") -> None:
         """进入狼人行动阶段"""
-        room.phase = GamePhase.NIGHT_WOLF
+        room.set_phase(GamePhase.NIGHT_WOLF)
         room.seer_checked = False
         room.vote_state.clear_night_votes()
 
@@ -139,11 +139,11 @@ class NightWolfPhase(BasePhase):
         candidates = [p for p in room.get_alive_players() if p.role != Role.WEREWOLF]
 
         if candidates and alive_wolves:
-            target = random.choice(candidates)
+            target = room.rng.choice(candidates)
             # 所有狼人都投同一个目标
             for wolf in alive_wolves:
                 room.vote_state.night_votes[wolf.id] = target.id
-            room.log(f"🐺 狼人AI兜底：选择刀 {target.display_name}")
+            room.record(EventType.WOLF_VOTE, target=target.id, fallback=True)
             logger.info(f"[狼人杀] 狼人AI兜底投票: {target.display_name}")
 
     async def _ai_vote_timer(self, room: "GameRoom", delay: float) -> None:
@@ -202,7 +202,7 @@ class NightWolfPhase(BasePhase):
             ai_service.update_ai_context(wolf, room)
 
             # 延迟模拟思考
-            await asyncio.sleep(random.uniform(1, 3))
+            await ai_think_delay(room, 1, 3)
 
             # 生成密谋消息
             chat_message = await ai_service.decide_werewolf_chat(wolf, room)
@@ -210,7 +210,7 @@ class NightWolfPhase(BasePhase):
                 continue
 
             # 记录日志
-            room.log(f"💬 {wolf.display_name}（狼人AI）密谋：{chat_message}")
+            room.record(EventType.WOLF_CHAT, actor=wolf.id, text=chat_message)
             logger.info(f"[狼人杀] AI狼人 {wolf.name} 密谋：{chat_message}")
 
             # 发送给其他狼人队友
@@ -249,7 +249,7 @@ class NightWolfPhase(BasePhase):
             ai_service.update_ai_context(wolf, room)
 
             # 延迟模拟思考
-            await asyncio.sleep(random.uniform(2, 4))
+            await ai_think_delay(room, 2, 4)
 
             # AI决策击杀目标
             target_number = await ai_service.decide_werewolf_kill(wolf, room)
@@ -259,7 +259,7 @@ class NightWolfPhase(BasePhase):
                 target_player = room.get_player_by_number(target_number)
                 if target_player and target_player.is_alive and target_player.role != Role.WEREWOLF:
                     room.vote_state.night_votes[wolf.id] = target_player.id
-                    room.log(f"🐺 {wolf.display_name}（狼人AI）选择刀 {target_player.display_name}")
+                    room.record(EventType.WOLF_VOTE, actor=wolf.id, target=target_player.id)
                     logger.info(f"[狼人杀] AI狼人 {wolf.name} 选择击杀 {target_player.display_name}")
 
                     # 同步刀人选择到其他狼人AI上下文
@@ -269,9 +269,9 @@ class NightWolfPhase(BasePhase):
                     continue
 
             # 如果AI没有选择或选择无效，随机选择一个非狼人目标
-            target_player = random.choice(non_wolf_candidates)
+            target_player = room.rng.choice(non_wolf_candidates)
             room.vote_state.night_votes[wolf.id] = target_player.id
-            room.log(f"🐺 {wolf.display_name}（狼人AI）随机选择刀 {target_player.display_name}")
+            room.record(EventType.WOLF_VOTE, actor=wolf.id, target=target_player.id, random=True)
             logger.info(f"[狼人杀] AI狼人 {wolf.name} 随机击杀 {target_player.display_name}")
 
     async def _check_all_voted(self, room: "GameRoom") -> bool:
@@ -312,7 +312,7 @@ class NightWolfPhase(BasePhase):
             await self._finish_and_next(room)
         else:
             # 无投票，记录日志，直接进入预言家阶段
-            room.log("🐺 狼人超时：未投票，今晚无人被刀")
+            room.record(EventType.WOLF_KILL, target=None)
             await self._enter_seer_phase(room)
 
     async def on_human_wolves_voted(self, room: "GameRoom") -> None:
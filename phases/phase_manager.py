@@ -1,18 +1,22 @@
 """阶段管理器"""
 import asyncio
-import random
+import time
 from typing import TYPE_CHECKING
 from astrbot.api import logger
 
-from ..models import GamePhase
+from ..models import GamePhase, EventType
 from ..roles import HunterDeathType
 from ..services import BanService
 from ..roles import HunterRole
+from ..utils import ai_think_delay
 
 if TYPE_CHECKING:
     from ..models import GameRoom
     from ..services import GameManager
 
+# 恢复对局时定时器的最短剩余时间（秒），给玩家留出反应时间
+RESUME_MIN_SECONDS = 15
+
 
 class PhaseManager:
     """阶段管理器 - 协调阶段切换"""
@@ -25,6 +29,9 @@ class PhaseManager:
 
     async def enter_night_phase(self, room: "GameRoom") -> None:
         """进入夜晚阶段"""
+        # 上一轮已结束，后台整理该轮复盘要点
+        self.game_manager.ai_reviewer.note_round(room, room.current_round)
+
         room.start_new_night()
         room.log_round_start()
 
@@ -77,6 +84,47 @@ class PhaseManager:
         last_words_phase = LastWordsPhase(self.game_manager)
         await last_words_phase.on_enter(room)
 
+    # ========== 恢复对局 ==========
+
+    async def resume_room(self, room: "GameRoom") -> None:
+        """从快照恢复房间后，按保存的截止时间重新挂起定时器"""
+        from .night_wolf import NightWolfPhase
+        from .night_seer import NightSeerPhase
+        from .night_witch import NightWitchPhase
+        from .day_speaking import DaySpeakingPhase
+        from .day_vote import DayVotePhase
+        from .last_words import LastWordsPhase
+
+        # 猎人待开枪：重新提示并计时
+        if room.hunter_state.pending_shot_player_id:
+            death_type = room.hunter_state.death_type
+            await self.wait_for_hunter_shot(room, death_type.value if death_type else "wolf")
+            return
+
+        # 全AI狼人：后台任务已丢失，重新进入狼人阶段
+        if room.phase == GamePhase.NIGHT_WOLF and all(w.is_ai for w in room.get_alive_werewolves()):
+            await NightWolfPhase(self.game_manager).on_enter(room)
+            return
+
+        phase_classes = {
+            GamePhase.NIGHT_WOLF: NightWolfPhase,
+            GamePhase.NIGHT_SEER: NightSeerPhase,
+            GamePhase.NIGHT_WITCH: NightWitchPhase,
+            GamePhase.DAY_SPEAKING: DaySpeakingPhase,
+            GamePhase.DAY_PK: DaySpeakingPhase,
+            GamePhase.DAY_VOTE: DayVotePhase,
+            GamePhase.LAST_WORDS: LastWordsPhase,
+        }
+        phase_class = phase_classes.get(room.phase)
+        if not phase_class:
+            return
+
+        remaining = RESUME_MIN_SECONDS
+        if room.phase_deadline:
+            remaining = max(room.phase_deadline - time.time(), RESUME_MIN_SECONDS)
+        await phase_class(self.game_manager).start_timer(room, remaining)
+        logger.info(f"[狼人杀] 群 {room.group_id} 已恢复{room.phase.value}，剩余 {remaining:.0f} 秒")
+
     # ========== 猎人开枪 ==========
 
     async def wait_for_hunter_shot(self, room: "GameRoom", death_type: str) -> None:
@@ -122,7 +170,7 @@ class PhaseManager:
                 room.hunter_state.pending_shot_player_id = None
                 room.hunter_state.has_shot = True
 
-                room.log(f"🔫 {hunter_name}（猎人）超时未开枪")
+                room.record(EventType.HUNTER_SHOT, actor=hunter_id, target=None, timeout=True)
                 await self.message_service.send_group_message(
                     room, f"⏰ {hunter_name} 开枪超时！放弃开枪机会。"
                 )
@@ -136,14 +184,14 @@ class PhaseManager:
                 logger.error(f"[狼人杀] 猎人开枪超时处理失败: {e}")
 
         task = asyncio.create_task(hunter_timer())
-        room.set_timer(task)
+        room.set_timer(task, timeout)
 
     async def _handle_ai_hunter_shot(self, room: "GameRoom", hunter, death_type: str) -> None:
         """处理AI猎人开枪"""
         ai_service = self.game_manager.ai_player_service
 
         # 延迟模拟思考
-        await asyncio.sleep(random.uniform(2, 4))
+        await ai_think_delay(room, 2, 4)
 
         # AI决策开枪目标
         target_number = await ai_service.decide_hunter_shoot(hunter, room)
@@ -152,12 +200,12 @@ class PhaseManager:
             target_player = room.get_player_by_number(target_number)
             if target_player and target_player.is_alive and target_player.id != hunter.id:
                 # 执行开枪
-                room.kill_player(target_player.id)
+                room.kill_player(target_player.id, cause="shot")
                 room.hunter_state.has_shot = True
                 room.hunter_state.pending_shot_player_id = None
 
                 # 记录日志
-                room.log(f"🔫 {hunter.display_name}（猎人AI）开枪带走 {target_player.display_name}")
+                room.record(EventType.HUNTER_SHOT, actor=hunter.id, target=target_player.id)
                 logger.info(f"[狼人杀] AI猎人 {hunter.name} 开枪带走 {target_player.display_name}")
 
                 # 禁言被带走的玩家（跳过AI）
@@ -183,7 +231,7 @@ class PhaseManager:
         # 不开枪
         room.hunter_state.has_shot = True
         room.hunter_state.pending_shot_player_id = None
-        room.log(f"🔫 {hunter.display_name}（猎人AI）选择不开枪")
+        room.record(EventType.HUNTER_SHOT, actor=hunter.id, target=None)
         logger.info(f"[狼人杀] AI猎人 {hunter.name} 不开枪")
 
         await self.message_service.send_group_message(
@@ -206,12 +254,12 @@ class PhaseManager:
             return
 
         # 执行开枪
-        room.kill_player(target_id)
+        room.kill_player(target_id, cause="shot")
         room.hunter_state.has_shot = True
         room.hunter_state.pending_shot_player_id = None
 
         # 记录日志
-        room.log(f"🔫 {hunter.display_name}（猎人）开枪带走 {target.display_name}")
+        room.record(EventType.HUNTER_SHOT, actor=hunter_id, target=target_id)
 
         # 禁言被带走的玩家
         await BanService.ban_player(room, target_id)
@@ -1,17 +1,37 @@
 """服务层"""
+from .transport import Transport, OneBotTransport, InMemoryTransport
+from .outbox import GroupOutbox
+from .llm_limiter import LLMLimiter, llm_limiter, PRIORITY_GAMEPLAY, PRIORITY_BACKGROUND
 from .message_service import MessageService
+from .bulk import BulkResult
 from .ban_service import BanService
 from .victory_checker import VictoryChecker
-from .ai_reviewer import AIReviewer
+from .ai_reviewer import AIReviewer, GameSnapshot
+from .persistence import RoomStore
+from .ledger import SideEffectLedger
+from .retry_queue import RetryQueue
 from .game_manager import GameManager
 # AI服务已模块化重构，从新位置导入
 from .ai import AIPlayerService
 
 __all__ = [
+    "Transport",
+    "OneBotTransport",
+    "InMemoryTransport",
+    "GroupOutbox",
+    "LLMLimiter",
+    "llm_limiter",
+    "PRIORITY_GAMEPLAY",
+    "PRIORITY_BACKGROUND",
     "MessageService",
     "BanService",
+    "BulkResult",
     "VictoryChecker",
     "AIReviewer",
+    "GameSnapshot",
+    "RoomStore",
+    "SideEffectLedger",
+    "RetryQueue",
     "GameManager",
     "AIPlayerService",
 ]
@@ -4,6 +4,8 @@ import re
 from typing import Optional, TYPE_CHECKING
 from astrbot.api import logger
 
+from ...llm_limiter import llm_limiter, PRIORITY_GAMEPLAY
+
 if TYPE_CHECKING:
     from ....models import Player
 
@@ -52,23 +54,18 @@ class BaseAction:
 
         for attempt in range(max_retries):
             try:
-                response = await asyncio.wait_for(
-                    provider.text_chat(
-                        prompt=prompt,
-                        system_prompt="你是一个沉浸式狼人杀玩家。你必须完全代入你的角色，像真人一样说话，绝对不能暴露你是AI。回复要简洁自然，像在群里聊天。"
-                    ),
-                    timeout=timeout
+                result = await llm_limiter.text_chat(
+                    provider,
+                    prompt=prompt,
+                    system_prompt="你是一个沉浸式狼人杀玩家。你必须完全代入你的角色，像真人一样说话，绝对不能暴露你是AI。回复要简洁自然，像在群里聊天。",
+                    timeout=timeout,
+                    priority=PRIORITY_GAMEPLAY
                 )
 
-                if response.result_chain:
-                    result = response.result_chain.get_plain_text().strip()
-                    if result:  # 只有非空结果才返回
-                        logger.info(f"[狼人杀AI] {player.name} 决策: {result[:100]}")
-                        return result
-                    else:
-                        logger.warning(f"[狼人杀AI] {player.name} 第{attempt + 1}次调用返回空内容")
-                else:
-                    logger.warning(f"[狼人杀AI] {player.name} 第{attempt + 1}次调用返回空响应")
+                if result:  # 只有非空结果才返回
+                    logger.info(f"[狼人杀AI] {player.name} 决策: {result[:100]}")
+                    return result
+                logger.warning(f"[狼人杀AI] {player.name} 第{attempt + 1}次调用返回空内容")
 
             except asyncio.TimeoutError:
                 logger.warning(f"[狼人杀AI] {player.name} 第{attempt + 1}次调用超时（{timeout}秒）")
@@ -46,6 +46,5 @@ class SeerAction(BaseAction):
                     checked = [r.get('target_number') for r in player.ai_context.seer_results]
                     valid_targets = [t for t in valid_targets if t not in checked]
                 if valid_targets:
-                    import random
-                    return random.choice(valid_targets)
+                    return room.rng.choice(valid_targets)
         return None
@@ -1,6 +1,5 @@
 """发言行动 - 白天发言和遗言"""
 import re
-import random
 from typing import List, TYPE_CHECKING
 from astrbot.api import logger
 
@@ -28,10 +27,10 @@ class SpeechAction(BaseAction):
         super().__init__(context)
         self._player_personalities = {}
 
-    def _get_player_personality(self, player: "Player") -> str:
+    def _get_player_personality(self, player: "Player", room: "GameRoom") -> str:
         """获取或分配玩家性格"""
         if player.id not in self._player_personalities:
-            personality_key = random.choice(list(PERSONALITY_TEMPLATES.keys()))
+            personality_key = room.rng.choice(list(PERSONALITY_TEMPLATES.keys()))
             self._player_personalities[player.id] = personality_key
             logger.info(f"[狼人杀AI] 为 {player.name} 分配性格: {personality_key}")
         return PERSONALITY_TEMPLATES[self._player_personalities[player.id]]
@@ -59,7 +58,7 @@ class SpeechAction(BaseAction):
         role_key = ContextBuilder.get_role_key(player)
         role_name = player.role.display_name if player.role else "玩家"
         soul_setting = ROLE_SOUL_SETTINGS.get(role_key, "")
-        personality = self._get_player_personality(player)
+        personality = self._get_player_personality(player, room)
 
         # 增强决策系统 - 利用记忆系统
         memory_guidance = self._get_memory_guidance(player, room)
@@ -118,7 +117,7 @@ class SpeechAction(BaseAction):
             "目前信息太少了，我再观察一下",
             "emmm 我暂时没什么想法",
         ]
-        return random.choice(defaults)
+        return room.rng.choice(defaults)
 
     def _get_memory_guidance(self, player: "Player", room: "GameRoom") -> str:
         """基于记忆系统提供决策指导"""
@@ -49,8 +49,7 @@ class WerewolfAction(BaseAction):
                 wolf_numbers = [w.number for w in wolves]
                 valid_targets = [t for t in valid_targets if t not in wolf_numbers]
                 if valid_targets:
-                    import random
-                    return random.choice(valid_targets)
+                    return room.rng.choice(valid_targets)
         return None
 
     async def decide_chat(self, player: "Player", room: "GameRoom") -> Optional[str]:
@@ -40,10 +40,10 @@ class AIPlayerService:
 
     # ==================== 性格管理 ====================
 
-    def assign_personality(self, player_id: str) -> str:
-        """预分配玩家性格并返回中文名称"""
+    def assign_personality(self, player_id: str, rng: Optional[random.Random] = None) -> str:
+        """预分配玩家性格并返回中文名称（rng为房间随机数生成器）"""
         if player_id not in self._player_personalities:
-            personality_key = random.choice(list(PERSONALITY_TEMPLATES.keys()))
+            personality_key = (rng or random).choice(list(PERSONALITY_TEMPLATES.keys()))
             self._player_personalities[player_id] = personality_key
             logger.info(f"[狼人杀AI] 为玩家 {player_id} 分配性格: {personality_key}")
         return PERSONALITY_NAMES.get(self._player_personalities[player_id], "普通")
@@ -1,70 +1,371 @@
 """AI复盘服务"""
-from typing import Optional, TYPE_CHECKING
+import asyncio
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple, TYPE_CHECKING
 from astrbot.api import logger
 
+from ..models import GameConfig, Role
+from ..utils import split_paragraphs
+from .llm_limiter import llm_limiter, PRIORITY_BACKGROUND
+
 if TYPE_CHECKING:
     from ..models import GameRoom
 
+# 每轮要点：单次生成超时（秒）与全局并发（低优先级，不与其他LLM调用抢占）
+ROUND_NOTE_TIMEOUT_SECONDS = 60
+ROUND_NOTE_CONCURRENCY = 1
+# 分段复盘：每段摘要的生成超时（秒）
+REVIEW_CHUNK_TIMEOUT_SECONDS = 60
+
+ROLE_NAMES = {
+    Role.WEREWOLF: "狼人",
+    Role.SEER: "预言家",
+    Role.WITCH: "女巫",
+    Role.HUNTER: "猎人",
+    Role.VILLAGER: "村民"
+}
+
+
+def estimate_tokens(text: str) -> int:
+    """粗略估算token数（中文约1字1token，其余约4字符1token）"""
+    ascii_count = sum(1 for ch in text if ord(ch) < 128)
+    return len(text) - ascii_count + (ascii_count + 3) // 4
+
+
+def _render_round_logs(room: "GameRoom") -> Tuple[Tuple[int, Tuple[str, ...]], ...]:
+    """按回合渲染游戏日志"""
+    rounds: Dict[int, list] = {}
+    for event in room.journal:
+        rounds.setdefault(event.round, []).append(event)
+    return tuple(
+        (round_no, tuple(room.journal.render(events)))
+        for round_no, events in sorted(rounds.items())
+    )
+
+
+@dataclass(frozen=True)
+class GameSnapshot:
+    """已结束对局的不可变快照（复盘任务的输入，与房间后续的清理和复用无关）"""
+    group_id: str
+    config: GameConfig
+    winning_faction: str
+    players: Tuple[Tuple[str, Role], ...]                   # (显示名, 角色)
+    round_logs: Tuple[Tuple[int, Tuple[str, ...]], ...]     # (回合, 渲染后的日志)
+    round_notes: Tuple[Tuple[int, str], ...] = ()           # (回合, 已生成的要点)
+
+    @property
+    def game_log(self) -> List[str]:
+        """完整游戏日志"""
+        return [line for _, lines in self.round_logs for line in lines]
+
+    @classmethod
+    def of(cls, room: "GameRoom", winning_faction: str) -> "GameSnapshot":
+        """在游戏结束时截取快照"""
+        return cls(
+            group_id=room.group_id,
+            config=room.config,
+            winning_faction=winning_faction,
+            players=tuple((p.display_name, p.role) for p in room.players.values()),
+            round_logs=_render_round_logs(room),
+            round_notes=tuple(sorted(room.review_notes.items())),
+        )
+
 
 class AIReviewer:
-    """AI复盘服务"""
+    """AI复盘服务
+
+    每轮结束后在后台为该轮生成简短要点（note_round），
+    终局复盘只需合并各轮要点与尚未整理的最后几轮日志，调用量不随对局长度增长。
+    复盘作为后台任务运行（每个群最多一个），有独立的超时，
+    完成后通过回调投递结果，不阻塞房间清理。
+    """
 
     def __init__(self, context):
         self.context = context
+        self._jobs: Dict[str, asyncio.Task] = {}
+        self._note_jobs: Dict[str, List[asyncio.Task]] = {}
+        self._note_semaphore = asyncio.Semaphore(ROUND_NOTE_CONCURRENCY)
+
+    # ========== 每轮要点 ==========
+
+    def note_round(self, room: "GameRoom", round_no: int) -> None:
+        """为刚结束的一轮提交后台要点任务（结果写入 room.review_notes）"""
+        if not room.config.enable_ai_review or round_no in room.review_notes:
+            return
+        lines = tuple(room.journal.render([e for e in room.journal if e.round == round_no]))
+        if not lines:
+            return
+
+        players = tuple((p.display_name, p.role) for p in room.players.values())
+        task = asyncio.create_task(self._run_round_note(room, round_no, players, lines))
+        self._note_jobs.setdefault(room.group_id, []).append(task)
+
+    def take_round_notes(self, group_id: str) -> List[asyncio.Task]:
+        """取走某个群进行中的要点任务（交给终局复盘等待）"""
+        return self._note_jobs.pop(group_id, [])
 
-    async def generate_review(self, room: "GameRoom", winning_faction: str) -> str:
-        """生成AI复盘报告"""
+    def discard_round_notes(self, group_id: str) -> None:
+        """丢弃某个群的要点任务（房间未分胜负就被清理时调用）"""
+        for task in self._note_jobs.pop(group_id, []):
+            task.cancel()
+
+    async def _run_round_note(
+        self,
+        room: "GameRoom",
+        round_no: int,
+        players: Tuple[Tuple[str, Role], ...],
+        lines: Tuple[str, ...]
+    ) -> Tuple[int, str]:
+        note = ""
+        async with self._note_semaphore:
+            try:
+                note = await asyncio.wait_for(
+                    self._generate_round_note(room.config, round_no, players, lines),
+                    ROUND_NOTE_TIMEOUT_SECONDS
+                )
+            except asyncio.TimeoutError:
+                logger.warning(f"[狼人杀] 群 {room.group_id} 第{round_no}轮要点生成超时")
+        if note:
+            room.review_notes[round_no] = note
+        return round_no, note
+
+    async def _generate_round_note(
+        self,
+        config: GameConfig,
+        round_no: int,
+        players: Tuple[Tuple[str, Role], ...],
+        lines: Tuple[str, ...]
+    ) -> str:
+        """生成单轮要点"""
+        try:
+            provider = self._get_provider(config)
+            if not provider:
+                return ""
+
+            identity = "\n".join(f"{name} - {ROLE_NAMES.get(role, str(role))}" for name, role in players)
+            return await llm_limiter.text_chat(
+                provider,
+                prompt=f"【玩家身份】\n{identity}\n\n【第{round_no}轮日志】\n" + "\n".join(lines),
+                system_prompt=self._get_round_note_prompt(),
+                priority=PRIORITY_BACKGROUND
+            )
+        except Exception as e:
+            logger.warning(f"[狼人杀] 第{round_no}轮要点生成失败: {e}")
+            return ""
+
+    def _get_round_note_prompt(self) -> str:
+        """每轮要点的系统提示词"""
+        return (
+            "你是狼人杀复盘助手。请根据一轮（一晚加一个白天）的游戏日志，写出本轮要点，供最终复盘使用。\n"
+            "要求：只写要点，不要铺垫，总共不超过150字，按以下格式输出：\n"
+            "关键操作：...\n"
+            "失误：...\n"
+            "MVP候选：...\n"
+            "划水候选：...\n"
+            "精彩密谋：[如有值得引用的狼人密谋原话，否则写无]"
+        )
+
+    # ========== 终局复盘 ==========
+
+    def submit(
+        self,
+        snapshot: GameSnapshot,
+        deliver: Callable[[str], Awaitable[None]],
+        note_jobs: Optional[List[asyncio.Task]] = None
+    ) -> None:
+        """提交后台复盘任务，完成后调用 deliver(复盘文本)；失败、超时或关闭时文本为空
+
+        note_jobs 为仍在进行的每轮要点任务，复盘会先等待它们完成（计入复盘超时）。
+        """
+        self.cancel(snapshot.group_id)
+        task = asyncio.create_task(self._run_job(snapshot, deliver, note_jobs or []))
+        self._jobs[snapshot.group_id] = task
+
+        def forget(t: asyncio.Task) -> None:
+            if self._jobs.get(snapshot.group_id) is t:
+                del self._jobs[snapshot.group_id]
+
+        task.add_done_callback(forget)
+
+    def cancel(self, group_id: str) -> None:
+        """取消某个群进行中的复盘任务"""
+        task = self._jobs.pop(group_id, None)
+        if task and not task.done():
+            task.cancel()
+
+    async def cancel_all(self) -> None:
+        """取消所有复盘与要点任务（插件卸载时调用）"""
+        tasks = list(self._jobs.values())
+        for note_tasks in self._note_jobs.values():
+            tasks.extend(note_tasks)
+        self._jobs.clear()
+        self._note_jobs.clear()
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _run_job(
+        self,
+        snapshot: GameSnapshot,
+        deliver: Callable[[str], Awaitable[None]],
+        note_jobs: List[asyncio.Task]
+    ) -> None:
+        review = ""
+        try:
+            review = await asyncio.wait_for(
+                self._review_with_notes(snapshot, note_jobs), snapshot.config.ai_review_timeout
+            )
+        except asyncio.TimeoutError:
+            logger.warning(f"[狼人杀] 群 {snapshot.group_id} AI复盘超时（{snapshot.config.ai_review_timeout}秒），放弃")
+        except asyncio.CancelledError:
+            # 被取消时仍投递空复盘，合并转发模式下的身份公布与摘要不会丢失
+            logger.info(f"[狼人杀] 群 {snapshot.group_id} AI复盘已取消，只发送结算内容")
+            await asyncio.shield(self._deliver(snapshot, deliver, ""))
+            raise
+
+        await self._deliver(snapshot, deliver, review)
+
+    @staticmethod
+    async def _deliver(snapshot: GameSnapshot, deliver: Callable[[str], Awaitable[None]], review: str) -> None:
+        try:
+            await deliver(review)
+        except Exception as e:
+            logger.error(f"[狼人杀] 群 {snapshot.group_id} 投递AI复盘失败: {e}")
+
+    async def _review_with_notes(self, snapshot: GameSnapshot, note_jobs: List[asyncio.Task]) -> str:
+        """等待进行中的要点任务，再合并生成复盘"""
+        notes = dict(snapshot.round_notes)
+        if note_jobs and snapshot.config.enable_ai_review:
+            for round_no, note in await asyncio.gather(*note_jobs):
+                if note:
+                    notes[round_no] = note
+        return await self.generate_review(snapshot, notes)
+
+    async def generate_review(self, snapshot: GameSnapshot, notes: Optional[Dict[int, str]] = None) -> str:
+        """生成AI复盘报告（notes 为已整理的每轮要点，这些回合不再附原始日志）"""
         try:
             # 检查是否启用AI复盘
-            if not room.config.enable_ai_review:
+            if not snapshot.config.enable_ai_review:
                 logger.info("[狼人杀] AI复盘已关闭，跳过生成")
                 return ""
 
             # 获取LLM provider
-            provider = self._get_provider(room)
+            provider = self._get_provider(snapshot.config)
             if not provider:
                 logger.warning("[狼人杀] 无法获取LLM provider，跳过AI复盘")
                 return ""
 
-            # 整理游戏数据
-            game_data = self._format_game_data(room, winning_faction)
+            # 整理游戏数据（超出token预算时先分段摘要，再合并）
+            notes = notes or {}
+            game_data = self._format_game_data(snapshot, notes)
+            if estimate_tokens(game_data) > snapshot.config.ai_review_token_budget:
+                game_data = await self._map_reduce_game_data(snapshot, notes, provider)
 
             # 构造prompt
-            system_prompt, user_prompt = self._build_prompts(room, game_data, winning_faction)
+            system_prompt, user_prompt = self._build_prompts(snapshot.config, game_data, snapshot.winning_faction)
 
             # 调用AI
-            response = await provider.text_chat(
-                prompt=user_prompt,
-                system_prompt=system_prompt
+            review_text = await llm_limiter.text_chat(
+                provider, prompt=user_prompt, system_prompt=system_prompt, priority=PRIORITY_BACKGROUND
             )
-
-            if response.result_chain:
-                review_text = response.result_chain.get_plain_text()
+            if review_text:
                 return f"\n\n🤖 AI复盘\n{'='*30}\n{review_text}\n{'='*30}"
-            else:
-                return ""
+            return ""
 
         except Exception as e:
             logger.error(f"[狼人杀] AI复盘生成失败: {e}")
             return ""
 
-    def _get_provider(self, room: "GameRoom"):
+    # ========== 分段复盘（map-reduce） ==========
+
+    async def _map_reduce_game_data(self, snapshot: GameSnapshot, notes: Dict[int, str], provider) -> str:
+        """把对局按回合分段（每段不超过token预算），并发生成各段摘要，合并为终局复盘的输入"""
+        header = "\n".join(self._format_header(snapshot))
+        budget = max(500, snapshot.config.ai_review_token_budget - estimate_tokens(header))
+        chunks = self._chunk_rounds(snapshot, notes, budget)
+        logger.info(f"[狼人杀] 群 {snapshot.group_id} 对局过长，分 {len(chunks)} 段生成复盘摘要")
+
+        summaries = await asyncio.gather(*(
+            self._summarize_chunk(snapshot, header, label, text, provider) for label, text in chunks
+        ))
+
+        lines = [header, "【分段摘要】"]
+        for (label, _), summary in zip(chunks, summaries):
+            lines.append(f"{label}：")
+            lines.append(summary or "（本段摘要生成失败）")
+        return "\n".join(lines)
+
+    def _chunk_rounds(self, snapshot: GameSnapshot, notes: Dict[int, str], budget: int) -> List[Tuple[str, str]]:
+        """按回合打包为若干段 [(标签, 内容)]，单个回合超出预算时按行拆开"""
+        blocks: List[Tuple[int, str]] = []
+        for round_no, round_lines in snapshot.round_logs:
+            text = f"（要点）\n{notes[round_no]}" if round_no in notes else "\n".join(round_lines)
+            if not text.strip():
+                continue
+            for piece in split_paragraphs(text, budget):
+                blocks.append((round_no, f"第{round_no}轮：\n{piece}"))
+
+        chunks: List[Tuple[str, str]] = []
+        current: List[Tuple[int, str]] = []
+        used = 0
+        for round_no, text in blocks:
+            cost = estimate_tokens(text)
+            if current and used + cost > budget:
+                chunks.append(self._make_chunk(current))
+                current, used = [], 0
+            current.append((round_no, text))
+            used += cost
+        if current:
+            chunks.append(self._make_chunk(current))
+        return chunks
+
+    @staticmethod
+    def _make_chunk(blocks: List[Tuple[int, str]]) -> Tuple[str, str]:
+        first, last = blocks[0][0], blocks[-1][0]
+        label = f"第{first}轮" if first == last else f"第{first}-{last}轮"
+        return label, "\n".join(text for _, text in blocks)
+
+    async def _summarize_chunk(self, snapshot: GameSnapshot, header: str, label: str, text: str, provider) -> str:
+        """生成单段摘要（独立超时，失败返回空）"""
+        try:
+            return await llm_limiter.text_chat(
+                provider,
+                prompt=f"{header}\n【{label}】\n{text}",
+                system_prompt=self._get_chunk_summary_prompt(),
+                timeout=REVIEW_CHUNK_TIMEOUT_SECONDS,
+                priority=PRIORITY_BACKGROUND
+            )
+        except asyncio.TimeoutError:
+            logger.warning(f"[狼人杀] 群 {snapshot.group_id} {label}摘要生成超时")
+        except Exception as e:
+            logger.warning(f"[狼人杀] 群 {snapshot.group_id} {label}摘要生成失败: {e}")
+        return ""
+
+    def _get_chunk_summary_prompt(self) -> str:
+        """分段摘要的系统提示词"""
+        return (
+            "你是狼人杀复盘助手。请把下面这段对局内容压缩为摘要，供最终复盘使用。\n"
+            "要求：不超过300字，保留关键操作与转折、明显失误、表现突出或划水的玩家（写明昵称），"
+            "以及值得引用的狼人密谋原话。"
+        )
+
+    def _get_provider(self, config: GameConfig):
         """获取LLM provider"""
-        if room.config.ai_review_model:
-            provider = self.context.get_provider_by_id(room.config.ai_review_model)
+        if config.ai_review_model:
+            provider = self.context.get_provider_by_id(config.ai_review_model)
             if not provider:
-                logger.warning(f"[狼人杀] 未找到名为 '{room.config.ai_review_model}' 的模型提供商，使用默认模型")
+                logger.warning(f"[狼人杀] 未找到名为 '{config.ai_review_model}' 的模型提供商，使用默认模型")
                 provider = self.context.get_using_provider()
         else:
             provider = self.context.get_using_provider()
         return provider
 
-    def _build_prompts(self, room: "GameRoom", game_data: str, winning_faction: str) -> tuple:
+    def _build_prompts(self, config: GameConfig, game_data: str, winning_faction: str) -> tuple:
         """构建AI提示词"""
-        if room.config.ai_review_prompt:
+        if config.ai_review_prompt:
             # 使用自定义提示词
             faction_name = "狼人" if winning_faction == "werewolf" else "好人"
-            system_prompt = room.config.ai_review_prompt.replace(
+            system_prompt = config.ai_review_prompt.replace(
                 "{winning_faction}", faction_name
             ).replace("{game_data}", game_data)
             user_prompt = f"请为以下狼人杀游戏生成复盘报告：\n\n{game_data}"
@@ -97,37 +398,42 @@ class AIReviewer:
             "💤 本局超级划水：[玩家昵称] - [简短理由]"
         )
 
-    def _format_game_data(self, room: "GameRoom", winning_faction: str) -> str:
-        """整理游戏数据为AI可读格式"""
-        from ..models import Role
-
+    def _format_header(self, snapshot: GameSnapshot) -> List[str]:
+        """游戏结果与玩家身份"""
         lines = []
 
         # 基本信息
         lines.append("【游戏结果】")
-        faction_name = "狼人" if winning_faction == "werewolf" else "好人"
+        faction_name = "狼人" if snapshot.winning_faction == "werewolf" else "好人"
         lines.append(f"胜利方：{faction_name}")
         lines.append("")
 
         # 玩家身份
         lines.append("【玩家身份】")
-        role_names = {
-            Role.WEREWOLF: "狼人",
-            Role.SEER: "预言家",
-            Role.WITCH: "女巫",
-            Role.HUNTER: "猎人",
-            Role.VILLAGER: "村民"
-        }
-        for player in room.players.values():
-            role_name = role_names.get(player.role, str(player.role))
-            lines.append(f"{player.display_name} - {role_name}")
+        for display_name, role in snapshot.players:
+            role_name = ROLE_NAMES.get(role, str(role))
+            lines.append(f"{display_name} - {role_name}")
         lines.append("")
+        return lines
+
+    def _format_game_data(self, snapshot: GameSnapshot, notes: Dict[int, str]) -> str:
+        """整理游戏数据为AI可读格式（有要点的回合用要点，其余回合用原始日志）"""
+        lines = self._format_header(snapshot)
+
+        # 已整理的每轮要点
+        noted = [(round_no, notes[round_no]) for round_no, _ in snapshot.round_logs if round_no in notes]
+        if noted:
+            lines.append("【各轮要点】")
+            for round_no, note in noted:
+                lines.append(f"第{round_no}轮：")
+                lines.append(note)
+            lines.append("")
 
-        # 游戏日志
-        if room.game_log:
-            lines.append("【游戏进程】")
-            for log_entry in room.game_log:
-                lines.append(log_entry)
+        # 尚未整理的回合（事件日志投影）
+        raw = [line for round_no, round_lines in snapshot.round_logs if round_no not in notes for line in round_lines]
+        if raw:
+            lines.append("【游戏进程】" if not noted else "【未整理回合的游戏进程】")
+            lines.extend(raw)
             lines.append("")
 
         return "\n".join(lines)
@@ -1,174 +1,355 @@
 """禁言管理服务"""
-from typing import TYPE_CHECKING
+from typing import Any, Awaitable, Callable, Dict, Iterable, Optional, TYPE_CHECKING
 from astrbot.api import logger
 
+from ..models import GroupState
+from .bulk import BulkResult, run_bulk
+from .ledger import SideEffectLedger, KIND_WHOLE_BAN, KIND_BAN, KIND_ADMIN, KIND_CARD
+from .retry_queue import RetryQueue, RetryOp, StaleOpError
+
 if TYPE_CHECKING:
     from ..models import GameRoom
+    from .transport import Transport
 
 
 class BanService:
     """禁言管理服务"""
 
+    # 副作用台账（由GameManager设置，为None时不记录）
+    ledger: Optional[SideEffectLedger] = None
+    # 失败操作的重试队列（由GameManager设置，为None时失败即放弃）
+    retry_queue: Optional[RetryQueue] = None
+
+    @staticmethod
+    async def _record(room: "GameRoom", kind: str, user_id: str = "", undo=None) -> None:
+        """修改群状态前登记到台账"""
+        if BanService.ledger and room.transport:
+            await BanService.ledger.record(room.group_id, kind, user_id, undo)
+
+    @staticmethod
+    async def _resolve(room: "GameRoom", kind: str, user_id: str = "") -> None:
+        """撤销成功后从台账移除"""
+        if BanService.ledger:
+            await BanService.ledger.resolve(room.group_id, kind, user_id)
+
+    @staticmethod
+    async def _retry_later(room: "GameRoom", kind: str, user_id: str, value: Any, error: Exception) -> None:
+        """调用失败，交给重试队列"""
+        if BanService.retry_queue:
+            await BanService.retry_queue.enqueue(room.group_id, kind, user_id, value, str(error))
+
+    @staticmethod
+    async def _retry_done(room: "GameRoom", kind: str, user_id: str = "") -> None:
+        """调用成功，丢弃同一目标上待重试的旧操作"""
+        if BanService.retry_queue:
+            await BanService.retry_queue.discard(room.group_id, kind, user_id)
+
+    @staticmethod
+    async def _bulk(
+        room: "GameRoom",
+        player_ids: Iterable[str],
+        op: Callable[[str], Awaitable[bool]],
+        action: str
+    ) -> BulkResult:
+        """并发执行批量群操作（受并发上限与单次超时限制），收集每个玩家的结果"""
+        player_ids = list(player_ids)
+        if not player_ids or not room.transport:
+            return BulkResult()
+
+        result = await run_bulk(
+            player_ids, op, room.config.group_op_concurrency, room.config.group_op_timeout
+        )
+        log = logger.warning if result.failed else logger.info
+        log(f"[狼人杀] 群 {room.group_id} 批量{action}：{result.summary()}")
+        return result
+
     @staticmethod
     async def ban_player(room: "GameRoom", player_id: str) -> bool:
-        """禁言玩家"""
-        if not room.bot:
+        """禁言玩家（已禁言则跳过）"""
+        if not room.transport:
             return False
+        if player_id in room.group_state.banned:
+            return True
 
         try:
             duration = 86400 * room.config.ban_duration_days
-            await room.bot.set_group_ban(
-                group_id=int(room.group_id),
-                user_id=int(player_id),
-                duration=duration
-            )
-            room.banned_player_ids.add(player_id)
+            await BanService._record(room, KIND_BAN, player_id)
+            await room.transport.set_group_ban(room.group_id, player_id, duration)
+            room.group_state.banned.add(player_id)
+            await BanService._retry_done(room, KIND_BAN, player_id)
             logger.info(f"[狼人杀] 已禁言玩家 {player_id}")
             return True
         except Exception as e:
             logger.error(f"[狼人杀] 禁言玩家 {player_id} 失败: {e}")
+            await BanService._retry_later(room, KIND_BAN, player_id, duration, e)
             return False
 
     @staticmethod
     async def unban_player(room: "GameRoom", player_id: str) -> bool:
         """解除禁言"""
-        if not room.bot:
+        if not room.transport:
             return False
 
         try:
-            await room.bot.set_group_ban(
-                group_id=int(room.group_id),
-                user_id=int(player_id),
-                duration=0
-            )
-            room.banned_player_ids.discard(player_id)
+            await room.transport.set_group_ban(room.group_id, player_id, 0)
+            room.group_state.banned.discard(player_id)
+            await BanService._resolve(room, KIND_BAN, player_id)
+            await BanService._retry_done(room, KIND_BAN, player_id)
             logger.info(f"[狼人杀] 已解除禁言 {player_id}")
             return True
         except Exception as e:
             logger.error(f"[狼人杀] 解除禁言 {player_id} 失败: {e}")
+            await BanService._retry_later(room, KIND_BAN, player_id, 0, e)
             return False
 
     @staticmethod
-    async def unban_all_players(room: "GameRoom") -> None:
-        """解除所有禁言"""
-        logger.info(f"[狼人杀] 开始解除所有玩家禁言，当前房间有 {len(room.players)} 个玩家")
-        logger.info(f"[狼人杀] 当前被禁言的玩家列表: {room.banned_player_ids}")
-        
-        # 遍历所有玩家，确保每个人都被解除禁言
-        for player in room.players.values():
-            # 跳过AI玩家
-            if player.is_ai:
-                logger.info(f"[狼人杀] 跳过AI玩家 {player.id}")
-                continue
-            logger.info(f"[狼人杀] 尝试解除玩家 {player.id} 的禁言")
-            await BanService.unban_player(room, player.id)
-        
-        # 清空记录
-        room.banned_player_ids.clear()
-        logger.info(f"[狼人杀] 解除所有玩家禁言完成")
+    async def unban_all_players(room: "GameRoom", player_ids: Optional[Iterable[str]] = None) -> BulkResult:
+        """解除所有禁言（player_ids为空时处理所有已禁言玩家，用于只重试失败部分）"""
+        logger.info(f"[狼人杀] 当前被禁言的玩家列表: {room.group_state.banned}")
+
+        if player_ids is None:
+            player_ids = list(room.group_state.banned)
+        return await BanService._bulk(
+            room, player_ids, lambda pid: BanService.unban_player(room, pid), "解除禁言"
+        )
 
     @staticmethod
     async def set_group_whole_ban(room: "GameRoom", enable: bool) -> bool:
-        """设置全员禁言"""
-        if not room.bot:
+        """设置全员禁言（与已确认状态相同则跳过）"""
+        if not room.transport:
             return False
+        if room.group_state.whole_ban == enable:
+            return True
 
         try:
-            await room.bot.set_group_whole_ban(
-                group_id=int(room.group_id),
-                enable=enable
-            )
+            if enable:
+                await BanService._record(room, KIND_WHOLE_BAN)
+            await room.transport.set_group_whole_ban(room.group_id, enable)
+            room.group_state.whole_ban = enable
+            if not enable:
+                await BanService._resolve(room, KIND_WHOLE_BAN)
+            await BanService._retry_done(room, KIND_WHOLE_BAN)
             logger.info(f"[狼人杀] 全员禁言状态: {enable}")
             return True
         except Exception as e:
             logger.error(f"[狼人杀] 设置全员禁言失败: {e}")
+            await BanService._retry_later(room, KIND_WHOLE_BAN, "", enable, e)
             return False
 
     @staticmethod
     async def set_temp_admin(room: "GameRoom", player_id: str) -> bool:
-        """设置临时管理员（用于发言）"""
-        if not room.bot:
+        """设置临时管理员（用于发言，已是管理员则跳过）"""
+        if not room.transport:
             return False
+        if player_id in room.group_state.admins:
+            return True
 
         try:
-            await room.bot.set_group_admin(
-                group_id=int(room.group_id),
-                user_id=int(player_id),
-                enable=True
-            )
-            room.temp_admin_ids.add(player_id)
+            await BanService._record(room, KIND_ADMIN, player_id)
+            await room.transport.set_group_admin(room.group_id, player_id, True)
+            room.group_state.admins.add(player_id)
+            await BanService._retry_done(room, KIND_ADMIN, player_id)
             logger.info(f"[狼人杀] 已设置临时管理员 {player_id}")
             return True
         except Exception as e:
             logger.error(f"[狼人杀] 设置临时管理员 {player_id} 失败: {e}")
+            await BanService._retry_later(room, KIND_ADMIN, player_id, True, e)
             return False
 
     @staticmethod
     async def remove_temp_admin(room: "GameRoom", player_id: str) -> bool:
         """取消临时管理员"""
-        if not room.bot:
+        if not room.transport:
             return False
 
         try:
-            await room.bot.set_group_admin(
-                group_id=int(room.group_id),
-                user_id=int(player_id),
-                enable=False
-            )
-            room.temp_admin_ids.discard(player_id)
+            await room.transport.set_group_admin(room.group_id, player_id, False)
+            room.group_state.admins.discard(player_id)
+            await BanService._resolve(room, KIND_ADMIN, player_id)
+            await BanService._retry_done(room, KIND_ADMIN, player_id)
             logger.info(f"[狼人杀] 已取消临时管理员 {player_id}")
             return True
         except Exception as e:
             logger.error(f"[狼人杀] 取消临时管理员 {player_id} 失败: {e}")
+            await BanService._retry_later(room, KIND_ADMIN, player_id, False, e)
             return False
 
     @staticmethod
-    async def clear_temp_admins(room: "GameRoom") -> None:
-        """清除所有临时管理员"""
-        for player_id in list(room.temp_admin_ids):
-            await BanService.remove_temp_admin(room, player_id)
-        room.temp_admin_ids.clear()
+    async def clear_temp_admins(room: "GameRoom", player_ids: Optional[Iterable[str]] = None) -> BulkResult:
+        """清除所有临时管理员（player_ids为空时处理全部）"""
+        if player_ids is None:
+            player_ids = list(room.group_state.admins)
+        return await BanService._bulk(
+            room, player_ids, lambda pid: BanService.remove_temp_admin(room, pid), "取消临时管理员"
+        )
 
     @staticmethod
     async def set_group_card(room: "GameRoom", player_id: str, card: str) -> bool:
-        """设置群昵称"""
-        if not room.bot:
+        """设置群昵称（与已确认昵称相同则跳过）"""
+        if not room.transport:
             return False
+        if room.group_state.cards.get(player_id) == card:
+            return True
 
+        player = room.get_player(player_id)
+        original = player.original_card if player else None
         try:
-            await room.bot.set_group_card(
-                group_id=int(room.group_id),
-                user_id=int(player_id),
-                card=card
-            )
+            if original and card != original:
+                await BanService._record(room, KIND_CARD, player_id, original)
+            await room.transport.set_group_card(room.group_id, player_id, card)
+            room.group_state.cards[player_id] = card
+            if original and card == original:
+                await BanService._resolve(room, KIND_CARD, player_id)
+            await BanService._retry_done(room, KIND_CARD, player_id)
             logger.info(f"[狼人杀] 已将玩家 {player_id} 群昵称改为 {card}")
             return True
         except Exception as e:
             logger.error(f"[狼人杀] 修改玩家 {player_id} 群昵称失败: {e}")
+            await BanService._retry_later(room, KIND_CARD, player_id, card, e)
             return False
 
     @staticmethod
-    async def set_player_numbers(room: "GameRoom") -> None:
+    async def set_player_numbers(room: "GameRoom") -> BulkResult:
         """将所有玩家群昵称改为编号（仅人类玩家）"""
-        for player in room.players.values():
-            # 跳过AI玩家（机器人不需要设置昵称）
-            if player.is_ai:
-                continue
-
+        # 跳过AI玩家（机器人不需要设置昵称）
+        humans = [p for p in room.players.values() if not p.is_ai]
+        for player in humans:
             # 保存原始昵称（如果还未保存）
             if not player.original_card:
                 player.original_card = player.name
 
-            new_card = f"{player.number}号"
-            await BanService.set_group_card(room, player.id, new_card)
+        desired = GroupState(cards={p.id: f"{p.number}号" for p in humans})
+        return (await BanService.reconcile(room, desired)).get("card", BulkResult())
 
     @staticmethod
-    async def restore_player_cards(room: "GameRoom") -> None:
-        """恢复所有玩家原始群昵称（仅人类玩家）"""
-        for player in room.players.values():
+    async def restore_player_cards(room: "GameRoom", player_ids: Optional[Iterable[str]] = None) -> BulkResult:
+        """恢复所有玩家原始群昵称（仅人类玩家，player_ids为空时处理全部）"""
+        if player_ids is None:
             # 跳过AI玩家（机器人不需要恢复昵称）
-            if player.is_ai:
-                continue
+            player_ids = [p.id for p in room.players.values() if not p.is_ai]
+        desired = GroupState(cards={
+            pid: room.get_player(pid).original_card
+            for pid in player_ids
+            if room.get_player(pid) and room.get_player(pid).original_card
+        })
+        return (await BanService.reconcile(room, desired)).get("card", BulkResult())
+
+    # ========== 期望状态对账 ==========
+
+    @staticmethod
+    def pristine_state(room: "GameRoom") -> GroupState:
+        """游戏前的群状态：无全员禁言、无禁言、无临时管理员、改过的昵称全部恢复"""
+        cards = {}
+        for player_id in room.group_state.cards:
+            player = room.get_player(player_id)
+            if player and player.original_card:
+                cards[player_id] = player.original_card
+        return GroupState(whole_ban=False, cards=cards)
+
+    @staticmethod
+    async def reconcile(room: "GameRoom", desired: GroupState) -> Dict[str, BulkResult]:
+        """把群调整为期望状态，只发送与已确认状态不同的调用
+
+        desired.whole_ban 为 None 表示不关心全员禁言；
+        desired.cards 只包含需要关心的玩家。
+        没有传输层时（如无头对局）群状态从未被修改，直接返回空结果。
+        """
+        if not room.transport:
+            return {}
+
+        acked = room.group_state
+        results: Dict[str, BulkResult] = {}
+
+        if desired.whole_ban is not None and desired.whole_ban != acked.whole_ban:
+            # 全员禁言按群记录结果，键为群号
+            whole_ban = BulkResult()
+            if await BanService.set_group_whole_ban(room, desired.whole_ban):
+                whole_ban.succeeded.append(room.group_id)
+            else:
+                whole_ban.failed[room.group_id] = "调用失败"
+            results["whole_ban"] = whole_ban
+
+        results["unban"] = await BanService._bulk(
+            room, acked.banned - desired.banned,
+            lambda pid: BanService.unban_player(room, pid), "解除禁言"
+        )
+        results["ban"] = await BanService._bulk(
+            room, desired.banned - acked.banned,
+            lambda pid: BanService.ban_player(room, pid), "禁言"
+        )
+        results["unadmin"] = await BanService._bulk(
+            room, acked.admins - desired.admins,
+            lambda pid: BanService.remove_temp_admin(room, pid), "取消临时管理员"
+        )
+        results["admin"] = await BanService._bulk(
+            room, desired.admins - acked.admins,
+            lambda pid: BanService.set_temp_admin(room, pid), "设置临时管理员"
+        )
+
+        changed_cards = {
+            pid: card for pid, card in desired.cards.items()
+            if acked.cards.get(pid) != card
+        }
+        results["card"] = await BanService._bulk(
+            room, changed_cards,
+            lambda pid: BanService.set_group_card(room, pid, changed_cards[pid]), "修改群昵称"
+        )
+        return results
+
+    # ========== 重试队列 ==========
+
+    @staticmethod
+    async def replay(transport: "Transport", room: Optional["GameRoom"], op: RetryOp) -> None:
+        """重放重试队列中的操作（失败抛出异常），成功后同步已确认状态与台账
+
+        room 为 None 表示房间已结束（或重启后未恢复），此时只执行撤销类操作，
+        其余操作抛出 StaleOpError 转入死信，避免重新禁言、开启全员禁言或改回编号昵称。
+        """
+        if room is None and not BanService._is_undo(op):
+            raise StaleOpError("房间已不存在，非撤销操作不再执行")
+
+        if op.kind == KIND_WHOLE_BAN:
+            await transport.set_group_whole_ban(op.group_id, op.value)
+        elif op.kind == KIND_BAN:
+            await transport.set_group_ban(op.group_id, op.user_id, op.value)
+        elif op.kind == KIND_ADMIN:
+            await transport.set_group_admin(op.group_id, op.user_id, op.value)
+        elif op.kind == KIND_CARD:
+            await transport.set_group_card(op.group_id, op.user_id, op.value or "")
+        else:
+            raise ValueError(f"未知操作类型: {op.kind}")
+        undone = BanService._is_undo(op, room)
+
+        if room:
+            state = room.group_state
+            if op.kind == KIND_WHOLE_BAN:
+                state.whole_ban = op.value
+            elif op.kind == KIND_BAN:
+                (state.banned.discard if undone else state.banned.add)(op.user_id)
+            elif op.kind == KIND_ADMIN:
+                (state.admins.discard if undone else state.admins.add)(op.user_id)
+            else:
+                state.cards[op.user_id] = op.value
+
+        if undone and BanService.ledger:
+            await BanService.ledger.resolve(op.group_id, op.kind, op.user_id)
+
+    @staticmethod
+    def _is_undo(op: RetryOp, room: Optional["GameRoom"] = None) -> bool:
+        """操作是否是把群恢复到游戏前状态的撤销操作
 
-            if player.original_card:
-                await BanService.set_group_card(room, player.id, player.original_card)
+        群昵称只有恢复为原昵称时才算撤销：有房间时以玩家记录的原昵称为准，否则以台账登记的原昵称为准。
+        """
+        if op.kind == KIND_WHOLE_BAN:
+            return not op.value
+        if op.kind == KIND_BAN:
+            return op.value == 0
+        if op.kind == KIND_ADMIN:
+            return not op.value
+        if op.kind == KIND_CARD:
+            player = room.get_player(op.user_id) if room else None
+            if player and player.original_card:
+                return player.original_card == op.value
+            entry = BanService.ledger.get(op.group_id, KIND_CARD, op.user_id) if BanService.ledger else None
+            return entry is not None and entry["undo"] == op.value
+        return False
@@ -0,0 +1,46 @@
+"""批量并发调用工具"""
+import asyncio
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Dict, Iterable, List
+
+
+@dataclass
+class BulkResult:
+    """批量操作结果"""
+    succeeded: List[str] = field(default_factory=list)   # 成功的玩家ID
+    failed: Dict[str, str] = field(default_factory=dict)  # 失败的玩家ID -> 原因
+
+    @property
+    def ok(self) -> bool:
+        """是否全部成功"""
+        return not self.failed
+
+    def summary(self) -> str:
+        """结果摘要"""
+        return f"成功 {len(self.succeeded)} 个，失败 {len(self.failed)} 个"
+
+
+async def run_bulk(
+    player_ids: Iterable[str],
+    op: Callable[[str], Awaitable[bool]],
+    concurrency: int,
+    timeout: float
+) -> BulkResult:
+    """对每个玩家并发执行op（受并发上限与单次超时限制），收集每个玩家的结果"""
+    result = BulkResult()
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+
+    async def run(player_id: str) -> None:
+        async with semaphore:
+            try:
+                if await asyncio.wait_for(op(player_id), timeout):
+                    result.succeeded.append(player_id)
+                else:
+                    result.failed[player_id] = "调用失败"
+            except asyncio.TimeoutError:
+                result.failed[player_id] = "超时"
+            except Exception as e:
+                result.failed[player_id] = str(e)
+
+    await asyncio.gather(*(run(pid) for pid in player_ids))
+    return result
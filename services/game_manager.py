@@ -1,32 +1,61 @@
 """游戏管理器"""
-import random
-from typing import Dict, Optional, Tuple, TYPE_CHECKING
+import asyncio
+import dataclasses
+import os
+import time
+from typing import Dict, List, Optional, Set, Tuple, TYPE_CHECKING
 from astrbot.api import logger
 
-from ..models import GameRoom, GameConfig, GamePhase, Player, Role, AIPlayerConfig
+from ..models import GameRoom, GameConfig, GamePhase, Player, Role, AIPlayerConfig, EventType
 from ..roles import RoleFactory
-from .message_service import MessageService
+from .message_service import MessageService, PRIVATE_MSG_TIMEOUT_SECONDS, ROLE_CARD_TIMEOUT_SECONDS
 from .ban_service import BanService
+from .bulk import BulkResult
 from .victory_checker import VictoryChecker
-from .ai_reviewer import AIReviewer
+from .ai_reviewer import AIReviewer, GameSnapshot
 from .ai import AIPlayerService
+from .persistence import RoomStore
+from .ledger import SideEffectLedger
+from .retry_queue import RetryQueue, RetryOp
+from .llm_limiter import llm_limiter
+from .transport import Transport, OneBotTransport, TransportError
 
 if TYPE_CHECKING:
     from astrbot.api.star import Context
 
+# 快照超过该时长（秒）不再恢复对局，直接清理
+RESTORE_MAX_AGE_SECONDS = 1800
+
+# 启动时没有Bot实例，等待其可用后再恢复房间的检查间隔（秒）
+RESTORE_RETRY_INTERVAL_SECONDS = 5
+
+# 已开局的房间恢复时保留快照中的板子配置（角色已按其分配）
+BOARD_CONFIG_FIELDS = (
+    "total_players", "werewolf_count", "seer_count", "witch_count", "hunter_count", "villager_count"
+)
+
 
 class GameManager:
     """游戏管理器 - 协调各服务"""
 
-    def __init__(self, context: "Context", config: GameConfig):
+    def __init__(self, context: "Context", config: GameConfig, data_dir: Optional[str] = None):
         self.context = context
         self.config = config
         self.rooms: Dict[str, GameRoom] = {}  # {群ID: 房间}
 
         # 初始化服务
+        llm_limiter.configure(config.llm_concurrency)
         self.message_service = MessageService(context)
         self.ai_reviewer = AIReviewer(context)
         self.ai_player_service = AIPlayerService(context)
+        self.room_store = RoomStore(data_dir) if data_dir and config.persist_rooms else None
+        self.retry_queue: Optional[RetryQueue] = None
+        self.pending_restore_groups: Set[str] = set()   # 等待Bot可用后恢复的群
+        self._restore_task: Optional[asyncio.Task] = None
+        if data_dir:
+            BanService.ledger = SideEffectLedger(os.path.join(data_dir, "ledger.json"))
+            self.retry_queue = RetryQueue(os.path.join(data_dir, "retry_queue.json"), self._replay_group_op)
+            BanService.retry_queue = self.retry_queue
 
     # ========== 房间管理 ==========
 
@@ -41,14 +70,26 @@ class GameManager:
                 return group_id, room
         return None, None
 
-    def create_room(self, group_id: str, creator_id: str, msg_origin, bot) -> GameRoom:
-        """创建房间"""
+    def create_room(
+        self,
+        group_id: str,
+        creator_id: str,
+        msg_origin,
+        bot,
+        seed: Optional[int] = None,
+        transport: Optional[Transport] = None
+    ) -> GameRoom:
+        """创建房间（seed为空时随机生成；transport为空且有bot时使用OneBot传输层）"""
+        if transport is None and bot:
+            transport = OneBotTransport(self.context, bot)
         room = GameRoom(
             group_id=group_id,
             creator_id=creator_id,
             config=self.config,
             msg_origin=msg_origin,
-            bot=bot
+            bot=bot,
+            seed=seed,
+            transport=transport
         )
         self.rooms[group_id] = room
         logger.info(f"[狼人杀] 群 {group_id} 创建房间")
@@ -66,6 +107,10 @@ class GameManager:
         room = self.rooms[group_id]
         logger.info(f"[狼人杀] 开始清理房间 {group_id}，当前房间阶段: {room.phase}")
 
+        # 丢弃游戏中尚未重试成功的操作，由下面的对账决定最终状态（失败部分会重新入队）
+        if self.retry_queue:
+            await self.retry_queue.discard_group(group_id)
+
         # 先解除全员禁言（最重要！放在最前面确保执行）
         try:
             await BanService.set_group_whole_ban(room, False)
@@ -73,31 +118,161 @@ class GameManager:
         except Exception as e:
             logger.error(f"[狼人杀] 解除全员禁言失败: {e}")
 
-        # 立即解除所有玩家的个人禁言
+        # 解除个人禁言、取消临时管理员、恢复群昵称
+        # 按期望状态对账，只发送差异调用；失败部分仍保留在已确认状态中，第二次对账只重试它们
         try:
-            await BanService.unban_all_players(room)
+            desired = BanService.pristine_state(room)
+            for _ in range(2):
+                results = await BanService.reconcile(room, desired)
+                failed = {k: r.failed for k, r in results.items() if not r.ok}
+                if not failed:
+                    break
+            else:
+                logger.error(f"[狼人杀] 群 {group_id} 恢复群状态仍有失败: {failed}")
         except Exception as e:
-            logger.error(f"[狼人杀] 解除个人禁言失败: {e}")
+            logger.error(f"[狼人杀] 恢复群状态失败: {e}")
+
+        # 取消定时器与未完成的复盘要点任务
+        room.cancel_timer()
+        self.ai_reviewer.discard_round_notes(group_id)
+
+        # 删除房间
+        del self.rooms[group_id]
+        if self.room_store:
+            await self.room_store.discard(group_id)
+
+        logger.info(f"[狼人杀] 群 {group_id} 房间已清理")
+
+    # ========== 持久化 ==========
 
-        # 取消所有临时管理员
+    def _resolve_bot(self):
+        """获取OneBot客户端（恢复房间时使用，获取失败返回None）"""
         try:
-            await BanService.clear_temp_admins(room)
+            from astrbot.api.event import filter
+            platform = self.context.get_platform(filter.PlatformAdapterType.AIOCQHTTP)
+            return platform.get_client() if platform else None
         except Exception as e:
-            logger.error(f"[狼人杀] 取消临时管理员失败: {e}")
+            logger.warning(f"[狼人杀] 获取Bot实例失败: {e}")
+            return None
+
+    async def restore_rooms(self) -> None:
+        """启动时从快照恢复房间，并启动写后快照
+
+        没有Bot实例时私聊与群管理都无法进行，不恢复房间：快照留在磁盘上，
+        后台每隔 RESTORE_RETRY_INTERVAL_SECONDS 检查一次，Bot可用后再恢复，
+        超过 RESTORE_MAX_AGE_SECONDS 仍不可用则放弃（快照在下次加载时按过期清理）。
+        """
+        if not self.room_store:
+            return
 
-        # 恢复群昵称
+        loop = asyncio.get_running_loop()
+        snapshots = await loop.run_in_executor(None, self.room_store.load_all)
+        if snapshots:
+            bot = self._resolve_bot()
+            if bot:
+                await self._restore_snapshots(snapshots, bot)
+            else:
+                logger.warning(f"[狼人杀] 未获取到Bot实例，{len(snapshots)} 个房间等待Bot可用后恢复")
+                self.pending_restore_groups = {s["room"]["group_id"] for s in snapshots}
+                self._restore_task = asyncio.create_task(self._restore_when_bot_ready(snapshots))
+
+        self.room_store.start(lambda: self.rooms)
+
+    async def _restore_when_bot_ready(self, snapshots: List[dict]) -> None:
+        """等待Bot实例可用后恢复房间"""
         try:
-            await BanService.restore_player_cards(room)
-        except Exception as e:
-            logger.error(f"[狼人杀] 恢复群昵称失败: {e}")
+            deadline = time.monotonic() + RESTORE_MAX_AGE_SECONDS
+            while time.monotonic() < deadline:
+                await asyncio.sleep(RESTORE_RETRY_INTERVAL_SECONDS)
+                bot = self._resolve_bot()
+                if bot:
+                    await self._restore_snapshots(snapshots, bot)
+                    return
+            logger.warning("[狼人杀] 等待Bot实例超时，放弃恢复房间")
+        finally:
+            self.pending_restore_groups = set()
+
+    async def _restore_snapshots(self, snapshots: List[dict], bot) -> None:
+        """还原快照中的房间并继续对局（过期或已结束的房间直接清理）"""
+        from ..phases import PhaseManager
+        for snapshot in snapshots:
+            try:
+                room = RoomStore.restore(snapshot)
+            except Exception as e:
+                logger.error(f"[狼人杀] 还原房间快照失败: {e}")
+                continue
 
-        # 取消定时器
-        room.cancel_timer()
+            group_id = room.group_id
+            if group_id in self.rooms:
+                # 等待期间该群已开了新房间，旧快照由新房间的快照覆盖
+                logger.info(f"[狼人杀] 群 {group_id} 已有新房间，跳过快照恢复")
+                continue
+            room.bot = bot
+            room.transport = OneBotTransport(self.context, bot)
+            room.config = self._live_config(room)
+            self.rooms[group_id] = room
+            age = time.time() - snapshot.get("saved_at", 0)
+
+            if room.phase == GamePhase.FINISHED or age > RESTORE_MAX_AGE_SECONDS:
+                logger.info(f"[狼人杀] 群 {group_id} 快照已失效（{age:.0f}秒前），清理房间")
+                await self.cleanup_room(group_id)
+                continue
 
-        # 删除房间
-        del self.rooms[group_id]
+            try:
+                if room.phase != GamePhase.WAITING:
+                    await self.message_service.send_group_message(
+                        room, f"♻️ 插件已重启，游戏已恢复（当前阶段：{room.phase.value}）"
+                    )
+                    await PhaseManager(self).resume_room(room)
+                logger.info(f"[狼人杀] 群 {group_id} 房间已从快照恢复")
+            except Exception as e:
+                logger.error(f"[狼人杀] 群 {group_id} 恢复对局失败: {e}")
+                await self.cleanup_room(group_id)
+
+    def _live_config(self, room: GameRoom) -> GameConfig:
+        """恢复的房间使用当前配置（重启前修改的超时、AI、图片等配置立即生效），已开局的房间保留原板子"""
+        if room.phase == GamePhase.WAITING:
+            return self.config
+        return dataclasses.replace(
+            self.config, **{name: getattr(room.config, name) for name in BOARD_CONFIG_FIELDS}
+        )
 
-        logger.info(f"[狼人杀] 群 {group_id} 房间已清理")
+    async def reconcile_side_effects(self) -> None:
+        """启动对账：撤销崩溃前遗留的禁言、管理员和群昵称修改（跳过已恢复的对局）"""
+        ledger = BanService.ledger
+        if not ledger or not ledger.outstanding():
+            return
+
+        bot = self._resolve_bot()
+        if not bot:
+            logger.warning("[狼人杀] 未获取到Bot实例，跳过副作用对账")
+            return
+
+        active_groups = set(self.rooms.keys())
+        succeeded, failed = await ledger.reconcile(OneBotTransport(self.context, bot), active_groups)
+        logger.info(f"[狼人杀] 副作用对账完成：撤销 {succeeded} 项，失败 {failed} 项")
+
+    async def _replay_group_op(self, op: RetryOp) -> None:
+        """重试队列的执行器"""
+        room = self.rooms.get(op.group_id)
+        if room and room.transport:
+            transport = room.transport
+        else:
+            bot = self._resolve_bot()
+            if not bot:
+                # 抛出后由重试队列按退避稍后再试
+                raise TransportError("Bot实例不可用")
+            transport = OneBotTransport(self.context, bot)
+        await BanService.replay(transport, room, op)
+
+    async def suspend_rooms(self) -> None:
+        """插件卸载时保存快照并停止定时器（不清理房间，下次加载时恢复）"""
+        if self._restore_task and not self._restore_task.done():
+            self._restore_task.cancel()
+        await self.room_store.stop()
+        for room in self.rooms.values():
+            room.cancel_timer()
+        self.rooms.clear()
 
     # ========== 玩家管理 ==========
 
@@ -119,7 +294,7 @@ class GameManager:
         emoji = self.AI_EMOJIS[current_ai_count % len(self.AI_EMOJIS)]
 
         # 预分配性格（但不显示在名称中，避免性格泄露）
-        personality_name = self.ai_player_service.assign_personality(ai_player_id)
+        personality_name = self.ai_player_service.assign_personality(ai_player_id, room.rng)
 
         player = Player(
             id=ai_player_id,
@@ -147,7 +322,7 @@ class GameManager:
             players_list = list(room.players.values())
 
             # 随机打乱玩家顺序（确保编号随机分配）
-            random.shuffle(players_list)
+            room.rng.shuffle(players_list)
 
             # 分配编号
             for index, player in enumerate(players_list, start=1):
@@ -156,13 +331,14 @@ class GameManager:
 
             # 分配角色
             roles_pool = self.config.get_roles_pool()
-            random.shuffle(roles_pool)
+            room.rng.shuffle(roles_pool)
             for player, role in zip(players_list, roles_pool):
                 player.assign_role(role)
 
             # 初始化游戏状态
-            room.phase = GamePhase.NIGHT_WOLF
             room.current_round = 1
+            room.record_game_start()
+            room.set_phase(GamePhase.NIGHT_WOLF)
 
             # 为AI玩家初始化上下文
             for player in players_list:
@@ -175,14 +351,12 @@ class GameManager:
             # 记录日志
             room.log_round_start()
 
-            # 修改群昵称为编号（仅人类玩家）
-            await BanService.set_player_numbers(room)
-
-            # 开启全员禁言
-            await BanService.set_group_whole_ban(room, True)
-
-            # 私聊告知角色（仅人类玩家）
-            await self._send_roles_to_players(room)
+            # 修改群昵称为编号、开启全员禁言、私聊告知角色，三者互不依赖，并发进行
+            await asyncio.gather(
+                BanService.set_player_numbers(room),
+                BanService.set_group_whole_ban(room, True),
+                self._send_roles_to_players(room),
+            )
 
             logger.info(f"[狼人杀] 群 {room.group_id} 游戏开始")
         except Exception as e:
@@ -190,36 +364,44 @@ class GameManager:
             # 清理房间，避免处于不一致状态
             await self.cleanup_room(room.group_id)
 
-    async def _send_roles_to_players(self, room: GameRoom) -> None:
-        """私聊告知所有玩家角色（发送角色卡片图片）"""
+    async def _send_roles_to_players(self, room: GameRoom) -> BulkResult:
+        """私聊告知所有玩家角色（并发发送，返回每个玩家的发送结果）"""
+        human_ids = []
         for player in room.players.values():
             # 跳过AI玩家（AI不需要接收私聊）
             if player.is_ai:
                 logger.info(f"[狼人杀] AI玩家 {player.name} 身份：{player.role.display_name if player.role else '未知'}")
-                continue
+            elif player.role:
+                human_ids.append(player.id)
 
-            if player.role:
-                role_name = player.role.value
+        async def send_role(player_id: str) -> bool:
+            player = room.get_player(player_id)
+            role_name = player.role.value
 
-                # 如果是狼人，获取队友信息
-                teammates = None
-                if player.role == Role.WEREWOLF:
-                    teammates = []
-                    for w in room.get_werewolves():
-                        if w.id != player.id:
-                            teammates.append(w.display_name)
+            # 如果是狼人，获取队友信息
+            teammates = None
+            if player.role == Role.WEREWOLF:
+                teammates = [w.display_name for w in room.get_werewolves() if w.id != player.id]
 
-                # 尝试发送角色卡片图片
-                success = await self.message_service.send_role_card_to_player(
-                    room, player.id, role_name, player.number, teammates
-                )
+            # 尝试发送角色卡片
+            success = await self.message_service.send_role_card_to_player(
+                room, player.id, role_name, player.number, teammates
+            )
 
-                # 如果图片发送失败，降级为文本
-                if not success:
-                    role_info = RoleFactory.get_role_info(player.role, player, room)
-                    await self.message_service.send_private_message(room, player.id, role_info)
+            # 如果卡片发送失败，降级为文本
+            if not success:
+                role_info = RoleFactory.get_role_info(player.role, player, room)
+                success = await self.message_service.send_private_message(room, player.id, role_info)
 
+            if success:
                 logger.info(f"[狼人杀] 已私聊告知玩家 {player.id} 的身份：{role_name}")
+            return success
+
+        # 卡片尝试有自己的超时，降级的文本发送仍有完整的私聊超时
+        return await self.message_service.fan_out(
+            room, human_ids, send_role, "私聊告知身份",
+            timeout=ROLE_CARD_TIMEOUT_SECONDS + PRIVATE_MSG_TIMEOUT_SECONDS
+        )
 
     # ========== 胜负判定 ==========
 
@@ -231,32 +413,39 @@ class GameManager:
             if not victory_msg:
                 return False
 
-            room.phase = GamePhase.FINISHED
+            room.set_phase(GamePhase.FINISHED)
             logger.info(f"[狼人杀] 群 {room.group_id} 游戏结束，胜利阵营: {winning_faction}")
 
-            # 获取角色公布文本
+            # 获取角色公布文本，并截取复盘用的对局快照
             roles_text = VictoryChecker.get_all_players_roles(room)
+            snapshot = GameSnapshot.of(room, winning_faction)
+            note_jobs = self.ai_reviewer.take_round_notes(room.group_id)
+            merge = room.config.merge_end_game_output
+            digest = VictoryChecker.get_game_digest(room) if merge else ""
 
-            # 发送胜利消息
+            # 发送胜利消息（合并转发模式下身份公布随复盘一起发送）
             try:
-                await self.message_service.announce_victory(room, victory_msg, roles_text)
+                if merge:
+                    await self.message_service.send_group_message(room, f"🎉 {victory_msg}\n游戏结束！")
+                else:
+                    await self.message_service.announce_victory(room, victory_msg, roles_text)
             except Exception as e:
                 logger.error(f"[狼人杀] 发送胜利消息失败: {e}")
 
-            # 生成AI复盘（失败不影响游戏结束）
-            try:
-                if winning_faction:
-                    ai_review = await self.ai_reviewer.generate_review(room, winning_faction)
-                    if ai_review:
-                        await self.message_service.send_group_message(room, ai_review)
-            except Exception as e:
-                logger.error(f"[狼人杀] AI复盘生成失败: {e}")
-
-            # 清理房间（确保一定会执行）
+            # 立即清理房间（解除禁言、恢复昵称），不等待AI复盘
             logger.info(f"[狼人杀] 群 {room.group_id} 开始清理房间")
             await self.cleanup_room(room.group_id)
             logger.info(f"[狼人杀] 群 {room.group_id} 清理房间完成")
 
+            # AI复盘在后台生成，完成后再发送（失败或超时不影响游戏结束）
+            async def deliver(ai_review: str) -> None:
+                if merge:
+                    await self.message_service.send_group_forward(room, [roles_text, digest, ai_review])
+                elif ai_review:
+                    await self.message_service.send_group_message(room, ai_review)
+
+            self.ai_reviewer.submit(snapshot, deliver, note_jobs)
+
             return True
         except Exception as e:
             logger.error(f"[狼人杀] 检查胜负处理失败: {e}")
@@ -286,7 +475,7 @@ class GameManager:
             targets = [pid for pid, count in vote_counts.items() if count == max_votes]
 
             # 平票随机选择
-            killed_id = random.choice(targets)
+            killed_id = room.rng.choice(targets)
 
             # 清空投票
             room.vote_state.clear_night_votes()
@@ -295,9 +484,8 @@ class GameManager:
             room.last_killed_id = killed_id
 
             # 记录日志
-            killed_player = room.get_player(killed_id)
-            if killed_player:
-                room.log(f"🌙 狼人最终决定刀 {killed_player.display_name}")
+            if room.get_player(killed_id):
+                room.record(EventType.WOLF_KILL, target=killed_id)
 
             return killed_id
         except Exception as e:
@@ -315,11 +503,11 @@ class GameManager:
 
             # 如果女巫没救人，被杀者确定死亡
             elif room.last_killed_id:
-                room.kill_player(room.last_killed_id)
+                room.kill_player(room.last_killed_id, cause="wolf")
 
             # 如果女巫毒人
             if witch_state.poisoned_player_id:
-                room.kill_player(witch_state.poisoned_player_id)
+                room.kill_player(witch_state.poisoned_player_id, cause="poison")
                 try:
                     await BanService.ban_player(room, witch_state.poisoned_player_id)
                 except Exception as e:
@@ -379,7 +567,7 @@ class GameManager:
             exiled_id = targets[0]
 
             # 移除存活列表
-            room.kill_player(exiled_id)
+            room.kill_player(exiled_id, cause="vote")
 
             # 清空投票
             room.vote_state.clear_day_votes()
@@ -0,0 +1,130 @@
+"""副作用台账 - 记录尚未撤销的群操作，用于崩溃后恢复"""
+import asyncio
+import json
+import os
+from typing import Any, Dict, List, Optional, Set, Tuple
+from astrbot.api import logger
+
+# 台账记录的操作类型
+KIND_WHOLE_BAN = "whole_ban"   # 全员禁言
+KIND_BAN = "ban"               # 个人禁言
+KIND_ADMIN = "admin"           # 临时管理员
+KIND_CARD = "card"             # 群昵称（undo为原昵称）
+
+# 启动恢复时的并发数与单次调用超时（秒）
+RECONCILE_CONCURRENCY = 8
+RECONCILE_CALL_TIMEOUT = 10
+
+
+class SideEffectLedger:
+    """副作用台账
+
+    每次修改群状态前先写入台账（持久化到磁盘），撤销成功后再移除。
+    插件加载时对仍未撤销的记录做一次对账，把群恢复到游戏前的状态。
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._entries: Dict[str, dict] = {}
+        self._write_lock = asyncio.Lock()
+        self._load()
+
+    @staticmethod
+    def _key(group_id: str, kind: str, user_id: str) -> str:
+        return f"{group_id}:{kind}:{user_id}"
+
+    def _load(self) -> None:
+        """读取台账文件"""
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                for entry in json.load(f):
+                    self._entries[self._key(entry["group_id"], entry["kind"], entry["user_id"])] = entry
+            if self._entries:
+                logger.info(f"[狼人杀] 副作用台账中有 {len(self._entries)} 条未撤销记录")
+        except Exception as e:
+            logger.error(f"[狼人杀] 读取副作用台账失败: {e}")
+
+    def _write(self, entries: List[dict]) -> None:
+        """原子写入台账文件（线程池中执行）"""
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(entries, f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+
+    async def _persist(self) -> None:
+        async with self._write_lock:
+            entries = list(self._entries.values())
+            try:
+                loop = asyncio.get_running_loop()
+                await loop.run_in_executor(None, self._write, entries)
+            except Exception as e:
+                logger.error(f"[狼人杀] 写入副作用台账失败: {e}")
+
+    async def record(self, group_id: str, kind: str, user_id: str = "", undo: Any = None) -> None:
+        """在修改群状态前登记（已登记的保留最早的undo值）"""
+        key = self._key(group_id, kind, user_id)
+        if key in self._entries:
+            return
+        self._entries[key] = {"group_id": group_id, "kind": kind, "user_id": user_id, "undo": undo}
+        await self._persist()
+
+    async def resolve(self, group_id: str, kind: str, user_id: str = "") -> None:
+        """操作已撤销，移除登记"""
+        if self._entries.pop(self._key(group_id, kind, user_id), None) is not None:
+            await self._persist()
+
+    def get(self, group_id: str, kind: str, user_id: str = "") -> Optional[dict]:
+        """获取某项未撤销的登记（不存在返回None）"""
+        return self._entries.get(self._key(group_id, kind, user_id))
+
+    def outstanding(self, exclude_groups: Optional[Set[str]] = None) -> List[dict]:
+        """获取未撤销的登记"""
+        exclude_groups = exclude_groups or set()
+        return [e for e in self._entries.values() if e["group_id"] not in exclude_groups]
+
+    # ========== 启动对账 ==========
+
+    @staticmethod
+    async def _undo(transport, entry: dict) -> None:
+        """撤销单条操作（所有撤销操作都是幂等的）"""
+        group_id = entry["group_id"]
+        kind = entry["kind"]
+        if kind == KIND_WHOLE_BAN:
+            await transport.set_group_whole_ban(group_id, False)
+        elif kind == KIND_BAN:
+            await transport.set_group_ban(group_id, entry["user_id"], 0)
+        elif kind == KIND_ADMIN:
+            await transport.set_group_admin(group_id, entry["user_id"], False)
+        elif kind == KIND_CARD:
+            await transport.set_group_card(group_id, entry["user_id"], entry["undo"] or "")
+
+    async def reconcile(self, transport, exclude_groups: Optional[Set[str]] = None) -> Tuple[int, int]:
+        """撤销所有未撤销的操作（有限并发），返回 (成功数, 失败数)"""
+        entries = self.outstanding(exclude_groups)
+        if not entries:
+            return 0, 0
+
+        semaphore = asyncio.Semaphore(RECONCILE_CONCURRENCY)
+
+        async def undo_one(entry: dict) -> bool:
+            async with semaphore:
+                try:
+                    await asyncio.wait_for(self._undo(transport, entry), RECONCILE_CALL_TIMEOUT)
+                    return True
+                except Exception as e:
+                    logger.warning(
+                        f"[狼人杀] 撤销群 {entry['group_id']} 的 {entry['kind']} {entry['user_id']} 失败: {e}"
+                    )
+                    return False
+
+        results = await asyncio.gather(*(undo_one(e) for e in entries))
+        for entry, ok in zip(entries, results):
+            if ok:
+                self._entries.pop(self._key(entry["group_id"], entry["kind"], entry["user_id"]), None)
+        await self._persist()
+
+        succeeded = sum(1 for ok in results if ok)
+        return succeeded, len(results) - succeeded
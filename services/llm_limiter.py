@@ -0,0 +1,115 @@
+"""LLM调用限流器 - 插件内所有LLM调用共享的并发上限"""
+import asyncio
+import itertools
+from typing import List, Optional, Tuple
+from astrbot.api import logger
+
+
+# 调用优先级（数值越小越优先）
+PRIORITY_GAMEPLAY = 0       # AI玩家决策，阻塞对局进行
+PRIORITY_BACKGROUND = 1     # 每轮复盘要点、分段摘要与终局复盘
+
+
+class LLMLimiter:
+    """LLM调用限流器
+
+    AI玩家决策、每轮复盘要点和终局复盘都通过同一个实例调用LLM，
+    避免多个房间同时结束或长对局的分段复盘把模型提供商打满。
+
+    排队时AI玩家决策总是先于复盘调用获得名额；复盘调用最多占用一半名额（至少1个），
+    其余名额始终留给对局中的决策，长时间的复盘不会拖慢正在进行的对局。
+    """
+
+    def __init__(self, concurrency: int = 4):
+        self.concurrency = concurrency
+        self._active = 0
+        self._active_background = 0
+        self._waiters: List[Tuple[int, int, asyncio.Future]] = []
+        self._seq = itertools.count()
+
+    def configure(self, concurrency: int) -> None:
+        """设置并发上限（需在首次调用前设置）"""
+        self.concurrency = max(1, concurrency)
+
+    @property
+    def background_limit(self) -> int:
+        """复盘调用可同时占用的名额"""
+        return max(1, self.concurrency // 2)
+
+    def _can_start(self, priority: int) -> bool:
+        if self._active >= self.concurrency:
+            return False
+        return priority == PRIORITY_GAMEPLAY or self._active_background < self.background_limit
+
+    def _take(self, priority: int) -> None:
+        self._active += 1
+        if priority != PRIORITY_GAMEPLAY:
+            self._active_background += 1
+
+    def _release(self, priority: int) -> None:
+        self._active -= 1
+        if priority != PRIORITY_GAMEPLAY:
+            self._active_background -= 1
+        self._wake()
+
+    def _wake(self) -> None:
+        """按优先级与排队顺序把空出的名额交给等待者"""
+        for entry in sorted(self._waiters):
+            if self._active >= self.concurrency:
+                break
+            priority, _, future = entry
+            if future.done():
+                # 等待者已取消，由其自行移出队列
+                continue
+            if self._can_start(priority):
+                self._waiters.remove(entry)
+                self._take(priority)
+                future.set_result(None)
+
+    async def _acquire(self, priority: int) -> None:
+        # 没有同级或更高优先级的调用在排队时直接获取名额
+        if self._can_start(priority) and not any(p <= priority for p, _, _ in self._waiters):
+            self._take(priority)
+            return
+
+        entry = (priority, next(self._seq), asyncio.get_running_loop().create_future())
+        self._waiters.append(entry)
+        try:
+            await entry[2]
+        except asyncio.CancelledError:
+            if entry in self._waiters:
+                self._waiters.remove(entry)
+            elif not entry[2].cancelled():
+                # 名额已分配但调用方被取消，归还名额
+                self._release(priority)
+            raise
+
+    async def text_chat(
+        self,
+        provider,
+        prompt: str,
+        system_prompt: str = "",
+        timeout: Optional[float] = None,
+        priority: int = PRIORITY_GAMEPLAY
+    ) -> str:
+        """排队获取调用名额后调用LLM，返回纯文本（空响应返回空字符串，超时抛出 asyncio.TimeoutError）
+
+        timeout 只计算实际调用时间，不含排队等待。
+        """
+        await self._acquire(priority)
+        try:
+            response = await asyncio.wait_for(
+                provider.text_chat(prompt=prompt, system_prompt=system_prompt),
+                timeout
+            )
+        finally:
+            self._release(priority)
+
+        if not response or not response.result_chain:
+            logger.debug("[狼人杀] LLM返回空响应")
+            return ""
+        return response.result_chain.get_plain_text().strip()
+
+
+# 插件内共享的限流器（并发上限由 GameManager 按配置设置）
+llm_limiter = LLMLimiter()
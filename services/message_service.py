@@ -1,51 +1,121 @@
 """消息发送服务"""
-from typing import TYPE_CHECKING, Optional, List, Dict
+import asyncio
+from typing import TYPE_CHECKING, Awaitable, Callable, Iterable, Optional, List, Dict
 from astrbot.api import logger
 from astrbot.core.message.message_event_result import MessageChain
+from astrbot.core.message.components import Image, Node, Nodes, Plain
+
+from ..utils import split_paragraphs
+from .bulk import BulkResult, run_bulk
+from .outbox import GroupOutbox, OutboundMessage
 
 if TYPE_CHECKING:
     from ..models import GameRoom, Player
 
 
+# 合并转发消息中每个节点的最大字数与发送者昵称
+FORWARD_NODE_MAX_CHARS = 1500
+FORWARD_NODE_NAME = "狼人杀"
+
+# 批量私聊的并发上限与单次超时（与群管理操作分开限流）
+PRIVATE_MSG_CONCURRENCY = 10
+PRIVATE_MSG_TIMEOUT_SECONDS = 10
+# 角色卡片（绘制+发送）的超时，超时后降级为文本，文本发送另有完整的超时
+ROLE_CARD_TIMEOUT_SECONDS = 5
+
+
 class MessageService:
     """消息发送服务"""
 
     def __init__(self, context):
         self.context = context
+        self.outbox = GroupOutbox(self._deliver)
 
-    async def send_group_message(self, room: "GameRoom", text: str) -> bool:
-        """发送群消息"""
-        if not room.msg_origin:
-            return False
-
+    async def _deliver(self, message: OutboundMessage) -> bool:
+        """实际发送群消息（由发送队列调用）"""
         try:
-            msg = MessageChain().message(text)
-            await self.context.send_message(room.msg_origin, msg)
+            chain = message.chain or MessageChain().message(message.text)
+            await message.transport.send_group_message(message.msg_origin, chain)
             return True
         except Exception as e:
-            logger.error(f"[狼人杀] 发送群消息失败: {e}")
+            if not message.fallback:
+                logger.error(f"[狼人杀] 发送群消息失败: {e}")
+                return False
+            logger.warning(f"[狼人杀] 发送合并转发或图片消息失败，改为逐条发送文本: {e}")
+
+        success = True
+        for text in message.fallback:
+            try:
+                await message.transport.send_group_message(message.msg_origin, MessageChain().message(text))
+            except Exception as e:
+                logger.error(f"[狼人杀] 发送群消息失败: {e}")
+                success = False
+        return success
+
+    async def send_group_message(self, room: "GameRoom", text: str) -> bool:
+        """发送群消息（进入发送队列，不等待网络）"""
+        if not room.msg_origin or not room.transport:
             return False
 
+        self.outbox.enqueue(room.group_id, OutboundMessage(room.msg_origin, room.transport, text=text))
+        return True
+
     async def send_group_at_message(self, room: "GameRoom", player: "Player", text: str) -> bool:
-        """发送群消息并@某人"""
-        if not room.msg_origin:
+        """发送群消息并@某人（进入发送队列，不合并）"""
+        if not room.msg_origin or not room.transport:
             return False
 
-        try:
-            msg = MessageChain().at(player.display_name, player.id).message(text)
-            await self.context.send_message(room.msg_origin, msg)
-            return True
-        except Exception as e:
-            logger.error(f"[狼人杀] 发送群@消息失败: {e}")
+        chain = MessageChain().at(player.display_name, player.id).message(text)
+        self.outbox.enqueue(room.group_id, OutboundMessage(room.msg_origin, room.transport, text=text, chain=chain))
+        return True
+
+    async def send_group_forward(self, room: "GameRoom", sections: List[str]) -> bool:
+        """把多段长文本打包为一条合并转发消息（按段落切分为多个节点，进入发送队列）
+
+        平台不支持合并转发时退回为逐段发送纯文本。
+        """
+        if not room.msg_origin or not room.transport:
             return False
 
+        chunks = [c for section in sections if section.strip() for c in split_paragraphs(section, FORWARD_NODE_MAX_CHARS)]
+        if not chunks:
+            return False
+
+        nodes = [Node(content=[Plain(chunk)], name=FORWARD_NODE_NAME) for chunk in chunks]
+        chain = MessageChain(chain=[Nodes(nodes=nodes)])
+        self.outbox.enqueue(room.group_id, OutboundMessage(room.msg_origin, room.transport, chain=chain, fallback=chunks))
+        return True
+
+    async def send_group_image(self, room: "GameRoom", data: bytes, fallback_text: str) -> bool:
+        """发送群图片（编码后的图片字节，进入发送队列），发送失败时退回为纯文本"""
+        if not room.msg_origin or not room.transport:
+            return False
+
+        chain = MessageChain(chain=[Image.fromBytes(data)])
+        self.outbox.enqueue(
+            room.group_id,
+            OutboundMessage(room.msg_origin, room.transport, text=fallback_text, chain=chain, fallback=[fallback_text])
+        )
+        return True
+
+    async def _send_rendered(
+        self, room: "GameRoom", render: Callable[[], Awaitable[bytes]], text: str, what: str
+    ) -> bool:
+        """图片模式下发送绘制的图片，否则（或绘制失败时）发送文本"""
+        if room.config.image_mode:
+            try:
+                return await self.send_group_image(room, await render(), text)
+            except Exception as e:
+                logger.warning(f"[狼人杀] 绘制{what}图片失败: {e}，降级为文本")
+        return await self.send_group_message(room, text)
+
     async def send_private_message(self, room: "GameRoom", player_id: str, text: str) -> bool:
         """发送私聊消息"""
-        if not room.bot:
+        if not room.transport:
             return False
 
         try:
-            await room.bot.send_private_msg(user_id=int(player_id), message=text)
+            await room.transport.send_private_message(player_id, text)
             return True
         except Exception as e:
             logger.warning(f"[狼人杀] 发送私聊消息给 {player_id} 失败: {e}")
@@ -59,25 +129,66 @@ class MessageService:
         player_number: int,
         teammates: List[str] = None,
     ) -> bool:
-        """发送角色信息给玩家（纯文本）"""
+        """发送角色信息给玩家（图片模式下发送角色卡片，否则发送纯文本）
+
+        卡片由预先绘制的图集叠加编号与队友得到，以内存字节直接发送；
+        发送失败或超过 ROLE_CARD_TIMEOUT_SECONDS 时返回 False，由调用方降级为文本。
+        """
         from ..roles import RoleFactory
 
         player = room.get_player(player_id)
-        if not player or not player.role:
+        if not player or not player.role or not room.transport:
             return False
 
+        if room.config.image_mode:
+            from ..draw import render_service
+
+            async def send_card() -> None:
+                data = await render_service.render_role_card(role_name, player_number, teammates)
+                await room.transport.send_private_image(player_id, data)
+
+            try:
+                await asyncio.wait_for(send_card(), ROLE_CARD_TIMEOUT_SECONDS)
+                return True
+            except asyncio.TimeoutError:
+                logger.warning(f"[狼人杀] 发送角色卡片给 {player_id} 超时（{ROLE_CARD_TIMEOUT_SECONDS}秒）")
+                return False
+            except Exception as e:
+                logger.warning(f"[狼人杀] 发送角色卡片给 {player_id} 失败: {e}")
+                return False
+
         # 使用角色工厂获取完整角色信息
         text = RoleFactory.get_role_info(player.role, player, room)
 
         return await self.send_private_message(room, player_id, text)
 
+    async def fan_out(
+        self,
+        room: "GameRoom",
+        player_ids: Iterable[str],
+        op: Callable[[str], Awaitable[bool]],
+        action: str = "私聊",
+        timeout: float = PRIVATE_MSG_TIMEOUT_SECONDS
+    ) -> BulkResult:
+        """并发私聊多个玩家（受并发上限与单次超时限制），收集每个玩家的结果
+
+        timeout 限制每个玩家的整个 op；op 内含多次发送（如卡片失败后降级为文本）时应传入总预算。
+        """
+        player_ids = list(player_ids)
+        if not player_ids or not room.transport:
+            return BulkResult()
+
+        result = await run_bulk(player_ids, op, PRIVATE_MSG_CONCURRENCY, timeout)
+        if result.failed:
+            logger.warning(f"[狼人杀] 群 {room.group_id} 批量{action}：{result.summary()}，失败: {result.failed}")
+        return result
+
     async def broadcast_to_players(self, room: "GameRoom", player_ids: list, text: str) -> int:
-        """广播私聊消息给多个玩家"""
-        success_count = 0
-        for player_id in player_ids:
-            if await self.send_private_message(room, player_id, text):
-                success_count += 1
-        return success_count
+        """广播私聊消息给多个玩家（并发发送），返回成功人数"""
+        result = await self.fan_out(
+            room, player_ids, lambda pid: self.send_private_message(room, pid, text), "广播私聊"
+        )
+        return len(result.succeeded)
 
     # ========== 预设消息模板 ==========
 
@@ -147,7 +258,10 @@ class MessageService:
         if poisoned_name:
             text += f"\n同时，玩家 {poisoned_name} 死了！\n"
 
-        return await self.send_group_message(room, text)
+        from ..draw import render_service
+        return await self._send_rendered(
+            room, lambda: render_service.render_night_result(killed_name, poisoned_name, saved), text, "天亮"
+        )
 
     async def announce_vote_start(self, room: "GameRoom") -> bool:
         """公告投票开始"""
@@ -218,7 +332,25 @@ class MessageService:
         else:
             text += "\n⚖️ 平票，无人被放逐"
 
-        return await self.send_group_message(room, text)
+        def player_name(player_id: str) -> str:
+            player = room.get_player(player_id)
+            return player.display_name if player else player_id
+
+        vote_data = [
+            {
+                "name": player_name(target_id),
+                "votes": vote_count,
+                "voters": [player_name(v) for v in voters_map.get(target_id, [])],
+            }
+            for target_id, vote_count in sorted_votes
+            if room.get_player(target_id)
+        ]
+        exiled = getattr(exiled_name, "display_name", exiled_name)
+
+        from ..draw import render_service
+        return await self._send_rendered(
+            room, lambda: render_service.render_vote_result(vote_data, exiled, is_pk), text, "投票结果"
+        )
 
     async def announce_hunter_can_shoot(self, room: "GameRoom", hunter_name: str) -> bool:
         """公告猎人可以开枪"""
@@ -0,0 +1,143 @@
+"""群消息发送队列 - 按群限速、合并短消息、保持顺序"""
+import asyncio
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional
+from astrbot.api import logger
+
+
+@dataclass
+class OutboundMessage:
+    """待发送的群消息"""
+    msg_origin: Any                     # 消息源
+    transport: Any                      # 传输层（Transport）
+    text: str = ""                      # 纯文本内容（可合并）
+    chain: Any = None                   # 消息链（不合并，如@消息）
+    fallback: Optional[List[str]] = None  # 消息链发送失败时改为逐条发送的纯文本
+
+    @property
+    def mergeable(self) -> bool:
+        """是否是可合并的短系统消息"""
+        return self.chain is None and "\n" not in self.text and len(self.text) <= GroupOutbox.COALESCE_MAX_CHARS
+
+
+class _GroupQueue:
+    """单个群的发送队列"""
+
+    def __init__(self):
+        self.items: Deque[OutboundMessage] = deque()
+        self.wakeup = asyncio.Event()
+        self.task: Optional[asyncio.Task] = None
+        self.last_sent = 0.0
+        self.sending = False            # 是否有已出队、尚未发送完成的消息
+
+
+class GroupOutbox:
+    """群消息发送队列
+
+    每个群一个后台发送任务：
+    - 同一个群两次发送之间至少间隔 SEND_INTERVAL_SECONDS
+    - 连续的短系统消息（如投票播报）在 COALESCE_WINDOW_SECONDS 窗口内合并为一条
+    - 严格按入队顺序发送
+    队列空闲超过 IDLE_EXIT_SECONDS 后任务自动退出，下次入队时重新创建。
+    """
+
+    SEND_INTERVAL_SECONDS = 1.0
+    COALESCE_WINDOW_SECONDS = 0.5
+    COALESCE_MAX_CHARS = 60
+    MERGED_MAX_CHARS = 600
+    IDLE_EXIT_SECONDS = 30
+
+    def __init__(self, deliver: Callable[[OutboundMessage], Awaitable[bool]]):
+        self._deliver = deliver
+        self._queues: Dict[str, _GroupQueue] = {}
+
+    def enqueue(self, group_id: str, message: OutboundMessage) -> None:
+        """入队（不阻塞）"""
+        queue = self._queues.get(group_id)
+        if not queue:
+            queue = self._queues[group_id] = _GroupQueue()
+        queue.items.append(message)
+        queue.wakeup.set()
+        if not queue.task or queue.task.done():
+            queue.task = asyncio.create_task(self._sender(group_id, queue))
+
+    def pending(self, group_id: str) -> int:
+        """群内待发送消息数"""
+        queue = self._queues.get(group_id)
+        return len(queue.items) if queue else 0
+
+    async def drain(self, timeout: float = 10) -> None:
+        """等待所有队列发送完毕（插件卸载前调用）"""
+        deadline = time.monotonic() + timeout
+        while any(q.items or q.sending for q in self._queues.values()) and time.monotonic() < deadline:
+            await asyncio.sleep(0.1)
+
+    async def _sender(self, group_id: str, queue: _GroupQueue) -> None:
+        try:
+            while True:
+                if not queue.items:
+                    queue.wakeup.clear()
+                    try:
+                        await asyncio.wait_for(queue.wakeup.wait(), self.IDLE_EXIT_SECONDS)
+                    except asyncio.TimeoutError:
+                        if not queue.items:
+                            self._queues.pop(group_id, None)
+                            return
+                        continue
+
+                queue.sending = True
+                try:
+                    message = queue.items.popleft()
+                    if message.mergeable:
+                        message = await self._coalesce(queue, message)
+
+                    # 限速
+                    wait = queue.last_sent + self.SEND_INTERVAL_SECONDS - time.monotonic()
+                    if wait > 0:
+                        await asyncio.sleep(wait)
+
+                    try:
+                        await self._deliver(message)
+                    except Exception as e:
+                        logger.error(f"[狼人杀] 群 {group_id} 队列消息发送失败: {e}")
+                    queue.last_sent = time.monotonic()
+                finally:
+                    queue.sending = False
+        except asyncio.CancelledError:
+            pass
+
+    async def _coalesce(self, queue: _GroupQueue, first: OutboundMessage) -> OutboundMessage:
+        """在合并窗口内收集后续连续的短消息，合并为一条
+
+        队列为空且不在连续发送中（距上次发送已超过限速间隔）时不等待窗口，立即发送。
+        """
+        lines = [first.text]
+        length = len(first.text)
+        now = time.monotonic()
+        deadline = now + self.COALESCE_WINDOW_SECONDS
+        in_burst = now < queue.last_sent + self.SEND_INTERVAL_SECONDS
+
+        while True:
+            while queue.items and queue.items[0].mergeable and queue.items[0].msg_origin == first.msg_origin:
+                nxt = queue.items[0]
+                if length + len(nxt.text) + 1 > self.MERGED_MAX_CHARS:
+                    return OutboundMessage(first.msg_origin, first.transport, "\n".join(lines))
+                queue.items.popleft()
+                lines.append(nxt.text)
+                length += len(nxt.text) + 1
+
+            # 遇到不可合并的消息立即结束合并以保持顺序；不在连续发送中时不等待窗口
+            if queue.items or not in_burst:
+                break
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            queue.wakeup.clear()
+            try:
+                await asyncio.wait_for(queue.wakeup.wait(), remaining)
+            except asyncio.TimeoutError:
+                break
+
+        return OutboundMessage(first.msg_origin, first.transport, "\n".join(lines))
@@ -0,0 +1,175 @@
+"""房间持久化服务 - 写后快照（write-behind）"""
+import asyncio
+import os
+import pickle
+import time
+import zlib
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple, TYPE_CHECKING
+from astrbot.api import logger
+
+if TYPE_CHECKING:
+    from ..models import GameRoom
+
+# 快照中不保存的运行时字段（任务、锁、Bot实例无法序列化）
+_TRANSIENT_FIELDS = ("bot", "transport", "timer_task", "wolf_ai_vote_task", "wolf_ai_process_task", "_lock")
+
+SNAPSHOT_SUFFIX = ".snap"
+SNAPSHOT_VERSION = 1
+
+
+class RoomStore:
+    """房间快照存储
+
+    后台任务定期检查房间是否有变化，变化的房间在事件循环上序列化，
+    压缩与写盘批量放到线程池执行，避免阻塞事件循环。
+    快照格式：pickle + zlib，写入临时文件后原子替换。
+    """
+
+    FLUSH_INTERVAL_SECONDS = 3.0
+
+    def __init__(self, data_dir: str):
+        self.data_dir = Path(data_dir)
+        self._fingerprints: Dict[str, tuple] = {}
+        self._flush_task: Optional[asyncio.Task] = None
+        self._rooms_provider: Optional[Callable[[], Dict[str, "GameRoom"]]] = None
+
+    # ========== 序列化 ==========
+
+    @staticmethod
+    def snapshot(room: "GameRoom") -> dict:
+        """生成房间快照（仅包含可序列化的状态）"""
+        state = {
+            name: value for name, value in room.__dict__.items()
+            if name not in _TRANSIENT_FIELDS
+        }
+        return {"version": SNAPSHOT_VERSION, "saved_at": time.time(), "room": state}
+
+    @staticmethod
+    def restore(snapshot: dict) -> "GameRoom":
+        """从快照还原房间（不含Bot与定时器；配置为快照时的配置，由 GameManager 换成当前配置）"""
+        from ..models import GameRoom
+        state = dict(snapshot["room"])
+        room = GameRoom(
+            group_id=state.pop("group_id"),
+            creator_id=state.pop("creator_id"),
+            config=state.pop("config"),
+        )
+        room.__dict__.update(state)
+        return room
+
+    @staticmethod
+    def _fingerprint(room: "GameRoom") -> tuple:
+        """房间变化指纹（事件日志偏移 + 关键可变状态）"""
+        return (
+            room.phase,
+            len(room.players),
+            room.journal.next_offset,
+            len(room.vote_state.night_votes),
+            len(room.vote_state.day_votes),
+            room.speaking_state.current_index,
+            len(room.speaking_state.current_speech),
+            room.phase_deadline,
+        )
+
+    # ========== 文件读写（线程池中执行） ==========
+
+    def _path(self, group_id: str) -> Path:
+        return self.data_dir / f"{group_id}{SNAPSHOT_SUFFIX}"
+
+    def _write_batch(self, batch: List[Tuple[str, Optional[bytes]]]) -> None:
+        """批量写入快照，数据为None表示删除"""
+        self.data_dir.mkdir(parents=True, exist_ok=True)
+        for group_id, payload in batch:
+            path = self._path(group_id)
+            try:
+                if payload is None:
+                    if path.exists():
+                        path.unlink()
+                    continue
+                tmp_path = path.with_suffix(".tmp")
+                with open(tmp_path, "wb") as f:
+                    f.write(zlib.compress(payload, 6))
+                os.replace(tmp_path, path)
+            except Exception as e:
+                logger.error(f"[狼人杀] 写入房间快照失败 {group_id}: {e}")
+
+    def load_all(self) -> List[dict]:
+        """读取所有快照（启动时调用）"""
+        snapshots = []
+        if not self.data_dir.exists():
+            return snapshots
+        for path in self.data_dir.glob(f"*{SNAPSHOT_SUFFIX}"):
+            try:
+                with open(path, "rb") as f:
+                    snapshot = pickle.loads(zlib.decompress(f.read()))
+                if snapshot.get("version") != SNAPSHOT_VERSION:
+                    raise ValueError(f"快照版本不匹配: {snapshot.get('version')}")
+                snapshots.append(snapshot)
+            except Exception as e:
+                logger.error(f"[狼人杀] 读取房间快照失败 {path.name}: {e}")
+                try:
+                    path.unlink()
+                except OSError as unlink_error:
+                    logger.error(f"[狼人杀] 删除损坏的房间快照失败 {path.name}: {unlink_error}")
+        return snapshots
+
+    # ========== 写后刷新 ==========
+
+    def start(self, rooms_provider: Callable[[], Dict[str, "GameRoom"]]) -> None:
+        """启动后台刷新任务"""
+        self._rooms_provider = rooms_provider
+        if not self._flush_task or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._flush_loop())
+
+    async def stop(self) -> None:
+        """停止后台刷新并做最后一次刷新"""
+        if self._flush_task and not self._flush_task.done():
+            self._flush_task.cancel()
+            try:
+                await self._flush_task
+            except asyncio.CancelledError:
+                pass
+        self._flush_task = None
+        await self.flush()
+
+    async def _flush_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.FLUSH_INTERVAL_SECONDS)
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error(f"[狼人杀] 房间快照刷新失败: {e}")
+
+    async def flush(self) -> None:
+        """把有变化的房间写入磁盘，已删除的房间移除快照"""
+        if not self._rooms_provider:
+            return
+        rooms = self._rooms_provider()
+        batch: List[Tuple[str, Optional[bytes]]] = []
+
+        for group_id, room in list(rooms.items()):
+            fingerprint = self._fingerprint(room)
+            if self._fingerprints.get(group_id) == fingerprint:
+                continue
+            try:
+                payload = pickle.dumps(self.snapshot(room), protocol=pickle.HIGHEST_PROTOCOL)
+            except Exception as e:
+                logger.error(f"[狼人杀] 房间 {group_id} 序列化失败: {e}")
+                continue
+            self._fingerprints[group_id] = fingerprint
+            batch.append((group_id, payload))
+
+        for group_id in [g for g in self._fingerprints if g not in rooms]:
+            del self._fingerprints[group_id]
+            batch.append((group_id, None))
+
+        if batch:
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(None, self._write_batch, batch)
+
+    async def discard(self, group_id: str) -> None:
+        """立即删除房间快照"""
+        self._fingerprints.pop(group_id, None)
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, self._write_batch, [(group_id, None)])
@@ -0,0 +1,209 @@
+"""平台调用重试队列 - 失败的幂等群操作按指数退避重试"""
+import asyncio
+import json
+import os
+import random
+import time
+from dataclasses import asdict, dataclass
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional
+from astrbot.api import logger
+
+
+class StaleOpError(Exception):
+    """操作已失效（如房间已结束后的非撤销操作），不再重试，直接转入死信"""
+
+
+@dataclass
+class RetryOp:
+    """待重试的群操作（value 为目标值：禁言时长 / 是否开启 / 群昵称）"""
+    group_id: str
+    kind: str                       # 操作类型（与台账的 KIND_* 一致）
+    user_id: str = ""
+    value: Any = None
+    attempts: int = 0               # 已重试次数
+    created_at: float = 0.0         # 首次失败时间
+    next_at: float = 0.0            # 下次重试时间
+    last_error: str = ""            # 最近一次失败原因
+
+    @property
+    def key(self) -> str:
+        return f"{self.group_id}:{self.kind}:{self.user_id}"
+
+    def describe(self) -> str:
+        """可读描述"""
+        target = f" {self.user_id}" if self.user_id else ""
+        return f"群{self.group_id} {self.kind}{target}={self.value!r}"
+
+
+class RetryQueue:
+    """平台调用重试队列
+
+    - 同一群、同一操作类型、同一玩家只保留最新的目标值（后来的意图覆盖先前的）
+    - 重试间隔按指数退避并加随机抖动，上限 MAX_DELAY_SECONDS
+    - 超过 MAX_ATTEMPTS 次或首次失败后超过 MAX_AGE_SECONDS 仍未成功的操作转入死信
+    队列与死信都持久化到磁盘，插件重启后继续重试。
+    """
+
+    BASE_DELAY_SECONDS = 2
+    MAX_DELAY_SECONDS = 300
+    MAX_ATTEMPTS = 10
+    MAX_AGE_SECONDS = 3600
+    MAX_DEAD_LETTERS = 100
+    POLL_INTERVAL_SECONDS = 1
+    CALL_TIMEOUT_SECONDS = 10
+
+    def __init__(self, path: str, executor: Callable[[RetryOp], Awaitable[None]]):
+        self.path = path
+        self._executor = executor
+        self._pending: Dict[str, RetryOp] = {}
+        self._dead: List[RetryOp] = []
+        self._write_lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self._load()
+
+    def _load(self) -> None:
+        """读取队列文件"""
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            for d in data.get("pending", []):
+                op = RetryOp(**d)
+                self._pending[op.key] = op
+            self._dead = [RetryOp(**d) for d in data.get("dead", [])]
+            if self._pending:
+                logger.info(f"[狼人杀] 重试队列中有 {len(self._pending)} 个待重试操作")
+        except Exception as e:
+            logger.error(f"[狼人杀] 读取重试队列失败: {e}")
+
+    def _write(self, data: dict) -> None:
+        """原子写入队列文件（线程池中执行）"""
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+
+    async def _persist(self) -> None:
+        async with self._write_lock:
+            data = {
+                "pending": [asdict(op) for op in self._pending.values()],
+                "dead": [asdict(op) for op in self._dead],
+            }
+            try:
+                loop = asyncio.get_running_loop()
+                await loop.run_in_executor(None, self._write, data)
+            except Exception as e:
+                logger.error(f"[狼人杀] 写入重试队列失败: {e}")
+
+    def _backoff(self, attempts: int) -> float:
+        """第attempts次重试前的等待时间（指数退避 + 全抖动）"""
+        delay = min(self.MAX_DELAY_SECONDS, self.BASE_DELAY_SECONDS * (2 ** attempts))
+        return random.uniform(delay / 2, delay)
+
+    # ========== 入队与撤销 ==========
+
+    async def enqueue(self, group_id: str, kind: str, user_id: str, value: Any, error: str = "") -> None:
+        """登记失败的操作（覆盖同一目标上尚未完成的旧操作）"""
+        now = time.time()
+        op = RetryOp(
+            group_id=group_id, kind=kind, user_id=user_id, value=value,
+            created_at=now, next_at=now + self._backoff(0), last_error=error
+        )
+        self._pending[op.key] = op
+        logger.info(f"[狼人杀] 操作失败，已加入重试队列：{op.describe()}")
+        await self._persist()
+
+    async def discard(self, group_id: str, kind: str, user_id: str = "") -> None:
+        """同一目标的操作已直接成功，丢弃待重试的旧操作"""
+        if self._pending.pop(f"{group_id}:{kind}:{user_id}", None) is not None:
+            await self._persist()
+
+    async def discard_group(self, group_id: str) -> None:
+        """丢弃某个群的所有待重试操作（房间清理时调用，由对账重新决定目标状态）"""
+        keys = [k for k, op in self._pending.items() if op.group_id == group_id]
+        for key in keys:
+            del self._pending[key]
+        if keys:
+            await self._persist()
+
+    async def discard_orphans(self, active_groups: Iterable[str]) -> int:
+        """丢弃没有对应房间的群的待重试操作（启动时调用，遗留的群状态由台账对账撤销），返回丢弃数"""
+        active_groups = set(active_groups)
+        keys = [k for k, op in self._pending.items() if op.group_id not in active_groups]
+        for key in keys:
+            logger.info(f"[狼人杀] 房间已不存在，丢弃待重试操作：{self._pending.pop(key).describe()}")
+        if keys:
+            await self._persist()
+        return len(keys)
+
+    def pending(self) -> List[RetryOp]:
+        """待重试操作（按下次重试时间排序）"""
+        return sorted(self._pending.values(), key=lambda op: op.next_at)
+
+    def dead_letters(self) -> List[RetryOp]:
+        """死信（最近的在后）"""
+        return list(self._dead)
+
+    # ========== 后台重试 ==========
+
+    def start(self) -> None:
+        """启动后台重试任务"""
+        if not self._task or self._task.done():
+            self._task = asyncio.create_task(self._worker())
+
+    async def stop(self) -> None:
+        """停止后台重试任务"""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _worker(self) -> None:
+        try:
+            while True:
+                await asyncio.sleep(self.POLL_INTERVAL_SECONDS)
+                now = time.time()
+                due = [op for op in self._pending.values() if op.next_at <= now]
+                if due:
+                    await asyncio.gather(*(self._attempt(op) for op in due))
+                    await self._persist()
+        except asyncio.CancelledError:
+            pass
+
+    async def _attempt(self, op: RetryOp) -> None:
+        """执行一次重试"""
+        try:
+            await asyncio.wait_for(self._executor(op), self.CALL_TIMEOUT_SECONDS)
+        except StaleOpError as e:
+            if self._pending.get(op.key) is op:
+                op.last_error = str(e)
+                self._bury(op)
+                logger.warning(f"[狼人杀] 操作已失效，不再重试：{op.describe()}（{op.last_error}）")
+            return
+        except Exception as e:
+            # 重试期间被新的操作覆盖或撤销，放弃旧操作
+            if self._pending.get(op.key) is not op:
+                return
+            op.attempts += 1
+            op.last_error = str(e) or type(e).__name__
+            if op.attempts >= self.MAX_ATTEMPTS or time.time() - op.created_at > self.MAX_AGE_SECONDS:
+                self._bury(op)
+                logger.error(f"[狼人杀] 操作重试 {op.attempts} 次仍失败，转入死信：{op.describe()}（{op.last_error}）")
+            else:
+                op.next_at = time.time() + self._backoff(op.attempts)
+            return
+
+        if self._pending.get(op.key) is op:
+            del self._pending[op.key]
+        logger.info(f"[狼人杀] 重试成功：{op.describe()}（第 {op.attempts + 1} 次）")
+
+    def _bury(self, op: RetryOp) -> None:
+        """移出队列并转入死信（只保留最近 MAX_DEAD_LETTERS 条）"""
+        del self._pending[op.key]
+        self._dead.append(op)
+        del self._dead[:-self.MAX_DEAD_LETTERS]
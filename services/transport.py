@@ -0,0 +1,188 @@
+"""消息与群管理传输层 - OneBot实现与内存实现"""
+import asyncio
+import base64
+import random
+import time
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, List, Optional, Union
+
+
+class TransportError(Exception):
+    """传输层调用失败"""
+
+
+class Transport(ABC):
+    """传输层接口
+
+    服务层只通过该接口发送消息和修改群状态，群号与QQ号统一使用字符串，
+    由具体实现负责转换为平台需要的格式。
+    """
+
+    @abstractmethod
+    async def send_group_message(self, msg_origin: Any, chain: Any) -> None:
+        """发送群消息（chain 为 MessageChain）"""
+
+    @abstractmethod
+    async def send_private_message(self, user_id: str, text: str) -> None:
+        """发送私聊消息"""
+
+    @abstractmethod
+    async def send_private_image(self, user_id: str, data: bytes) -> None:
+        """发送私聊图片（data 为编码后的图片字节）"""
+
+    @abstractmethod
+    async def set_group_ban(self, group_id: str, user_id: str, duration: int) -> None:
+        """禁言（duration为0表示解除）"""
+
+    @abstractmethod
+    async def set_group_whole_ban(self, group_id: str, enable: bool) -> None:
+        """全员禁言"""
+
+    @abstractmethod
+    async def set_group_admin(self, group_id: str, user_id: str, enable: bool) -> None:
+        """设置/取消管理员"""
+
+    @abstractmethod
+    async def set_group_card(self, group_id: str, user_id: str, card: str) -> None:
+        """设置群昵称"""
+
+
+class OneBotTransport(Transport):
+    """OneBot（aiocqhttp）实现：群消息走 AstrBot 的 context，其余调用走 OneBot 客户端"""
+
+    def __init__(self, context, bot):
+        self.context = context
+        self.bot = bot
+
+    def _require_bot(self):
+        if not self.bot:
+            raise TransportError("Bot实例不可用")
+        return self.bot
+
+    async def send_group_message(self, msg_origin: Any, chain: Any) -> None:
+        await self.context.send_message(msg_origin, chain)
+
+    async def send_private_message(self, user_id: str, text: str) -> None:
+        await self._require_bot().send_private_msg(user_id=int(user_id), message=text)
+
+    async def send_private_image(self, user_id: str, data: bytes) -> None:
+        # 以base64直接发送内存中的图片，不落临时文件
+        message = [{"type": "image", "data": {"file": "base64://" + base64.b64encode(data).decode()}}]
+        await self._require_bot().send_private_msg(user_id=int(user_id), message=message)
+
+    async def set_group_ban(self, group_id: str, user_id: str, duration: int) -> None:
+        await self._require_bot().set_group_ban(group_id=int(group_id), user_id=int(user_id), duration=duration)
+
+    async def set_group_whole_ban(self, group_id: str, enable: bool) -> None:
+        await self._require_bot().set_group_whole_ban(group_id=int(group_id), enable=enable)
+
+    async def set_group_admin(self, group_id: str, user_id: str, enable: bool) -> None:
+        await self._require_bot().set_group_admin(group_id=int(group_id), user_id=int(user_id), enable=enable)
+
+    async def set_group_card(self, group_id: str, user_id: str, card: str) -> None:
+        await self._require_bot().set_group_card(group_id=int(group_id), user_id=int(user_id), card=card)
+
+
+@dataclass
+class TransportCall:
+    """内存传输层记录的一次调用"""
+    method: str
+    args: Dict[str, Any]
+    started: float                       # 开始时间（time.monotonic）
+    finished: float = 0.0                # 结束时间
+    error: str = ""                      # 失败原因（成功为空）
+
+    @property
+    def ok(self) -> bool:
+        return not self.error
+
+    @property
+    def latency(self) -> float:
+        return self.finished - self.started
+
+
+class InMemoryTransport(Transport):
+    """内存实现：不连接任何平台，记录每次调用并可注入延迟与失败
+
+    用于离线运行完整对局的吞吐量与尾延迟测试。
+    latency 为固定秒数，或按方法名返回秒数的函数；
+    failure_rate 为随机失败概率，fail_methods 中的方法总是失败。
+    """
+
+    def __init__(
+        self,
+        latency: Union[float, Callable[[str], float]] = 0.0,
+        failure_rate: float = 0.0,
+        fail_methods: Iterable[str] = (),
+        seed: Optional[int] = None
+    ):
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.fail_methods = set(fail_methods)
+        self.calls: List[TransportCall] = []
+        self._rng = random.Random(seed)
+
+    async def _call(self, method: str, **args) -> None:
+        call = TransportCall(method=method, args=args, started=time.monotonic())
+        self.calls.append(call)
+        try:
+            delay = self.latency(method) if callable(self.latency) else self.latency
+            if delay > 0:
+                await asyncio.sleep(delay)
+            if method in self.fail_methods or (self.failure_rate and self._rng.random() < self.failure_rate):
+                call.error = "注入的失败"
+                raise TransportError(f"{method} 注入的失败")
+        finally:
+            call.finished = time.monotonic()
+
+    async def send_group_message(self, msg_origin: Any, chain: Any) -> None:
+        text = chain.get_plain_text() if hasattr(chain, "get_plain_text") else str(chain)
+        await self._call("send_group_message", msg_origin=msg_origin, text=text)
+
+    async def send_private_message(self, user_id: str, text: str) -> None:
+        await self._call("send_private_message", user_id=user_id, text=text)
+
+    async def send_private_image(self, user_id: str, data: bytes) -> None:
+        await self._call("send_private_image", user_id=user_id, size=len(data))
+
+    async def set_group_ban(self, group_id: str, user_id: str, duration: int) -> None:
+        await self._call("set_group_ban", group_id=group_id, user_id=user_id, duration=duration)
+
+    async def set_group_whole_ban(self, group_id: str, enable: bool) -> None:
+        await self._call("set_group_whole_ban", group_id=group_id, enable=enable)
+
+    async def set_group_admin(self, group_id: str, user_id: str, enable: bool) -> None:
+        await self._call("set_group_admin", group_id=group_id, user_id=user_id, enable=enable)
+
+    async def set_group_card(self, group_id: str, user_id: str, card: str) -> None:
+        await self._call("set_group_card", group_id=group_id, user_id=user_id, card=card)
+
+    # ========== 统计 ==========
+
+    def calls_of(self, method: str) -> List[TransportCall]:
+        """某个方法的全部调用"""
+        return [c for c in self.calls if c.method == method]
+
+    def stats(self, method: Optional[str] = None) -> Dict[str, float]:
+        """调用统计：次数、失败数、延迟分位数（秒）"""
+        calls = self.calls_of(method) if method else self.calls
+        latencies = sorted(c.latency for c in calls if c.finished)
+        if not latencies:
+            return {"count": len(calls), "failed": 0}
+
+        def percentile(p: float) -> float:
+            return latencies[min(len(latencies) - 1, int(p * len(latencies)))]
+
+        return {
+            "count": len(calls),
+            "failed": sum(1 for c in calls if not c.ok),
+            "p50": percentile(0.50),
+            "p95": percentile(0.95),
+            "p99": percentile(0.99),
+            "max": latencies[-1],
+        }
+
+    def clear(self) -> None:
+        """清空调用记录"""
+        self.calls.clear()
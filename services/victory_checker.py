@@ -39,6 +39,24 @@ class VictoryChecker:
         # 游戏继续
         return None, None
 
+    @staticmethod
+    def get_game_digest(room: "GameRoom") -> str:
+        """获取对局摘要（每晚的刀、验、药以及白天的出局结果，不含发言）"""
+        from ..models import EventType
+
+        journal = room.journal
+        lines = ["📋 对局摘要："]
+        for event in journal.of_type(
+            EventType.ROUND_START, EventType.WOLF_KILL, EventType.SEER_CHECK,
+            EventType.WITCH_SAVE, EventType.WITCH_POISON, EventType.HUNTER_SHOT,
+            EventType.VOTE_RESULT, EventType.DEATH,
+        ):
+            if event.type == EventType.ROUND_START:
+                lines.append(f"\n【第{event.round}轮】")
+            else:
+                lines.extend(journal.render([event]))
+        return "\n".join(lines) if len(lines) > 1 else ""
+
     @staticmethod
     def get_all_players_roles(room: "GameRoom") -> str:
         """获取所有玩家的身份列表"""
@@ -0,0 +1,10 @@
+"""仿真层 - 无头全AI对局与批量统计"""
+from .policy import HeuristicAIPlayerService
+from .headless import HeadlessGameManager, GameResult, check_journal
+
+__all__ = [
+    "HeuristicAIPlayerService",
+    "HeadlessGameManager",
+    "GameResult",
+    "check_journal",
+]
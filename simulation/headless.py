@@ -0,0 +1,148 @@
+"""无头对局 - 不连接群聊、不调用LLM的对局（AI座位用启发式策略，真人座位不操作）"""
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+from astrbot.api import logger
+
+from ..models import GameConfig, GameRoom, AIPlayerConfig, EventType
+from ..services import GameManager, VictoryChecker, Transport
+from ..phases import NightWolfPhase
+from .policy import HeuristicAIPlayerService
+
+
+@dataclass
+class GameResult:
+    """单局仿真结果"""
+    winner: str = ""                        # 胜利阵营: werewolf / villager / 空(超时)
+    rounds: int = 0                         # 进行轮数
+    first_night_kill: str = ""              # 首夜被刀玩家的角色（Role.value）
+    seed: int = 0                           # 对局随机种子
+    duration: float = 0.0                   # 耗时（秒）
+    stuck_phase: str = ""                   # 超时或异常时所处的阶段
+    flow_errors: List[str] = field(default_factory=list)  # 事件日志中的流程错误
+
+    @property
+    def valid(self) -> bool:
+        """对局正常结束且流程正确"""
+        return bool(self.winner) and not self.flow_errors
+
+
+def check_journal(room: GameRoom) -> List[str]:
+    """检查事件日志中的流程是否正确，返回错误描述
+
+    - 回合从1开始连续递增，且与房间的回合数一致
+    - 每一轮至多放逐一人（放逐后必须先进入夜晚）
+    """
+    errors = []
+    rounds = [e.round for e in room.journal if e.type == EventType.ROUND_START]
+    if rounds != list(range(1, len(rounds) + 1)):
+        errors.append(f"回合序号不连续: {rounds}")
+    if len(rounds) != room.current_round:
+        errors.append(f"回合开始事件 {len(rounds)} 个，房间回合数 {room.current_round}")
+
+    exiles: Dict[int, int] = {}
+    for event in room.journal:
+        if event.type == EventType.VOTE_RESULT and event.target:
+            exiles[event.round] = exiles.get(event.round, 0) + 1
+    for round_no, count in sorted(exiles.items()):
+        if count > 1:
+            errors.append(f"第{round_no}轮放逐了 {count} 人，中间没有夜晚")
+    return errors
+
+
+class HeadlessGameManager(GameManager):
+    """无头游戏管理器
+
+    默认房间没有传输层，消息与禁言服务会直接跳过；
+    传入 transport（如 InMemoryTransport）时所有消息与群操作都经过它，用于离线压测。
+    AI决策由 HeuristicAIPlayerService 给出，不访问LLM。
+    """
+
+    def __init__(self, config: GameConfig, transport: Optional[Transport] = None):
+        super().__init__(None, config)
+        self.transport = transport
+        self.ai_player_service = HeuristicAIPlayerService(None)
+        self._finished: Dict[str, asyncio.Event] = {}
+        self._results: Dict[str, GameResult] = {}
+
+    async def process_night_kill(self, room):
+        killed_id = await super().process_night_kill(room)
+        if killed_id and room.current_round == 1:
+            killed = room.get_player(killed_id)
+            result = self._results.get(room.group_id)
+            if killed and killed.role and result:
+                result.first_night_kill = killed.role.value
+        return killed_id
+
+    async def cleanup_room(self, group_id: str) -> None:
+        room = self.rooms.get(group_id)
+        if room:
+            result = self._results.get(group_id)
+            if result:
+                _, winner = VictoryChecker.check(room)
+                result.winner = winner or ""
+                result.rounds = room.current_round
+                result.flow_errors = check_journal(room)
+
+        await super().cleanup_room(group_id)
+
+        self.ai_player_service.clear_room_data(group_id)
+        event = self._finished.get(group_id)
+        if event:
+            event.set()
+
+    def _current_phase(self, group_id: str) -> str:
+        room = self.rooms.get(group_id)
+        return room.phase.value if room else ""
+
+    async def play_game(
+        self, group_id: str, timeout: float = 60, seed: Optional[int] = None, humans: int = 0
+    ) -> GameResult:
+        """进行一局对局，返回结果（相同seed的对局可复现）
+
+        前 humans 个座位是不操作的真人座位：他们会收到私聊身份、被改群昵称、发言时被设为临时管理员，
+        各阶段按超时推进，用于压测覆盖真人玩家涉及的平台调用。
+        """
+        result = GameResult()
+        self._results[group_id] = result
+        self._finished[group_id] = asyncio.Event()
+        start = time.monotonic()
+
+        try:
+            room = self.create_room(
+                group_id, "simulation",
+                msg_origin=group_id if self.transport else None,
+                bot=None,
+                seed=seed,
+                transport=self.transport
+            )
+            result.seed = room.seed
+            for i in range(1, self.config.total_players + 1):
+                if i <= humans:
+                    self.add_player(room, f"{group_id}_human{i}", f"玩家{i}")
+                else:
+                    self.add_ai_player(room, f"{group_id}_{i}", AIPlayerConfig(name=f"AI{i}"))
+
+            await self.start_game(room)
+            if group_id in self.rooms:
+                await NightWolfPhase(self).on_enter(room)
+
+            await asyncio.wait_for(self._finished[group_id].wait(), timeout)
+        except asyncio.TimeoutError:
+            result.stuck_phase = self._current_phase(group_id)
+            logger.warning(f"[狼人杀] 仿真对局 {group_id} 超时未结束（{result.stuck_phase}）")
+            await self.cleanup_room(group_id)
+            result.winner = ""
+        except Exception as e:
+            result.stuck_phase = self._current_phase(group_id)
+            logger.error(f"[狼人杀] 仿真对局 {group_id} 异常: {e}")
+            await self.cleanup_room(group_id)
+            result.winner = ""
+        finally:
+            self._finished.pop(group_id, None)
+            self._results.pop(group_id, None)
+
+        result.duration = time.monotonic() - start
+        return result
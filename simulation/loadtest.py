@@ -0,0 +1,108 @@
+"""离线压测 - 在内存传输层上并发运行完整对局，统计吞吐量与调用尾延迟
+
+用法（在AstrBot根目录下）：
+    python -m data.plugins.astrbot_plugin_werewolf.simulation.loadtest \\
+        --games 200 --concurrency 50 --latency 0.05 --failure-rate 0.01 --humans 2
+
+每局前 --humans 个座位是不操作的真人座位，覆盖私聊、改昵称、临时管理员等调用；
+所有阶段超时为0，真人座位的回合立即超时推进。
+有对局未结束时报告其阶段并以非零状态退出，吞吐量与耗时只统计正常结束的对局。
+"""
+import argparse
+import asyncio
+import json
+import logging
+import time
+from typing import Dict, List
+
+from ..services import InMemoryTransport
+from .headless import GameResult, HeadlessGameManager
+from .tournament import build_config, parse_board
+
+# 单局超时（秒）
+GAME_TIMEOUT_SECONDS = 120
+
+# 完整对局应覆盖的平台调用（有真人座位时）
+EXPECTED_METHODS = (
+    "send_group_message",
+    "send_private_message",
+    "set_group_ban",
+    "set_group_whole_ban",
+    "set_group_admin",
+    "set_group_card",
+)
+
+
+async def run_load_test(
+    board,
+    games: int,
+    concurrency: int,
+    latency: float,
+    failure_rate: float,
+    seed: int = 0,
+    humans: int = 2
+) -> dict:
+    """并发运行 games 局对局，返回吞吐量与各调用的延迟统计"""
+    transport = InMemoryTransport(latency=latency, failure_rate=failure_rate, seed=seed)
+    manager = HeadlessGameManager(build_config(board), transport=transport)
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(index: int) -> GameResult:
+        async with semaphore:
+            return await manager.play_game(f"load_{index}", GAME_TIMEOUT_SECONDS, seed + index, humans)
+
+    start = time.monotonic()
+    results = await asyncio.gather(*(one(i) for i in range(games)))
+    elapsed = time.monotonic() - start
+
+    # 等待队列中剩余的群消息发完，统计才完整
+    await manager.message_service.outbox.drain(timeout=GAME_TIMEOUT_SECONDS)
+
+    finished = [r for r in results if r.winner]
+    stuck_phases: Dict[str, int] = {}
+    for r in results:
+        if not r.winner:
+            phase = r.stuck_phase or "unknown"
+            stuck_phases[phase] = stuck_phases.get(phase, 0) + 1
+
+    durations = sorted(r.duration for r in finished)
+    methods = sorted({c.method for c in transport.calls})
+    return {
+        "games": games,
+        "humans_per_game": humans,
+        "unfinished": games - len(finished),
+        "stuck_phases": stuck_phases,
+        "elapsed": round(elapsed, 3),
+        "games_per_second": round(len(finished) / elapsed, 3) if elapsed else 0,
+        "game_duration_p50": round(durations[len(durations) // 2], 3) if durations else 0,
+        "game_duration_max": round(durations[-1], 3) if durations else 0,
+        "calls": {m: {k: round(v, 4) for k, v in transport.stats(m).items()} for m in methods},
+        "uncovered_methods": [m for m in EXPECTED_METHODS if m not in methods] if humans else [],
+    }
+
+
+def main(argv: List[str] = None) -> None:
+    parser = argparse.ArgumentParser(description="狼人杀离线压测（内存传输层）")
+    parser.add_argument("--board", type=parse_board, default=(3, 1, 1, 1, 3),
+                        help="板子配置：狼人,预言家,女巫,猎人,平民")
+    parser.add_argument("--games", type=int, default=100, help="对局数")
+    parser.add_argument("--concurrency", type=int, default=20, help="同时进行的对局数")
+    parser.add_argument("--latency", type=float, default=0.05, help="每次平台调用的注入延迟（秒）")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="平台调用的注入失败概率")
+    parser.add_argument("--seed", type=int, default=0, help="随机种子")
+    parser.add_argument("--humans", type=int, default=2, help="每局不操作的真人座位数")
+    args = parser.parse_args(argv)
+
+    from astrbot.api import logger
+    logger.setLevel(logging.WARNING)
+
+    report = asyncio.run(run_load_test(
+        args.board, args.games, args.concurrency, args.latency, args.failure_rate, args.seed, args.humans
+    ))
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+    if report["unfinished"]:
+        raise SystemExit(f"{report['unfinished']} 局未结束（{report['stuck_phases']}），吞吐量与耗时不可信")
+
+
+if __name__ == "__main__":
+    main()
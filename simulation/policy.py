@@ -0,0 +1,190 @@
+"""启发式AI策略 - 不调用LLM的规则决策（用于仿真对局）"""
+from typing import Dict, List, Optional, Tuple, TYPE_CHECKING
+
+from ..models import Role
+from ..services.ai import AIPlayerService
+
+if TYPE_CHECKING:
+    from ..models import GameRoom, Player
+
+
+class HeuristicAIPlayerService(AIPlayerService):
+    """启发式AI玩家服务
+
+    与 AIPlayerService 接口一致，但所有决策都由简单规则给出：
+    - 狼人统一跟随第一个出刀的队友，优先刀已跳身份的预言家
+    - 预言家每晚验未验过的人，白天公开全部验人结果
+    - 女巫首夜必救，之后按概率毒杀被查杀的玩家
+    - 好人优先投被查杀的玩家，狼人优先投跳预言家的玩家
+    """
+
+    # 可调参数（仿真时用于调整策略强度）
+    WITCH_FIRST_NIGHT_SAVE = True       # 女巫首夜是否必救
+    WITCH_POISON_RATE = 0.3             # 无查杀信息时女巫随机毒人概率
+    SEER_CLAIM_RATE = 1.0               # 预言家白天公开验人结果的概率
+
+    def __init__(self, context=None):
+        super().__init__(context)
+        # 公开的验人声明 {群ID: {被验玩家编号: 是否狼人}}
+        self._claims: Dict[str, Dict[int, bool]] = {}
+        # 公开跳预言家的玩家 {群ID: 编号}
+        self._claimed_seer: Dict[str, int] = {}
+
+    # ==================== 工具方法 ====================
+
+    def _alive_numbers(self, room: "GameRoom", exclude: "Player" = None) -> List[int]:
+        """获取存活玩家编号"""
+        return sorted(
+            p.number for p in room.get_alive_players()
+            if not exclude or p.id != exclude.id
+        )
+
+    def _wolf_numbers(self, room: "GameRoom") -> List[int]:
+        """获取存活狼人编号"""
+        return [w.number for w in room.get_alive_werewolves()]
+
+    def _seer_checked_numbers(self, player: "Player", room: "GameRoom") -> Dict[int, bool]:
+        """预言家自己的验人结果 {编号: 是否狼人}"""
+        results = {}
+        if not player.ai_context:
+            return results
+        name_to_number = {p.display_name: p.number for p in room.players.values()}
+        for r in player.ai_context.seer_results:
+            number = name_to_number.get(r.get("target", ""))
+            if number:
+                results[number] = r.get("is_werewolf", False)
+        return results
+
+    def _publish_seer_claims(self, player: "Player", room: "GameRoom") -> str:
+        """预言家公开验人结果，返回发言文本"""
+        results = self._seer_checked_numbers(player, room)
+        self._claimed_seer[room.group_id] = player.number
+        self._claims.setdefault(room.group_id, {}).update(results)
+        if not results:
+            return f"我是预言家，{player.number}号，还没有验人信息"
+        parts = [f"{n}号{'查杀' if is_wolf else '金水'}" for n, is_wolf in sorted(results.items())]
+        return f"我是预言家，{player.number}号，验人结果：{'，'.join(parts)}"
+
+    def _claimed_wolves(self, room: "GameRoom") -> List[int]:
+        """公开被查杀且存活的玩家编号"""
+        claims = self._claims.get(room.group_id, {})
+        alive = set(self._alive_numbers(room))
+        return [n for n, is_wolf in claims.items() if is_wolf and n in alive]
+
+    # ==================== 狼人行动 ====================
+
+    async def decide_werewolf_kill(self, player: "Player", room: "GameRoom") -> Optional[int]:
+        """狼人刀人：跟随队友 > 跳预言家的玩家 > 随机好人"""
+        wolf_ids = {w.id for w in room.get_alive_werewolves()}
+        for voter_id, target_id in room.vote_state.night_votes.items():
+            if voter_id in wolf_ids and voter_id != player.id:
+                target = room.get_player(target_id)
+                if target and target.is_alive:
+                    return target.number
+
+        wolf_numbers = self._wolf_numbers(room)
+        candidates = [n for n in self._alive_numbers(room) if n not in wolf_numbers]
+        if not candidates:
+            return None
+
+        seer_number = self._claimed_seer.get(room.group_id)
+        if seer_number in candidates:
+            return seer_number
+        return room.rng.choice(candidates)
+
+    async def decide_werewolf_chat(self, player: "Player", room: "GameRoom") -> Optional[str]:
+        """狼人密谋"""
+        target = await self.decide_werewolf_kill(player, room)
+        return f"今晚刀{target}号" if target else None
+
+    # ==================== 预言家行动 ====================
+
+    async def decide_seer_check(self, player: "Player", room: "GameRoom") -> Optional[int]:
+        """预言家验人：随机验一个未验过的存活玩家"""
+        checked = self._seer_checked_numbers(player, room)
+        candidates = [n for n in self._alive_numbers(room, exclude=player) if n not in checked]
+        return room.rng.choice(candidates) if candidates else None
+
+    # ==================== 女巫行动 ====================
+
+    async def decide_witch_action(
+        self,
+        player: "Player",
+        room: "GameRoom",
+        can_save: bool,
+        can_poison: bool,
+        killed_player_name: Optional[str] = None
+    ) -> Tuple[str, Optional[int]]:
+        """女巫用药：首夜救人，有查杀则毒查杀，否则按概率随机毒"""
+        if can_save and killed_player_name and self.WITCH_FIRST_NIGHT_SAVE and room.is_first_night:
+            return ("save", None)
+
+        if can_poison:
+            targets = [n for n in self._claimed_wolves(room) if n != player.number]
+            if targets:
+                return ("poison", targets[0])
+            if not room.is_first_night and room.rng.random() < self.WITCH_POISON_RATE:
+                candidates = self._alive_numbers(room, exclude=player)
+                if candidates:
+                    return ("poison", room.rng.choice(candidates))
+
+        return ("pass", None)
+
+    # ==================== 猎人行动 ====================
+
+    async def decide_hunter_shoot(self, player: "Player", room: "GameRoom") -> Optional[int]:
+        """猎人开枪：优先带走被查杀的玩家，否则随机"""
+        claimed = [n for n in self._claimed_wolves(room) if n != player.number]
+        if claimed:
+            return claimed[0]
+        candidates = self._alive_numbers(room, exclude=player)
+        return room.rng.choice(candidates) if candidates else None
+
+    # ==================== 白天发言 ====================
+
+    async def generate_speech(self, player: "Player", room: "GameRoom", is_pk: bool = False) -> str:
+        """白天发言：预言家报验人结果，其他人过"""
+        if player.role == Role.SEER and room.rng.random() < self.SEER_CLAIM_RATE:
+            return self._publish_seer_claims(player, room)
+        return f"{player.number}号，我是好人，过"
+
+    async def generate_last_words(self, player: "Player", room: "GameRoom") -> str:
+        """遗言：预言家报验人结果"""
+        if player.role == Role.SEER:
+            return self._publish_seer_claims(player, room)
+        return "我是好人，大家加油"
+
+    # ==================== 投票 ====================
+
+    async def decide_vote(
+        self,
+        player: "Player",
+        room: "GameRoom",
+        is_pk: bool = False,
+        pk_candidates: List[int] = None
+    ) -> Tuple[str, Optional[int]]:
+        """投票：好人投查杀，狼人投跳预言家的玩家，否则随机"""
+        candidates = self._alive_numbers(room, exclude=player)
+        if is_pk and pk_candidates:
+            candidates = [n for n in candidates if n in pk_candidates]
+        if not candidates:
+            return ("", None)
+
+        if player.is_werewolf:
+            wolf_numbers = self._wolf_numbers(room)
+            preferred = [self._claimed_seer.get(room.group_id)]
+            fallback = [n for n in candidates if n not in wolf_numbers]
+        else:
+            preferred = self._claimed_wolves(room)
+            fallback = candidates
+
+        for n in preferred:
+            if n in candidates:
+                return (f"我投{n}号", n)
+        target = room.rng.choice(fallback or candidates)
+        return (f"我投{target}号", target)
+
+    def clear_room_data(self, group_id: str) -> None:
+        """清理房间的公开声明记录"""
+        self._claims.pop(group_id, None)
+        self._claimed_seer.pop(group_id, None)
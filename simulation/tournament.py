@@ -0,0 +1,199 @@
+"""仿真锦标赛 - 在多进程中批量运行无头对局并汇总统计
+
+用法（在AstrBot根目录下）：
+    python -m data.plugins.astrbot_plugin_werewolf.simulation.tournament \\
+        --board 3,1,1,1,3 --board 2,1,1,0,2 --games 2000 --workers 8 --out stats.json.gz
+
+每个 --board 为 狼人,预言家,女巫,猎人,平民 的数量。
+有对局超时未结束或事件日志流程错误时，打印这些对局的阶段与种子并以非零状态退出，不写出统计结果。
+"""
+import argparse
+import asyncio
+import gzip
+import json
+import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, List, Optional, Tuple
+
+from ..models import GameConfig
+from .headless import HeadlessGameManager, GameResult
+
+# 单个事件循环内同时进行的对局数
+ROOMS_PER_LOOP = 64
+# 单局超时（秒），仿真对局无等待，正常应在1秒内结束
+GAME_TIMEOUT_SECONDS = 30
+
+# 汇总中列出的异常对局种子数上限
+BROKEN_SEEDS_SHOWN = 10
+
+# 列式结果的列名
+COLUMNS = ("seed", "winner", "rounds", "first_night_kill", "duration", "stuck_phase", "flow_errors")
+
+Board = Tuple[int, int, int, int, int]
+
+
+def parse_board(text: str) -> Board:
+    """解析板子配置：狼人,预言家,女巫,猎人,平民"""
+    parts = [int(x) for x in text.split(",")]
+    if len(parts) != 5 or min(parts) < 0 or parts[0] < 1:
+        raise argparse.ArgumentTypeError(f"板子配置格式错误: {text}")
+    return tuple(parts)
+
+
+def build_config(board: Board) -> GameConfig:
+    """根据板子构建仿真配置（所有阶段超时与AI思考延迟都为0）"""
+    werewolf, seer, witch, hunter, villager = board
+    return GameConfig(
+        total_players=sum(board),
+        werewolf_count=werewolf,
+        seer_count=seer,
+        witch_count=witch,
+        hunter_count=hunter,
+        villager_count=villager,
+        timeout_wolf=0,
+        timeout_seer=0,
+        timeout_witch=0,
+        timeout_hunter=0,
+        timeout_speaking=0,
+        timeout_vote=0,
+        timeout_dead_min=0,
+        timeout_dead_max=0,
+        ai_delay_scale=0,
+        enable_ai_review=False,
+    )
+
+
+def _init_worker() -> None:
+    """工作进程初始化：压低日志级别，避免逐条输出拖慢仿真"""
+    from astrbot.api import logger
+    logger.setLevel(logging.WARNING)
+
+
+async def _run_batch_async(board: Board, start: int, count: int, base_seed: Optional[int]) -> List[GameResult]:
+    manager = HeadlessGameManager(build_config(board))
+    semaphore = asyncio.Semaphore(ROOMS_PER_LOOP)
+    prefix = f"sim{os.getpid()}_{'-'.join(map(str, board))}"
+
+    async def one(index: int) -> GameResult:
+        async with semaphore:
+            seed = None if base_seed is None else base_seed + index
+            return await manager.play_game(f"{prefix}_{index}", GAME_TIMEOUT_SECONDS, seed)
+
+    return await asyncio.gather(*(one(start + i) for i in range(count)))
+
+
+def run_batch(board: Board, start: int, count: int, base_seed: Optional[int] = None) -> Dict[str, list]:
+    """在工作进程中运行一批对局，返回列式结果"""
+    results = asyncio.run(_run_batch_async(board, start, count, base_seed))
+    return {
+        "seed": [r.seed for r in results],
+        "winner": [r.winner for r in results],
+        "rounds": [r.rounds for r in results],
+        "first_night_kill": [r.first_night_kill for r in results],
+        "duration": [round(r.duration, 4) for r in results],
+        "stuck_phase": [r.stuck_phase for r in results],
+        "flow_errors": [r.flow_errors for r in results],
+    }
+
+
+def summarize(columns: Dict[str, list]) -> dict:
+    """汇总单个板子的统计数据
+
+    胜率与平均轮数只统计正常结束且流程正确的对局；
+    超时未结束（unfinished）与流程错误（invalid）的对局单独计数并列出种子，main 据此判定本次运行失败。
+    """
+    total = len(columns["winner"])
+    unfinished = [i for i, w in enumerate(columns["winner"]) if not w]
+    invalid = [i for i, w in enumerate(columns["winner"]) if w and columns["flow_errors"][i]]
+    finished = [i for i, w in enumerate(columns["winner"]) if w and not columns["flow_errors"][i]]
+    wins: Dict[str, int] = {}
+    for i in finished:
+        wins[columns["winner"][i]] = wins.get(columns["winner"][i], 0) + 1
+    first_kills: Dict[str, int] = {}
+    for role in columns["first_night_kill"]:
+        if role:
+            first_kills[role] = first_kills.get(role, 0) + 1
+
+    stuck_phases: Dict[str, int] = {}
+    for i in unfinished:
+        phase = columns["stuck_phase"][i] or "unknown"
+        stuck_phases[phase] = stuck_phases.get(phase, 0) + 1
+
+    return {
+        "games": total,
+        "unfinished": len(unfinished),
+        "invalid": len(invalid),
+        "stuck_phases": stuck_phases,
+        "broken_seeds": [columns["seed"][i] for i in sorted(unfinished + invalid)[:BROKEN_SEEDS_SHOWN]],
+        "win_rate": {k: round(v / len(finished), 4) for k, v in wins.items()} if finished else {},
+        "avg_rounds": round(sum(columns["rounds"][i] for i in finished) / len(finished), 3) if finished else 0,
+        "first_night_kill": first_kills,
+    }
+
+
+def run_tournament(
+    boards: List[Board],
+    games: int,
+    workers: int,
+    batch_size: int,
+    base_seed: Optional[int] = None
+) -> dict:
+    """运行锦标赛，返回 {板子: {"summary": ..., "columns": ...}}"""
+    output: Dict[str, dict] = {}
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+        futures = {}
+        for board in boards:
+            key = ",".join(map(str, board))
+            output[key] = {"columns": {name: [] for name in COLUMNS}}
+            for start in range(0, games, batch_size):
+                count = min(batch_size, games - start)
+                futures[pool.submit(run_batch, board, start, count, base_seed)] = key
+
+        for future in as_completed(futures):
+            columns = output[futures[future]]["columns"]
+            for name, values in future.result().items():
+                columns[name].extend(values)
+
+    for data in output.values():
+        data["summary"] = summarize(data["columns"])
+    return output
+
+
+def main(argv: List[str] = None) -> None:
+    parser = argparse.ArgumentParser(description="狼人杀无头仿真锦标赛")
+    parser.add_argument("--board", action="append", type=parse_board,
+                        help="板子配置：狼人,预言家,女巫,猎人,平民（可多次指定）")
+    parser.add_argument("--games", type=int, default=1000, help="每个板子的对局数")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="进程数")
+    parser.add_argument("--batch-size", type=int, default=250, help="每个进程任务的对局数")
+    parser.add_argument("--out", default="", help="结果输出文件（gzip压缩的列式JSON）")
+    parser.add_argument("--seed", type=int, default=None, help="基础随机种子（第i局使用 seed+i，可复现）")
+    args = parser.parse_args(argv)
+
+    boards = args.board or [(3, 1, 1, 1, 3)]
+    start = time.monotonic()
+    output = run_tournament(boards, args.games, args.workers, args.batch_size, args.seed)
+    elapsed = time.monotonic() - start
+
+    for key, data in output.items():
+        print(f"[{key}] {json.dumps(data['summary'], ensure_ascii=False)}")
+    print(f"共 {args.games * len(boards)} 局，耗时 {elapsed:.1f} 秒")
+
+    broken = {
+        key: (data["summary"]["unfinished"], data["summary"]["invalid"])
+        for key, data in output.items()
+        if data["summary"]["unfinished"] or data["summary"]["invalid"]
+    }
+    if broken:
+        details = "；".join(f"[{key}] 未结束 {u} 局，流程错误 {i} 局" for key, (u, i) in broken.items())
+        raise SystemExit(f"存在异常对局，统计结果不可信，未写出结果：{details}")
+
+    if args.out:
+        with gzip.open(args.out, "wt", encoding="utf-8") as f:
+            json.dump(output, f, ensure_ascii=False)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,4 @@
 """工具模块"""
-from .helpers import format_player_list, parse_target
+from .helpers import format_player_list, parse_target, split_paragraphs, ai_think_delay
 
-__all__ = ["format_player_list", "parse_target"]
+__all__ = ["format_player_list", "parse_target", "split_paragraphs", "ai_think_delay"]
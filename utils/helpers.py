@@ -1,5 +1,6 @@
 """工具函数"""
-from typing import List, Optional, TYPE_CHECKING
+import asyncio
+from typing import List, Optional, Tuple, TYPE_CHECKING
 
 if TYPE_CHECKING:
     from ..models import Player, GameRoom
@@ -18,3 +19,38 @@ def format_player_list(players: List["Player"], exclude_ids: Optional[List[str]]
 def parse_target(target_str: str, room: "GameRoom") -> Optional[str]:
     """解析目标玩家ID"""
     return room.parse_target(target_str)
+
+
+def split_paragraphs(text: str, max_chars: int) -> List[str]:
+    """按段落切分长文本，每块不超过max_chars（段落过长时按行切，单行过长时硬切）"""
+    # (与前文的分隔符, 片段)
+    pieces: List[Tuple[str, str]] = []
+    for paragraph in text.strip().split("\n\n"):
+        if len(paragraph) <= max_chars:
+            pieces.append(("\n\n", paragraph))
+            continue
+        sep = "\n\n"
+        for line in paragraph.split("\n"):
+            for i in range(0, max(len(line), 1), max_chars):
+                pieces.append((sep, line[i:i + max_chars]))
+                sep = ""
+            sep = "\n"
+
+    chunks: List[str] = []
+    current = ""
+    for sep, piece in pieces:
+        if current and len(current) + len(sep) + len(piece) > max_chars:
+            chunks.append(current)
+            current = ""
+        current = current + sep + piece if current else piece
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+async def ai_think_delay(room: "GameRoom", low: float, high: float) -> None:
+    """AI思考延迟（模拟真人节奏，按配置倍率缩放，倍率为0时不等待）"""
+    scale = room.config.ai_delay_scale
+    if scale <= 0:
+        return
+    await asyncio.sleep(room.rng.uniform(low, high) * scale)